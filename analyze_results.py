@@ -2,51 +2,172 @@
 """
 Post-experiment analysis: generates paper-ready figures and detailed analysis.
 
+Every table and figure takes any number of systems. The usual input is the
+comparison file run_experiment.py writes after a multi-system run, which
+holds every system's metrics aggregated over trials; the per-test heatmap
+uses the last-trial metrics files saved alongside it.
+
+Figures render in a process pool, one figure per worker, and matplotlib is
+only imported inside the workers, so adding systems or figures doesn't make
+the analysis step proportionally slower. NumPy and pandas are likewise only
+imported where used, so --help and argument errors return immediately.
+
 Usage:
+    python analyze_results.py --comparison results/comparison_aggregated_*.json
     python analyze_results.py --mem0 results/mem0_metrics_*.json --agent results/agent_metrics_*.json
     python analyze_results.py --results-dir results  # auto-find latest
+    python analyze_results.py --systems mem0 langmem agent  # latest of each
+    python analyze_results.py --db results/warehouse.db  # latest runs in the warehouse
 """
 
 import argparse
 import glob
 import json
 import os
+import re
 import sys
-
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use("Agg")
-import numpy as np
-import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 
 from benchmark.data import FAILURE_CATEGORIES
-from evaluation.failure_analysis import categorize_failures, build_failure_mode_comparison
+from evaluation.failure_analysis import (
+    categorize_failures_n,
+    failure_mode_table,
+    generate_comparison_latex,
+    generate_comparison_tables,
+)
+from evaluation import warehouse
+
+DEFAULT_SYSTEMS = ["mem0", "agent"]
+
+SYSTEM_LABELS = {"mem0": "Mem0 (External)", "agent": "Agent-Driven"}
+
+SYSTEM_COLORS = {"mem0": "#e74c3c", "agent": "#3498db"}
+# Colors for every other system, in order
+PALETTE = ["#2ecc71", "#9b59b6", "#f39c12", "#1abc9c", "#34495e", "#e67e22", "#7f8c8d"]
+
+# comparison_aggregated_<YYYYmmdd_HHMMSS>.json
+_COMPARISON_NAME = re.compile(r"comparison_aggregated_(?P<ts>\d{8}_\d{6})\.json$")
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _metrics_files(results_dir: str, system: str, timestamp: str = "*") -> list[str]:
+    """A system's metrics files, oldest first (newest trial last per run)."""
+    files = glob.glob(os.path.join(results_dir, f"{system}_metrics_{timestamp}.json"))
+    files += glob.glob(os.path.join(results_dir, f"{system}_trial*_metrics_{timestamp}.json"))
+    # Sort by run timestamp, then trial
+    return sorted(files, key=lambda f: (f.rsplit("_metrics_", 1)[1], f))
 
 
 def load_latest_metrics(results_dir: str, system: str) -> dict:
     """Load the most recent metrics file for a system."""
-    pattern = os.path.join(results_dir, f"{system}_metrics_*.json")
-    files = sorted(glob.glob(pattern))
+    files = _metrics_files(results_dir, system)
     if not files:
         return None
     with open(files[-1]) as f:
         return json.load(f)
 
 
-def plot_category_comparison(mem0: dict, agent: dict, output_dir: str):
+def load_latest_metrics_db(conn, system: str) -> dict:
+    """Metrics for a system's most recent run in the results warehouse."""
+    from evaluation.metrics import compute_metrics
+
+    results = warehouse.latest_run_results(conn, system)
+    return compute_metrics(results) if results else None
+
+
+def load_comparison(path: str) -> dict[str, dict]:
+    """{system: aggregated metrics} from a comparison file.
+
+    Each system also gets the test_details of its last trial when the
+    per-trial metrics files from the same run sit next to the comparison.
+    """
+    with open(path) as f:
+        systems = json.load(f)
+    match = _COMPARISON_NAME.search(os.path.basename(path))
+    if match:
+        for name, metrics in systems.items():
+            files = _metrics_files(os.path.dirname(path), name, match.group("ts"))
+            if files:
+                with open(files[-1]) as f:
+                    metrics["test_details"] = json.load(f).get("test_details", [])
+    return systems
+
+
+def _means(value):
+    """Replace {"mean", "std"} aggregates with their means, recursively."""
+    if isinstance(value, dict):
+        if value.keys() == {"mean", "std"}:
+            return value["mean"]
+        return {k: _means(v) for k, v in value.items()}
+    return value
+
+
+def system_labels(names) -> dict[str, str]:
+    return {name: SYSTEM_LABELS.get(name, name) for name in names}
+
+
+def system_colors(names) -> dict[str, str]:
+    others = iter(PALETTE * (len(names) // len(PALETTE) + 1))
+    return {name: SYSTEM_COLORS.get(name) or next(others) for name in names}
+
+
+# ---------------------------------------------------------------------------
+# Figures (each runs in its own worker process)
+# ---------------------------------------------------------------------------
+
+def _pyplot():
+    """pyplot on the Agg backend, imported on first use."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _save(plt, output_dir: str, name: str) -> str:
+    plt.tight_layout()
+    path = os.path.join(output_dir, f"{name}.pdf")
+    plt.savefig(path, dpi=300, bbox_inches="tight")
+    plt.savefig(path.replace(".pdf", ".png"), dpi=300, bbox_inches="tight")
+    plt.close()
+    return path
+
+
+def _grouped_bars(ax, groups: int, series: dict[str, list], labels: dict, colors: dict,
+                  annotate: bool = False):
+    """One bar per system in each group, centered on the group's tick."""
+    import numpy as np
+
+    x = np.arange(groups)
+    width = 0.8 / max(len(series), 1)
+    for i, (name, values) in enumerate(series.items()):
+        offset = (i - (len(series) - 1) / 2) * width
+        bars = ax.bar(x + offset, values, width, label=labels[name], color=colors[name], alpha=0.8)
+        if annotate:
+            for bar in bars:
+                height = bar.get_height()
+                if height > 0:
+                    ax.annotate(f"{height:.0%}", xy=(bar.get_x() + bar.get_width() / 2, height),
+                                xytext=(0, 3), textcoords="offset points", ha="center",
+                                va="bottom", fontsize=8)
+    return x
+
+
+def plot_category_comparison(systems: dict, labels: dict, output_dir: str) -> str:
     """Fig 1: Bar chart comparing accuracy by failure category."""
+    plt = _pyplot()
     categories = FAILURE_CATEGORIES
     cat_labels = [c.replace("_", "\n") for c in categories]
+    series = {
+        name: [m["by_category"].get(c, {}).get("accuracy", 0) for c in categories]
+        for name, m in systems.items()
+    }
 
-    mem0_acc = [mem0["by_category"].get(c, {}).get("accuracy", 0) for c in categories]
-    agent_acc = [agent["by_category"].get(c, {}).get("accuracy", 0) for c in categories]
-
-    x = np.arange(len(categories))
-    width = 0.35
-
-    fig, ax = plt.subplots(figsize=(12, 6))
-    bars1 = ax.bar(x - width/2, mem0_acc, width, label="Mem0 (External)", color="#e74c3c", alpha=0.8)
-    bars2 = ax.bar(x + width/2, agent_acc, width, label="Agent-Driven", color="#3498db", alpha=0.8)
+    fig, ax = plt.subplots(figsize=(max(12, 2 * len(systems) + 8), 6))
+    x = _grouped_bars(ax, len(categories), series, labels, system_colors(systems), annotate=True)
 
     ax.set_ylabel("Accuracy", fontsize=12)
     ax.set_title("Memory System Accuracy by Failure Category", fontsize=14, fontweight="bold")
@@ -56,45 +177,22 @@ def plot_category_comparison(mem0: dict, agent: dict, output_dir: str):
     ax.set_ylim(0, 1.1)
     ax.axhline(y=1.0, color="gray", linestyle="--", alpha=0.3)
 
-    # Add value labels on bars
-    for bar in bars1:
-        height = bar.get_height()
-        if height > 0:
-            ax.annotate(f"{height:.0%}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                       xytext=(0, 3), textcoords="offset points", ha="center", va="bottom", fontsize=8)
-    for bar in bars2:
-        height = bar.get_height()
-        if height > 0:
-            ax.annotate(f"{height:.0%}", xy=(bar.get_x() + bar.get_width() / 2, height),
-                       xytext=(0, 3), textcoords="offset points", ha="center", va="bottom", fontsize=8)
+    return _save(plt, output_dir, "fig1_category_comparison")
 
-    plt.tight_layout()
-    path = os.path.join(output_dir, "fig1_category_comparison.pdf")
-    plt.savefig(path, dpi=300, bbox_inches="tight")
-    plt.savefig(path.replace(".pdf", ".png"), dpi=300, bbox_inches="tight")
-    plt.close()
-    print(f"Saved: {path}")
 
-
-def plot_failure_modes(mem0: dict, agent: dict, output_dir: str):
+def plot_failure_modes(systems: dict, labels: dict, output_dir: str) -> str | None:
     """Fig 2: Failure mode frequency comparison."""
-    comparison = build_failure_mode_comparison(mem0, agent)
-
-    modes = sorted(comparison.keys())
+    table = failure_mode_table(systems)
+    modes = sorted(table)
     if not modes:
-        print("No failure modes to plot.")
-        return
+        return None
 
+    plt = _pyplot()
     mode_labels = [m.replace("_", "\n") for m in modes]
-    mem0_counts = [comparison[m]["mem0_count"] for m in modes]
-    agent_counts = [comparison[m]["agent_count"] for m in modes]
-
-    x = np.arange(len(modes))
-    width = 0.35
+    series = {name: [table[m][name] for m in modes] for name in systems}
 
     fig, ax = plt.subplots(figsize=(10, 5))
-    ax.bar(x - width/2, mem0_counts, width, label="Mem0 (External)", color="#e74c3c", alpha=0.8)
-    ax.bar(x + width/2, agent_counts, width, label="Agent-Driven", color="#3498db", alpha=0.8)
+    x = _grouped_bars(ax, len(modes), series, labels, system_colors(systems))
 
     ax.set_ylabel("Count", fontsize=12)
     ax.set_title("Failure Mode Frequency", fontsize=14, fontweight="bold")
@@ -102,32 +200,20 @@ def plot_failure_modes(mem0: dict, agent: dict, output_dir: str):
     ax.set_xticklabels(mode_labels, fontsize=9)
     ax.legend(fontsize=11)
 
-    plt.tight_layout()
-    path = os.path.join(output_dir, "fig2_failure_modes.pdf")
-    plt.savefig(path, dpi=300, bbox_inches="tight")
-    plt.savefig(path.replace(".pdf", ".png"), dpi=300, bbox_inches="tight")
-    plt.close()
-    print(f"Saved: {path}")
+    return _save(plt, output_dir, "fig2_failure_modes")
 
 
-def plot_memory_efficiency(mem0: dict, agent: dict, output_dir: str):
+def plot_memory_efficiency(systems: dict, labels: dict, output_dir: str) -> str:
     """Fig 3: Memory efficiency comparison (entries stored, tokens used)."""
+    plt = _pyplot()
+    colors = system_colors(systems)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
 
     # Left: Memory entries
-    m0_eff = mem0["memory_efficiency"]
-    ag_eff = agent["memory_efficiency"]
-
     metrics_labels = ["Total\nEntries", "Added", "Updated", "Deleted"]
-    m0_vals = [m0_eff["avg_total_entries"], m0_eff["avg_entries_added"],
-               m0_eff["avg_entries_updated"], m0_eff["avg_entries_deleted"]]
-    ag_vals = [ag_eff["avg_total_entries"], ag_eff["avg_entries_added"],
-               ag_eff["avg_entries_updated"], ag_eff["avg_entries_deleted"]]
-
-    x = np.arange(len(metrics_labels))
-    width = 0.35
-    ax1.bar(x - width/2, m0_vals, width, label="Mem0", color="#e74c3c", alpha=0.8)
-    ax1.bar(x + width/2, ag_vals, width, label="Agent-Driven", color="#3498db", alpha=0.8)
+    keys = ["avg_total_entries", "avg_entries_added", "avg_entries_updated", "avg_entries_deleted"]
+    series = {name: [m["memory_efficiency"].get(k, 0) for k in keys] for name, m in systems.items()}
+    x = _grouped_bars(ax1, len(metrics_labels), series, labels, colors)
     ax1.set_ylabel("Average per User")
     ax1.set_title("Memory Operations", fontweight="bold")
     ax1.set_xticks(x)
@@ -136,56 +222,50 @@ def plot_memory_efficiency(mem0: dict, agent: dict, output_dir: str):
 
     # Right: Token usage (cost proxy)
     token_labels = ["Input\nTokens", "Output\nTokens"]
-    m0_tokens = [m0_eff["total_input_tokens"], m0_eff["total_output_tokens"]]
-    ag_tokens = [ag_eff["total_input_tokens"], ag_eff["total_output_tokens"]]
-
-    # Add eval costs
-    m0_eval = mem0.get("eval_costs", {})
-    ag_eval = agent.get("eval_costs", {})
-
-    x2 = np.arange(len(token_labels))
-    ax2.bar(x2 - width/2, m0_tokens, width, label="Mem0 (memory ops)", color="#e74c3c", alpha=0.8)
-    ax2.bar(x2 + width/2, ag_tokens, width, label="Agent-Driven (memory ops)", color="#3498db", alpha=0.8)
+    keys = ["total_input_tokens", "total_output_tokens"]
+    series = {name: [m["memory_efficiency"].get(k, 0) for k in keys] for name, m in systems.items()}
+    x2 = _grouped_bars(ax2, len(token_labels), series, labels, colors)
     ax2.set_ylabel("Total Tokens")
     ax2.set_title("LLM Token Usage (Memory Operations Only)", fontweight="bold")
     ax2.set_xticks(x2)
     ax2.set_xticklabels(token_labels)
     ax2.legend()
 
-    plt.tight_layout()
-    path = os.path.join(output_dir, "fig3_memory_efficiency.pdf")
-    plt.savefig(path, dpi=300, bbox_inches="tight")
-    plt.savefig(path.replace(".pdf", ".png"), dpi=300, bbox_inches="tight")
-    plt.close()
-    print(f"Saved: {path}")
+    return _save(plt, output_dir, "fig3_memory_efficiency")
 
 
-def plot_heatmap(mem0: dict, agent: dict, output_dir: str):
-    """Fig 4: Heatmap of per-test results for both systems."""
-    m0_tests = {t["test_id"]: t for t in mem0["test_details"]}
-    ag_tests = {t["test_id"]: t for t in agent["test_details"]}
+def plot_heatmap(systems: dict, labels: dict, output_dir: str) -> str | None:
+    """Fig 4: Heatmap of per-test results, one column per system."""
+    per_test = {
+        name: {t["test_id"]: t for t in m["test_details"]}
+        for name, m in systems.items() if m.get("test_details")
+    }
+    if not per_test:
+        return None
+
+    import numpy as np
+    import seaborn as sns
 
-    test_ids = sorted(set(list(m0_tests.keys()) + list(ag_tests.keys())))
+    plt = _pyplot()
 
+    test_ids = sorted({tid for tests in per_test.values() for tid in tests})
     rating_map = {"correct": 2, "partially_correct": 1, "incorrect": 0, "error": -1}
-    rating_labels = {2: "Correct", 1: "Partial", 0: "Incorrect", -1: "Error"}
 
     data = []
     labels_y = []
     for tid in test_ids:
-        m0_r = rating_map.get(m0_tests.get(tid, {}).get("rating", "error"), -1)
-        ag_r = rating_map.get(ag_tests.get(tid, {}).get("rating", "error"), -1)
-        cat = m0_tests.get(tid, ag_tests.get(tid, {})).get("category", "?")
-        data.append([m0_r, ag_r])
+        data.append([rating_map.get(tests.get(tid, {}).get("rating", "error"), -1)
+                     for tests in per_test.values()])
+        cat = next((tests[tid]["category"] for tests in per_test.values() if tid in tests), "?")
         labels_y.append(f"{tid}\n({cat})")
 
     data = np.array(data)
 
-    fig, ax = plt.subplots(figsize=(6, max(8, len(test_ids) * 0.5)))
+    fig, ax = plt.subplots(figsize=(3 + 1.5 * len(per_test), max(8, len(test_ids) * 0.5)))
     cmap = sns.color_palette(["#e74c3c", "#f39c12", "#2ecc71"], as_cmap=True)
     sns.heatmap(
         data, ax=ax, cmap=cmap, vmin=0, vmax=2,
-        xticklabels=["Mem0", "Agent-Driven"],
+        xticklabels=[labels[name] for name in per_test],
         yticklabels=labels_y,
         annot=True, fmt="d",
         cbar_kws={"ticks": [0, 1, 2], "label": "0=Incorrect, 1=Partial, 2=Correct"},
@@ -193,17 +273,37 @@ def plot_heatmap(mem0: dict, agent: dict, output_dir: str):
     )
     ax.set_title("Per-Test Results Heatmap", fontsize=14, fontweight="bold")
 
-    plt.tight_layout()
-    path = os.path.join(output_dir, "fig4_heatmap.pdf")
-    plt.savefig(path, dpi=300, bbox_inches="tight")
-    plt.savefig(path.replace(".pdf", ".png"), dpi=300, bbox_inches="tight")
-    plt.close()
-    print(f"Saved: {path}")
+    return _save(plt, output_dir, "fig4_heatmap")
+
 
+FIGURES = [plot_category_comparison, plot_failure_modes, plot_memory_efficiency, plot_heatmap]
+
+
+def render_figures(systems: dict, labels: dict, output_dir: str, jobs: int = 1) -> list[str]:
+    """Render every figure, across up to `jobs` worker processes.
+
+    Returns the saved paths; figures with nothing to plot are skipped.
+    """
+    if jobs > 1:
+        # Spawned workers re-import this module without matplotlib, which
+        # each worker then imports for itself
+        with ProcessPoolExecutor(max_workers=min(jobs, len(FIGURES)),
+                                 mp_context=get_context("spawn")) as pool:
+            futures = [pool.submit(plot, systems, labels, output_dir) for plot in FIGURES]
+            paths = [future.result() for future in futures]
+    else:
+        paths = [plot(systems, labels, output_dir) for plot in FIGURES]
+    return [path for path in paths if path]
 
-def generate_narrative_analysis(mem0: dict, agent: dict) -> str:
+
+# ---------------------------------------------------------------------------
+# Narrative
+# ---------------------------------------------------------------------------
+
+def generate_narrative_analysis(systems: dict, labels: dict = None) -> str:
     """Generate a narrative analysis for the paper's discussion section."""
-    taxonomy = categorize_failures(mem0, agent)
+    labels = labels or system_labels(systems)
+    taxonomy = categorize_failures_n(systems)
 
     lines = []
     lines.append("NARRATIVE ANALYSIS FOR PAPER")
@@ -211,9 +311,10 @@ def generate_narrative_analysis(mem0: dict, agent: dict) -> str:
     lines.append("")
 
     # Overall
-    m0_acc = mem0["overall"]["accuracy"]
-    ag_acc = agent["overall"]["accuracy"]
-    lines.append(f"Overall: Mem0 {m0_acc:.0%} vs Agent-Driven {ag_acc:.0%}")
+    overall = ", ".join(
+        f"{labels[name]} {m['overall']['accuracy']:.0%}" for name, m in systems.items()
+    )
+    lines.append(f"Overall: {overall}")
     lines.append("")
 
     # Category-level insights
@@ -222,8 +323,9 @@ def generate_narrative_analysis(mem0: dict, agent: dict) -> str:
 
     for cat in FAILURE_CATEGORIES:
         t = taxonomy[cat]
+        accs = ", ".join(f"{labels[name]}: {acc:.0%}" for name, acc in t["accuracy"].items())
         lines.append(f"\n{cat.upper()}:")
-        lines.append(f"  Mem0: {t['mem0_accuracy']:.0%}, Agent: {t['agent_accuracy']:.0%}, Winner: {t['winner']}")
+        lines.append(f"  {accs}, Winner: {labels.get(t['winner'], t['winner'])}")
 
         if cat == "contradiction_update":
             lines.append("  -> This is the most critical differentiator. Does each system")
@@ -244,14 +346,15 @@ def generate_narrative_analysis(mem0: dict, agent: dict) -> str:
             lines.append("  -> The hardest category: requires synthesizing information")
             lines.append("     from multiple sessions into a coherent whole.")
         elif cat == "simple_recall":
-            lines.append("  -> Baseline capability: both systems should do well here.")
+            lines.append("  -> Baseline capability: every system should do well here.")
 
     # Failure modes
     lines.append("\n\nFAILURE MODE ANALYSIS:")
     lines.append("-" * 40)
-    fm = build_failure_mode_comparison(mem0, agent)
-    for mode, counts in sorted(fm.items(), key=lambda x: -(x[1]["mem0_count"] + x[1]["agent_count"])):
-        lines.append(f"  {mode}: Mem0={counts['mem0_count']}, Agent={counts['agent_count']}")
+    fm = failure_mode_table(systems)
+    for mode, counts in sorted(fm.items(), key=lambda x: -sum(x[1].values())):
+        per_system = ", ".join(f"{labels[name]}={n:g}" for name, n in counts.items())
+        lines.append(f"  {mode}: {per_system}")
 
     # Key arguments for the paper
     lines.append("\n\nKEY ARGUMENTS FOR THE PAPER:")
@@ -269,40 +372,66 @@ def generate_narrative_analysis(mem0: dict, agent: dict) -> str:
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze MemoryBench results")
+    parser.add_argument("--comparison", default=None,
+                        help="comparison_aggregated_*.json from a multi-system run")
+    parser.add_argument("--systems", nargs="+", default=DEFAULT_SYSTEMS,
+                        help=f"Systems to load the latest metrics for (default: {' '.join(DEFAULT_SYSTEMS)})")
     parser.add_argument("--results-dir", default="results")
     parser.add_argument("--mem0", default=None, help="Path to Mem0 metrics JSON")
     parser.add_argument("--agent", default=None, help="Path to Agent metrics JSON")
+    parser.add_argument("--db", default=None,
+                        help="Results warehouse to read the latest runs from (see ingest_results.py)")
     parser.add_argument("--output-dir", default="results/figures")
+    parser.add_argument("--jobs", type=int, default=min(len(FIGURES), os.cpu_count() or 1),
+                        help="Worker processes rendering figures (default: one per figure, up to CPU count)")
     args = parser.parse_args()
 
     # Load metrics
-    if args.mem0:
-        with open(args.mem0) as f:
-            mem0_metrics = json.load(f)
-    else:
-        mem0_metrics = load_latest_metrics(args.results_dir, "mem0")
-
-    if args.agent:
-        with open(args.agent) as f:
-            agent_metrics = json.load(f)
+    if args.comparison:
+        systems = load_comparison(args.comparison)
     else:
-        agent_metrics = load_latest_metrics(args.results_dir, "agent")
-
-    if not mem0_metrics or not agent_metrics:
-        print("Error: Could not find metrics files. Run the experiment first:")
-        print("  python run_experiment.py")
-        sys.exit(1)
-
+        conn = warehouse.connect(args.db) if args.db else None
+        explicit = {"mem0": args.mem0, "agent": args.agent}
+        names = list(dict.fromkeys(args.systems + [n for n, p in explicit.items() if p]))
+        systems = {}
+        for name in names:
+            if explicit.get(name):
+                with open(explicit[name]) as f:
+                    systems[name] = json.load(f)
+            elif conn is not None:
+                systems[name] = load_latest_metrics_db(conn, name)
+            else:
+                systems[name] = load_latest_metrics(args.results_dir, name)
+
+        missing = [name for name, m in systems.items() if not m]
+        if missing:
+            print(f"Error: Could not find metrics for {', '.join(missing)}. Run the experiment first:")
+            print("  python run_experiment.py")
+            if conn is not None:
+                print("and load its results into the warehouse:")
+                print(f"  python ingest_results.py results --db {args.db}")
+            sys.exit(1)
+
+    systems = _means(systems)
+    labels = system_labels(systems)
     os.makedirs(args.output_dir, exist_ok=True)
 
-    print("Generating figures...")
-    plot_category_comparison(mem0_metrics, agent_metrics, args.output_dir)
-    plot_failure_modes(mem0_metrics, agent_metrics, args.output_dir)
-    plot_memory_efficiency(mem0_metrics, agent_metrics, args.output_dir)
-    plot_heatmap(mem0_metrics, agent_metrics, args.output_dir)
+    print(f"Generating figures for {len(systems)} systems...")
+    for path in render_figures(systems, labels, args.output_dir, args.jobs):
+        print(f"Saved: {path}")
+
+    print("\nGenerating comparison tables...")
+    tables_path = os.path.join(args.output_dir, "comparison_tables.txt")
+    with open(tables_path, "w") as f:
+        f.write(generate_comparison_tables(systems, labels))
+    latex_path = os.path.join(args.output_dir, "latex_tables.tex")
+    with open(latex_path, "w") as f:
+        f.write(generate_comparison_latex(systems, labels))
+    print(f"Saved: {tables_path}")
+    print(f"Saved: {latex_path}")
 
     print("\nGenerating narrative analysis...")
-    narrative = generate_narrative_analysis(mem0_metrics, agent_metrics)
+    narrative = generate_narrative_analysis(systems, labels)
     print(narrative)
 
     narrative_path = os.path.join(args.output_dir, "narrative_analysis.txt")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval recall for memory search — no answer generation, no judge.
+
+Rebuilds each profile's memory store from the `all_memories_after` snapshot in
+a trial results file, runs every test query through search(), and reports
+recall@k and MRR of the tests' required_memories per failure category. Only
+embedding calls are made, so a retrieval change can be checked in seconds
+before paying for a full sweep.
+
+Stores are rebuilt as AgentDrivenMemory and searched with its search(), so
+only results from the agent-driven systems (agent, agent_backfill and the
+ablations, which share that search) are accepted; files from other systems
+are skipped with an error rather than scored with the wrong search.
+
+Usage:
+    # Vector vs hybrid search over the memories an agent run stored
+    python evaluate_retrieval.py results_v5/agent_trial1_results_20260213_104526.json \\
+        --retrieval vector hybrid
+
+    # Stricter matching, top-3, word overlap only (no embedding match)
+    python evaluate_retrieval.py results/agent_trial1_results_*.json --k 3 --no-embedding-match
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from benchmark.data import FAILURE_CATEGORIES
+from evaluation.retrieval_eval import (
+    SIMILARITY_THRESHOLD,
+    MemoryMatcher,
+    evaluate_retrieval,
+    load_memory_snapshots,
+)
+from memory_systems import resources
+from memory_systems.agent_driven import AgentDrivenMemory
+from memory_systems.registry import SYSTEM_DISPLAY_NAMES
+
+# Systems whose search() is AgentDrivenMemory's, by the system_name results files record
+AGENT_SEARCH_SYSTEMS = {
+    SYSTEM_DISPLAY_NAMES[key]
+    for key in ("agent", "agent_backfill", "ablation_no_feedback",
+                "ablation_no_consolidation", "ablation_add_only")
+}
+
+
+def print_summary(reports: dict, k: int):
+    modes = list(reports)
+    print(f"\n{'Category':<25}" + "".join(f"{f'{m} R@{k}':>16}{f'{m} MRR':>14}" for m in modes))
+    print("-" * (25 + 30 * len(modes)))
+    for cat in FAILURE_CATEGORIES + ["overall"]:
+        row = f"{cat:<25}"
+        for mode in modes:
+            block = reports[mode]["overall"] if cat == "overall" else reports[mode]["by_category"][cat]
+            if block["tests"] == 0:
+                row += f"{'n/a':>16}{'n/a':>14}"
+            else:
+                row += f"{block['recall_at_k']:>16.1%}{block['mrr']:>14.3f}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval recall@k / MRR")
+    parser.add_argument("results", nargs="+",
+                        help="Trial results JSON files whose memory snapshots to search")
+    parser.add_argument("--retrieval", nargs="+", choices=["vector", "hybrid"], default=["vector"],
+                        help="Search modes to compare (default: vector)")
+    parser.add_argument("--k", type=int, default=5, help="Results per query (default: 5)")
+    parser.add_argument("--similarity", type=float, default=SIMILARITY_THRESHOLD,
+                        help="Embedding cosine at which a memory counts as a match")
+    parser.add_argument("--no-embedding-match", action="store_true",
+                        help="Match by word overlap only")
+    parser.add_argument("--output", default=None, help="Write the full report to this JSON file")
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("Error: OPENAI_API_KEY not set.")
+        sys.exit(1)
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    embedder = resources.embedder(api_key)
+    matcher = MemoryMatcher(
+        embedder=None if args.no_embedding_match else embedder,
+        similarity_threshold=args.similarity,
+    )
+
+    report = {}
+    skipped = []
+    for path in args.results:
+        with open(path) as f:
+            system_name = json.load(f).get("system_name")
+        if system_name not in AGENT_SEARCH_SYSTEMS:
+            print(f"\nError: {os.path.basename(path)} comes from {system_name or 'an unknown system'}; "
+                  f"only agent-driven results can be rebuilt and searched here. Skipping.")
+            skipped.append(path)
+            continue
+        snapshots = load_memory_snapshots(path)
+        print(f"\n{os.path.basename(path)}: {len(snapshots)} profiles, "
+              f"{sum(len(m) for m in snapshots.values())} memories")
+        reports = {}
+        for mode in args.retrieval:
+            factory = lambda uid: AgentDrivenMemory(user_id=uid, openai_api_key=api_key, retrieval=mode)
+            reports[mode] = evaluate_retrieval(factory, snapshots, matcher, k=args.k)
+        print_summary(reports, args.k)
+        report[path] = reports
+
+    print("\nCompletion calls: 0")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.output}")
+    if skipped:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
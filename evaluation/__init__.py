@@ -1,3 +1,24 @@
-from .runner import ExperimentRunner
-from .metrics import compute_metrics
-from .failure_analysis import categorize_failures
+"""Experiment running, scoring and analysis.
+
+Exports are resolved on first access, so lightweight modules such as
+evaluation.warehouse or evaluation.judge_cache import without pandas,
+NumPy or the OpenAI SDK.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "ExperimentRunner": ".runner",
+    "compute_metrics": ".metrics",
+    "categorize_failures": ".failure_analysis",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,567 @@
+"""Pre-flight cost and latency estimates for experiment sweeps.
+
+Walks the benchmark profiles the way ExperimentRunner does and builds the
+actual prompt templates (CONVERSATION_PROMPT, ANSWER_GENERATION_PROMPT, ...)
+with representative filler, so prompt sizes track the real templates as they
+change. Anything we can't see locally (Mem0/LangMem internal prompts, output
+lengths) comes from ASSUMPTIONS, and is replaced by observed numbers from
+prior results files when they exist.
+
+Prompt caching is modelled the way OpenAI applies it: a prompt whose leading
+tokens match a recent request's (at least CACHE_MIN_TOKENS, in
+CACHE_INCREMENT steps) is billed at the cached-input price for that prefix
+and skips prefill for it. The agent's static system prompt and, within a
+session, the conversation up to the previous turn are such a prefix.
+"""
+
+import glob
+import json
+import os
+from dataclasses import dataclass
+
+from benchmark.data import PROFILES
+from memory_systems.tokens import estimate_tokens
+from .prompts import (
+    ANSWER_EVALUATION_PROMPT, ANSWER_EVALUATION_SYSTEM_PROMPT, ANSWER_GENERATION_PROMPT,
+    format_retrieved,
+)
+
+# USD per 1M tokens
+PRICING = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "text-embedding-3-small": {"input": 0.02, "output": 0.0},
+}
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Provider prompt caching: shortest cacheable prefix and its granularity
+CACHE_MIN_TOKENS = 1024
+CACHE_INCREMENT = 128
+
+ASSUMPTIONS = {
+    # Memory store shape
+    "adds_per_user_turn": 1.5,
+    "memory_tokens": 20,
+    "retrieval_top_k": 5,
+    # Output lengths (tokens)
+    "conversation_output_tokens": 220,
+    "extraction_output_tokens": 250,
+    "consolidation_output_tokens": 400,
+    "answer_output_tokens": 45,
+    "judge_output_tokens": 90,
+    # External services: calls per session and fixed prompt overhead
+    "mem0_completions_per_session": 2,
+    "mem0_embeddings_per_session": 6,
+    "mem0_prompt_overhead_tokens": 900,
+    "langmem_prompt_overhead_tokens": 700,
+    "service_completions_per_session": 1,
+    "service_embeddings_per_session": 3,
+    "service_prompt_overhead_tokens": 600,
+    # Latency model: fixed round trip + prefill of uncached input + generation speed
+    "completion_base_seconds": 0.5,
+    "prefill_tokens_per_second": 5000.0,
+    "output_tokens_per_second": 80.0,
+    "embedding_call_seconds": 0.25,
+}
+
+# Systems that search through memory_systems.Embedder (one query embed per test)
+EMBEDDER_SEARCH_SYSTEMS = {
+    "agent", "agent_backfill", "ablation_no_feedback", "ablation_no_consolidation", "ablation_add_only",
+    "zep_memory", "redis",
+}
+
+
+@dataclass
+class CallEstimate:
+    """Projected API usage for one unit of work."""
+    completions: float = 0.0
+    input_tokens: float = 0.0
+    cached_input_tokens: float = 0.0  # part of input_tokens
+    output_tokens: float = 0.0
+    embedding_calls: float = 0.0
+    embedding_tokens: float = 0.0
+    serial_seconds: float = 0.0
+    cache_saved_seconds: float = 0.0
+
+    def add_completion(self, input_tokens: float, output_tokens: float, count: float = 1.0,
+                       cached_tokens: float = 0.0):
+        self.completions += count
+        self.input_tokens += input_tokens * count
+        self.cached_input_tokens += cached_tokens * count
+        self.output_tokens += output_tokens * count
+        self.serial_seconds += count * (
+            ASSUMPTIONS["completion_base_seconds"]
+            + (input_tokens - cached_tokens) / ASSUMPTIONS["prefill_tokens_per_second"]
+            + output_tokens / ASSUMPTIONS["output_tokens_per_second"]
+        )
+        self.cache_saved_seconds += count * cached_tokens / ASSUMPTIONS["prefill_tokens_per_second"]
+
+    def add_embedding(self, tokens: float, count: float = 1.0):
+        self.embedding_calls += count
+        self.embedding_tokens += tokens * count
+        self.serial_seconds += count * ASSUMPTIONS["embedding_call_seconds"]
+
+    def __add__(self, other: "CallEstimate") -> "CallEstimate":
+        return CallEstimate(**{k: getattr(self, k) + getattr(other, k) for k in self.__dataclass_fields__})
+
+    def scaled(self, factor: float) -> "CallEstimate":
+        return CallEstimate(**{k: getattr(self, k) * factor for k in self.__dataclass_fields__})
+
+    def cost_usd(self, model: str, caching: bool = True) -> float:
+        """Projected spend; caching=False prices every input token at the full rate."""
+        prices = PRICING.get(model, PRICING["gpt-4o-mini"])
+        cached = self.cached_input_tokens if caching else 0.0
+        return (
+            (self.input_tokens - cached) * prices["input"]
+            + cached * prices["cached_input"]
+            + self.output_tokens * prices["output"]
+            + self.embedding_tokens * PRICING[EMBEDDING_MODEL]["input"]
+        ) / 1e6
+
+
+def cache_savings_usd(model: str, cached_tokens: float) -> float:
+    """What cached input tokens saved over paying the full input price."""
+    prices = PRICING.get(model, PRICING["gpt-4o-mini"])
+    return cached_tokens * (prices["input"] - prices["cached_input"]) / 1e6
+
+
+def cacheable_tokens(prefix_tokens: float) -> float:
+    """Tokens of a repeated prompt prefix the provider serves from its cache."""
+    if prefix_tokens < CACHE_MIN_TOKENS:
+        return 0.0
+    return CACHE_MIN_TOKENS + (prefix_tokens - CACHE_MIN_TOKENS) // CACHE_INCREMENT * CACHE_INCREMENT
+
+
+# ---------------------------------------------------------------------------
+# Template-based prompt sizing
+# ---------------------------------------------------------------------------
+
+def _filler_memories(n: int) -> str:
+    words = " ".join(["detail"] * ASSUMPTIONS["memory_tokens"])
+    return "\n".join(f"[a1b2c3d4] User {words} (importance: high)" for _ in range(n))
+
+
+def _training_sessions(profile: dict) -> list[list[dict]]:
+    sessions = []
+    for session in profile["sessions"]:
+        if session["session_id"] >= 5:
+            continue
+        turns = [t for t in session["turns"] if "[MEMORY TEST]" not in t.get("content", "")]
+        if turns:
+            sessions.append(turns)
+    return sessions
+
+
+def _format_turns(turns: list[dict]) -> str:
+    return "\n".join(
+        f"{'User' if t['role'] == 'user' else 'Assistant'}: {t['content']}" for t in turns
+    )
+
+
+def _estimate_agent_profile(profile: dict, per_turn: bool = True,
+                            consolidate: bool = True) -> CallEstimate:
+    """Agent-driven ingestion: one CONVERSATION_PROMPT call per user turn.
+
+    Every call after the profile's first reuses the cached system prompt;
+    within a session the previous call's transcript extends that prefix.
+    """
+    from memory_systems.agent_driven import (
+        CONSOLIDATION_PROMPT, CONVERSATION_PROMPT, CONVERSATION_SYSTEM_PROMPT,
+        MEMORY_EXTRACTION_PROMPT,
+    )
+
+    system_tokens = estimate_tokens(CONVERSATION_SYSTEM_PROMPT)
+    est = CallEstimate()
+    memories = 0.0
+    warm = False
+    for session_id, turns in enumerate(_training_sessions(profile), start=1):
+        if per_turn:
+            so_far = []
+            prefix = system_tokens
+            for turn in turns:
+                so_far.append(turn)
+                if turn["role"] != "user":
+                    continue
+                if memories:
+                    est.add_embedding(estimate_tokens(turn["content"]))
+                prompt = CONVERSATION_PROMPT.format(
+                    retrieved_memories=_filler_memories(min(int(memories), ASSUMPTIONS["retrieval_top_k"])),
+                    session_id=session_id,
+                    conversation=_format_turns(so_far),
+                )
+                est.add_completion(system_tokens + estimate_tokens(prompt),
+                                   ASSUMPTIONS["conversation_output_tokens"],
+                                   cached_tokens=cacheable_tokens(prefix) if warm else 0.0)
+                warm = True
+                prefix = system_tokens + estimate_tokens(_format_turns(so_far))
+                est.add_embedding(ASSUMPTIONS["memory_tokens"] * ASSUMPTIONS["adds_per_user_turn"])
+                memories += ASSUMPTIONS["adds_per_user_turn"]
+        else:
+            user_turns = sum(1 for t in turns if t["role"] == "user")
+            prompt = MEMORY_EXTRACTION_PROMPT.format(
+                current_memories=_filler_memories(int(memories)),
+                session_id=session_id,
+                conversation=_format_turns(turns),
+            )
+            est.add_completion(estimate_tokens(prompt), ASSUMPTIONS["extraction_output_tokens"])
+            adds = ASSUMPTIONS["adds_per_user_turn"] * user_turns
+            est.add_embedding(ASSUMPTIONS["memory_tokens"] * adds)
+            memories += adds
+
+        if consolidate and memories > 20:
+            prompt = CONSOLIDATION_PROMPT.format(memories=_filler_memories(int(memories)))
+            est.add_completion(estimate_tokens(prompt), ASSUMPTIONS["consolidation_output_tokens"])
+            memories = memories * 0.6
+    return est
+
+
+def _estimate_agent_backfill_profile(profile: dict) -> CallEstimate:
+    """agent_backfill ingestion: one BACKFILL_PROMPT call per chunk of sessions.
+
+    Each chunk embeds its user turns in one batch and retrieves top-k per
+    turn; the static system prompt is cached after the profile's first call.
+    Chunk size is read like the registry's factory does.
+    """
+    from memory_systems.agent_driven import (
+        BACKFILL_PROMPT, BACKFILL_SYSTEM_PROMPT, CONSOLIDATION_PROMPT, DEFAULT_BACKFILL_SESSIONS,
+    )
+
+    chunk_size = int(os.getenv("AGENT_BACKFILL_SESSIONS") or DEFAULT_BACKFILL_SESSIONS)
+    system_tokens = estimate_tokens(BACKFILL_SYSTEM_PROMPT)
+    sessions = _training_sessions(profile)
+    est = CallEstimate()
+    memories = 0.0
+    for i in range(0, len(sessions), chunk_size):
+        chunk = sessions[i:i + chunk_size]
+        user_texts = [t["content"] for turns in chunk for t in turns if t["role"] == "user"]
+        if memories:
+            est.add_embedding(sum(estimate_tokens(text) for text in user_texts))
+        retrieved = min(int(memories), ASSUMPTIONS["retrieval_top_k"] * len(user_texts))
+        prompt = BACKFILL_PROMPT.format(
+            transcript="\n".join(_format_turns(turns) for turns in chunk),
+            retrieved_memories=_filler_memories(retrieved),
+        )
+        est.add_completion(system_tokens + estimate_tokens(prompt),
+                           ASSUMPTIONS["extraction_output_tokens"] * len(chunk),
+                           cached_tokens=cacheable_tokens(system_tokens) if i else 0.0)
+        adds = ASSUMPTIONS["adds_per_user_turn"] * len(user_texts)
+        est.add_embedding(ASSUMPTIONS["memory_tokens"] * adds)
+        memories += adds
+        if memories > 20:
+            prompt = CONSOLIDATION_PROMPT.format(memories=_filler_memories(int(memories)))
+            est.add_completion(estimate_tokens(prompt), ASSUMPTIONS["consolidation_output_tokens"])
+            memories = memories * 0.6
+    return est
+
+
+def _estimate_external_profile(profile: dict, system_name: str) -> CallEstimate:
+    """External services extract once (or twice) per session with their own prompts."""
+    est = CallEstimate()
+    memories = 0.0
+    for turns in _training_sessions(profile):
+        conversation = estimate_tokens(_format_turns(turns))
+        user_turns = sum(1 for t in turns if t["role"] == "user")
+        if system_name == "mem0":
+            est.add_completion(
+                conversation + ASSUMPTIONS["mem0_prompt_overhead_tokens"]
+                + memories * ASSUMPTIONS["memory_tokens"],
+                ASSUMPTIONS["extraction_output_tokens"],
+                count=ASSUMPTIONS["mem0_completions_per_session"],
+            )
+            est.add_embedding(ASSUMPTIONS["memory_tokens"], count=ASSUMPTIONS["mem0_embeddings_per_session"])
+        elif system_name == "langmem":
+            # The full existing-memory list is resent on every session
+            est.add_completion(
+                conversation + ASSUMPTIONS["langmem_prompt_overhead_tokens"]
+                + memories * ASSUMPTIONS["memory_tokens"],
+                ASSUMPTIONS["extraction_output_tokens"],
+            )
+        else:
+            est.add_completion(
+                conversation + ASSUMPTIONS["service_prompt_overhead_tokens"],
+                ASSUMPTIONS["extraction_output_tokens"],
+                count=ASSUMPTIONS["service_completions_per_session"],
+            )
+            est.add_embedding(ASSUMPTIONS["memory_tokens"], count=ASSUMPTIONS["service_embeddings_per_session"])
+        memories += ASSUMPTIONS["adds_per_user_turn"] * user_turns
+    return est
+
+
+def estimate_ingestion(system_name: str, profile: dict) -> CallEstimate:
+    """Projected memory-system API usage for ingesting one profile."""
+    if system_name in ("current_session", "full_context"):
+        return CallEstimate()
+    if system_name == "agent":
+        return _estimate_agent_profile(profile)
+    if system_name == "agent_backfill":
+        return _estimate_agent_backfill_profile(profile)
+    if system_name == "ablation_no_consolidation":
+        return _estimate_agent_profile(profile, consolidate=False)
+    if system_name == "ablation_no_feedback":
+        return _estimate_agent_profile(profile, per_turn=False)
+    if system_name == "ablation_add_only":
+        return _estimate_agent_profile(profile, per_turn=False, consolidate=False)
+    return _estimate_external_profile(profile, system_name)
+
+
+def _full_context_retrieved(profile: dict) -> str:
+    """The exact transcript context full_context answers from (no API calls)."""
+    from memory_systems.full_context import FullContextBaseline
+
+    system = FullContextBaseline.from_env(profile["user_id"])
+    for session_id, turns in enumerate(_training_sessions(profile), start=1):
+        system.add_conversation(turns, session_id)
+    contents = [m.content for m in system.search("", top_k=ASSUMPTIONS["retrieval_top_k"])]
+    return format_retrieved(contents)
+
+
+def estimate_evaluation(system_name: str, profile: dict) -> CallEstimate:
+    """Projected runner API usage (answer + judge per test) for one profile."""
+    judge_system_tokens = estimate_tokens(ANSWER_EVALUATION_SYSTEM_PROMPT)
+    est = CallEstimate()
+    has_memory = system_name != "current_session"
+    retrieved = _filler_memories(ASSUMPTIONS["retrieval_top_k"]) if has_memory else "(No memories found)"
+    if system_name == "full_context":
+        retrieved = _full_context_retrieved(profile)
+    answer_filler = " ".join(["answer"] * ASSUMPTIONS["answer_output_tokens"])
+
+    for i, test in enumerate(profile["memory_tests"]):
+        if system_name in EMBEDDER_SEARCH_SYSTEMS:
+            est.add_embedding(estimate_tokens(test["query"]))
+        answer_prompt = ANSWER_GENERATION_PROMPT.format(memories=retrieved, query=test["query"])
+        est.add_completion(estimate_tokens(answer_prompt), ASSUMPTIONS["answer_output_tokens"])
+        eval_prompt = ANSWER_EVALUATION_PROMPT.format(
+            query=test["query"],
+            correct_answer=test["correct_answer"],
+            required_memories="\n".join(f"- {m}" for m in test["required_memories"]),
+            retrieved_memories=retrieved,
+            system_answer=answer_filler,
+        )
+        est.add_completion(judge_system_tokens + estimate_tokens(eval_prompt),
+                           ASSUMPTIONS["judge_output_tokens"],
+                           cached_tokens=cacheable_tokens(judge_system_tokens) if i else 0.0)
+    return est
+
+
+# ---------------------------------------------------------------------------
+# Calibration from prior results
+# ---------------------------------------------------------------------------
+
+def load_calibration(results_dirs: list[str]) -> dict:
+    """Average observed per-profile and per-test usage from prior trial results.
+
+    Returns {system_name: {"profile_llm_calls", "profile_input_tokens",
+    "profile_cached_input_tokens", "profile_output_tokens", "test_llm_calls",
+    "test_input_tokens", "test_cached_input_tokens", "test_output_tokens",
+    "runs"}} for every system with results on disk. Cached counts are None
+    when no run recorded them (results from before prompt caching was tracked).
+    """
+    observed = {}
+    for results_dir in results_dirs:
+        for path in glob.glob(os.path.join(results_dir, "*_trial*_results_*.json")):
+            system_name = os.path.basename(path).split("_trial")[0]
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            profiles = data.get("profile_results", [])
+            stats = [p["memory_stats"] for p in profiles if p.get("memory_stats")]
+            num_tests = sum(len(p.get("test_results", [])) for p in profiles)
+            if not stats or not num_tests:
+                continue
+            acc = observed.setdefault(system_name, {
+                "profiles": 0, "tests": 0, "llm_calls": 0, "input_tokens": 0,
+                "cached_input_tokens": 0, "output_tokens": 0, "eval_llm_calls": 0,
+                "eval_input_tokens": 0, "eval_cached_input_tokens": 0,
+                "eval_output_tokens": 0, "runs": 0, "cache_runs": 0,
+            })
+            acc["runs"] += 1
+            acc["profiles"] += len(stats)
+            acc["tests"] += num_tests
+            acc["llm_calls"] += sum(s.get("llm_calls", 0) for s in stats)
+            acc["input_tokens"] += sum(s.get("total_input_tokens", 0) for s in stats)
+            acc["cached_input_tokens"] += sum(s.get("total_cached_input_tokens", 0) for s in stats)
+            acc["output_tokens"] += sum(s.get("total_output_tokens", 0) for s in stats)
+            costs = data.get("eval_costs", {})
+            acc["eval_llm_calls"] += costs.get("llm_calls", 0)
+            acc["eval_input_tokens"] += costs.get("input_tokens", 0)
+            acc["eval_cached_input_tokens"] += costs.get("cached_input_tokens", 0)
+            acc["eval_output_tokens"] += costs.get("output_tokens", 0)
+            acc["cache_runs"] += "cached_input_tokens" in costs
+
+    calibration = {}
+    for system_name, acc in observed.items():
+        # Only average cached counts over runs that recorded them
+        cache_share = acc["cache_runs"] / acc["runs"]
+        calibration[system_name] = {
+            "runs": acc["runs"],
+            "profile_llm_calls": acc["llm_calls"] / acc["profiles"],
+            "profile_input_tokens": acc["input_tokens"] / acc["profiles"],
+            "profile_cached_input_tokens": (
+                acc["cached_input_tokens"] / (acc["profiles"] * cache_share) if cache_share else None
+            ),
+            "profile_output_tokens": acc["output_tokens"] / acc["profiles"],
+            "test_llm_calls": acc["eval_llm_calls"] / acc["tests"],
+            "test_input_tokens": acc["eval_input_tokens"] / acc["tests"],
+            "test_cached_input_tokens": (
+                acc["eval_cached_input_tokens"] / (acc["tests"] * cache_share) if cache_share else None
+            ),
+            "test_output_tokens": acc["eval_output_tokens"] / acc["tests"],
+        }
+    return calibration
+
+
+def _calibrate(est: CallEstimate, calls: float, input_tokens: float,
+               output_tokens: float, cached_tokens: float = None) -> CallEstimate:
+    """Replace completion counts/tokens with observed values, keeping embeddings.
+
+    Systems that don't report tokens (Mem0, LangMem) only have their call
+    count calibrated; tokens per call stay template-estimated. Without an
+    observed cached count, the estimate's cached share of input is kept.
+    """
+    if calls <= 0:
+        return est
+    per_call_in = est.input_tokens / est.completions if est.completions else 0.0
+    per_call_out = est.output_tokens / est.completions if est.completions else 0.0
+    if input_tokens > 0:
+        per_call_in = input_tokens / calls
+    if cached_tokens is not None:
+        per_call_cached = cached_tokens / calls
+    else:
+        cached_share = est.cached_input_tokens / est.input_tokens if est.input_tokens else 0.0
+        per_call_cached = per_call_in * cached_share
+    calibrated = CallEstimate(
+        embedding_calls=est.embedding_calls,
+        embedding_tokens=est.embedding_tokens,
+        serial_seconds=est.embedding_calls * ASSUMPTIONS["embedding_call_seconds"],
+    )
+    calibrated.add_completion(
+        per_call_in,
+        output_tokens / calls if output_tokens > 0 else per_call_out,
+        count=calls,
+        cached_tokens=per_call_cached,
+    )
+    return calibrated
+
+
+# ---------------------------------------------------------------------------
+# Plan
+# ---------------------------------------------------------------------------
+
+def plan_sweep(system_names: list[str], profiles: list[dict] = None, trials: int = 1,
+               model: str = "gpt-4o-mini", concurrency: int = 1,
+               calibration: dict = None) -> dict:
+    """Project calls, tokens, dollars and wall time for a sweep.
+
+    Profiles run sequentially inside a trial, so wall time is bounded below by
+    the slowest profile and otherwise by total serial time / concurrency.
+    """
+    if profiles is None:
+        profiles = PROFILES
+    calibration = calibration or {}
+    concurrency = max(1, concurrency)
+
+    plan = {"model": model, "trials": trials, "concurrency": concurrency,
+            "num_profiles": len(profiles), "systems": {}}
+    grand = CallEstimate()
+    grand_serial = 0.0
+    slowest_profile = 0.0
+
+    for system_name in system_names:
+        cal = calibration.get(system_name)
+        total = CallEstimate()
+        for profile in profiles:
+            ingest = estimate_ingestion(system_name, profile)
+            evaluation = estimate_evaluation(system_name, profile)
+            if cal:
+                ingest = _calibrate(ingest, cal["profile_llm_calls"],
+                                    cal["profile_input_tokens"], cal["profile_output_tokens"],
+                                    cal.get("profile_cached_input_tokens"))
+                num_tests = len(profile["memory_tests"])
+                test_cached = cal.get("test_cached_input_tokens")
+                evaluation = _calibrate(evaluation, cal["test_llm_calls"] * num_tests,
+                                        cal["test_input_tokens"] * num_tests,
+                                        cal["test_output_tokens"] * num_tests,
+                                        test_cached * num_tests if test_cached is not None else None)
+            unit = ingest + evaluation
+            slowest_profile = max(slowest_profile, unit.serial_seconds)
+            total = total + unit
+
+        total = total.scaled(trials)
+        grand = grand + total
+        grand_serial += total.serial_seconds
+        plan["systems"][system_name] = {
+            "calibrated": bool(cal),
+            "completions": total.completions,
+            "input_tokens": total.input_tokens,
+            "cached_input_tokens": total.cached_input_tokens,
+            "output_tokens": total.output_tokens,
+            "embedding_calls": total.embedding_calls,
+            "embedding_tokens": total.embedding_tokens,
+            "cost_usd": total.cost_usd(model),
+            "uncached_cost_usd": total.cost_usd(model, caching=False),
+            "serial_seconds": total.serial_seconds,
+            "cache_saved_seconds": total.cache_saved_seconds,
+        }
+
+    plan["total"] = {
+        "completions": grand.completions,
+        "input_tokens": grand.input_tokens,
+        "cached_input_tokens": grand.cached_input_tokens,
+        "output_tokens": grand.output_tokens,
+        "embedding_calls": grand.embedding_calls,
+        "embedding_tokens": grand.embedding_tokens,
+        "cost_usd": grand.cost_usd(model),
+        "uncached_cost_usd": grand.cost_usd(model, caching=False),
+        "serial_seconds": grand_serial,
+        "cache_saved_seconds": grand.cache_saved_seconds,
+        "wall_seconds": max(slowest_profile, grand_serial / concurrency),
+    }
+    return plan
+
+
+def format_plan(plan: dict) -> str:
+    lines = []
+    lines.append("=" * 108)
+    lines.append(
+        f"SWEEP PLAN: {plan['num_profiles']} profiles x {plan['trials']} trial(s), "
+        f"model={plan['model']}, concurrency={plan['concurrency']}"
+    )
+    lines.append("=" * 108)
+    lines.append(f"{'System':<28} {'Calls':>8} {'Input tok':>12} {'Cached tok':>11} {'Output tok':>11} "
+                 f"{'Embed':>7} {'Cost $':>9} {'Serial':>9}  Source")
+    lines.append("-" * 108)
+    for system_name, s in plan["systems"].items():
+        source = "calibrated" if s["calibrated"] else "estimated"
+        lines.append(
+            f"{system_name:<28} {s['completions']:>8,.0f} {s['input_tokens']:>12,.0f} "
+            f"{s['cached_input_tokens']:>11,.0f} {s['output_tokens']:>11,.0f} {s['embedding_calls']:>7,.0f} "
+            f"{s['cost_usd']:>9.2f} {_fmt_duration(s['serial_seconds']):>9}  {source}"
+        )
+    t = plan["total"]
+    lines.append("-" * 108)
+    lines.append(
+        f"{'TOTAL':<28} {t['completions']:>8,.0f} {t['input_tokens']:>12,.0f} "
+        f"{t['cached_input_tokens']:>11,.0f} {t['output_tokens']:>11,.0f} {t['embedding_calls']:>7,.0f} "
+        f"{t['cost_usd']:>9.2f} {_fmt_duration(t['serial_seconds']):>9}"
+    )
+    lines.append(f"\nProjected wall time at concurrency {plan['concurrency']}: "
+                 f"{_fmt_duration(t['wall_seconds'])}")
+    if t["cached_input_tokens"]:
+        saved = t["uncached_cost_usd"] - t["cost_usd"]
+        lines.append(
+            f"Prompt caching: {t['cached_input_tokens'] / t['input_tokens']:.0%} of input tokens cached, "
+            f"saving ${saved:.2f} ({saved / t['uncached_cost_usd']:.0%} of cost) and "
+            f"{_fmt_duration(t['cache_saved_seconds'])} of serial prefill time"
+        )
+    return "\n".join(lines)
+
+
+def _fmt_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    return f"{minutes}m{secs:02d}s"
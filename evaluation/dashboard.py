@@ -0,0 +1,206 @@
+"""Live progress view and JSON snapshots for experiment runs (--progress).
+
+SweepDashboard subscribes to the telemetry bus (memory_systems/telemetry.py)
+for the duration of one (system, trial) run and keeps running totals: tests
+judged, in-flight HTTP requests, LLM tokens, HTTP errors, SDK retries and
+judge parse errors. A tqdm bar over the run's tests shows progress and ETA
+with the live numbers alongside, and every `interval` seconds the same
+numbers are written to a JSON snapshot for external scraping (replaced
+atomically, so readers never see a partial file).
+
+While the bar is up, print() output is routed through tqdm.write so the
+runner's per-test lines scroll above the bar instead of breaking it.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+from memory_systems import telemetry
+
+# Seconds between JSON snapshots, and between bar postfix refreshes
+SNAPSHOT_INTERVAL = 5.0
+REFRESH_INTERVAL = 1.0
+
+
+class _TqdmStream:
+    """stdout replacement that writes through tqdm, above any active bars."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        from tqdm import tqdm
+
+        # print() writes the text and the newline separately
+        if text.strip():
+            tqdm.write(text.rstrip("\n"), file=self.stream)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class SweepDashboard:
+    """Progress bar and periodic snapshots for one run, fed by telemetry events."""
+
+    def __init__(self, label: str, snapshot_path: str = None, interval: float = SNAPSHOT_INTERVAL,
+                 bar: bool = True):
+        self.label = label
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.show_bar = bar
+        self._lock = threading.Lock()
+        self._bar = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._redirect = None
+
+        self.system = None
+        self.started = None
+        self.profiles_total = 0
+        self.profiles_done = 0
+        self.tests_total = 0
+        self.tests_answered = 0
+        self.tests_judged = 0
+        self.judge_cached = 0
+        self.judge_errors = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+        self.llm_calls = 0
+        self.in_flight = 0
+        self.http_requests = 0
+        self.http_errors = 0
+        self.retries = 0
+        self.by_endpoint: dict[str, int] = {}
+
+    # -----------------------------------------------------------------------
+    # Events
+    # -----------------------------------------------------------------------
+
+    def _on_event(self, event: str, fields: dict):
+        with self._lock:
+            if event == "run_start":
+                self.system = fields["system"]
+                self.started = fields["time"]
+                self.profiles_total = fields["profiles"]
+                self.tests_total = fields["tests"]
+                if self.show_bar:
+                    from tqdm import tqdm
+                    self._bar = tqdm(total=self.tests_total, desc=self.label, unit="test",
+                                     file=sys.__stderr__, dynamic_ncols=True)
+            elif event == "profile_end":
+                self.profiles_done += 1
+            elif event == "test_answered":
+                self.tests_answered += 1
+            elif event == "test_judged":
+                self.tests_judged += 1
+                self.judge_cached += fields["cached"]
+                self.judge_errors += fields["rating"] == "error"
+                if self._bar is not None:
+                    self._bar.update(1)
+            elif event == "llm_call":
+                self.llm_calls += 1
+                self.input_tokens += fields["input_tokens"]
+                self.cached_input_tokens += fields["cached_tokens"]
+                self.output_tokens += fields["output_tokens"]
+            elif event == "http_start":
+                self.in_flight += 1
+                self.http_requests += 1
+                self.retries += fields["retry"]
+                endpoint = fields["endpoint"]
+                self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+            elif event == "http_end":
+                self.in_flight -= 1
+                self.http_errors += fields["error"] is not None
+
+    # -----------------------------------------------------------------------
+    # Snapshots
+    # -----------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+            tests_per_sec = self.tests_judged / elapsed if elapsed > 0 else 0.0
+            remaining = self.tests_total - self.tests_judged
+            return {
+                "label": self.label,
+                "system": self.system,
+                "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "elapsed_seconds": elapsed,
+                "profiles_done": self.profiles_done,
+                "profiles_total": self.profiles_total,
+                "tests_answered": self.tests_answered,
+                "tests_judged": self.tests_judged,
+                "tests_total": self.tests_total,
+                "tests_per_sec": tests_per_sec,
+                "eta_seconds": remaining / tests_per_sec if tests_per_sec > 0 else None,
+                "llm_calls": self.llm_calls,
+                "input_tokens": self.input_tokens,
+                "cached_input_tokens": self.cached_input_tokens,
+                "output_tokens": self.output_tokens,
+                "tokens_per_sec": (self.input_tokens + self.output_tokens) / elapsed if elapsed > 0 else 0.0,
+                "in_flight_requests": self.in_flight,
+                "http_requests": self.http_requests,
+                "http_requests_by_endpoint": dict(self.by_endpoint),
+                "http_errors": self.http_errors,
+                "retries": self.retries,
+                "judge_cached": self.judge_cached,
+                "judge_errors": self.judge_errors,
+            }
+
+    def write_snapshot(self):
+        if not self.snapshot_path:
+            return
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        tmp = f"{self.snapshot_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, self.snapshot_path)
+
+    def _refresh(self, snap: dict):
+        if self._bar is None:
+            return
+        # tqdm itself shows tests/s and the ETA
+        self._bar.set_postfix_str(
+            f"{snap['tokens_per_sec']:,.0f} tok/s, "
+            f"in-flight {snap['in_flight_requests']}, err {snap['http_errors'] + snap['judge_errors']}, "
+            f"retry {snap['retries']}"
+        )
+
+    def _tick(self):
+        last_snapshot = time.monotonic()
+        while not self._stop.wait(REFRESH_INTERVAL):
+            self._refresh(self.snapshot())
+            if time.monotonic() - last_snapshot >= self.interval:
+                self.write_snapshot()
+                last_snapshot = time.monotonic()
+
+    # -----------------------------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------------------------
+
+    def __enter__(self):
+        telemetry.subscribe(self._on_event)
+        if self.show_bar:
+            self._redirect = redirect_stdout(_TqdmStream(sys.stdout))
+            self._redirect.__enter__()
+        self._thread = threading.Thread(target=self._tick, daemon=True, name="sweep-dashboard")
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        telemetry.unsubscribe(self._on_event)
+        self._refresh(self.snapshot())
+        self.write_snapshot()
+        if self._bar is not None:
+            self._bar.close()
+        if self._redirect is not None:
+            self._redirect.__exit__(*exc)
+        return False
@@ -1,177 +1,250 @@
 """Failure taxonomy analysis — the core contribution of the paper.
 
 Categorizes failures into a taxonomy that reveals systematic differences
-between external (Mem0) and agent-driven memory systems.
+between memory systems, across any number of them.
+
+The N-system functions take {system: metrics}, where metrics is either one
+trial's compute_metrics output or a system's entry in the aggregated
+comparison file (values are {"mean", "std"} dicts; means are used). The
+original two-system Mem0 vs agent-driven functions are kept as wrappers.
 """
 
-from collections import defaultdict
 from benchmark.data import FAILURE_CATEGORIES
 
+# Categories where the best two systems are closer than this are a tie
+WINNER_MARGIN = 0.1
 
-def categorize_failures(mem0_metrics: dict, agent_metrics: dict) -> dict:
-    """Build the comparative failure taxonomy.
 
-    This is the main table in the paper — showing where each system
-    succeeds and fails across the 7 failure categories.
-    """
-    taxonomy = {}
+def _mean(value):
+    """A metric value, or its mean if aggregated across trials."""
+    if isinstance(value, dict):
+        return value.get("mean", 0)
+    return value
 
-    for cat in FAILURE_CATEGORIES:
-        mem0_cat = mem0_metrics["by_category"].get(cat, {})
-        agent_cat = agent_metrics["by_category"].get(cat, {})
 
-        taxonomy[cat] = {
-            "mem0_accuracy": mem0_cat.get("accuracy", 0),
-            "mem0_accuracy_partial": mem0_cat.get("accuracy_with_partial", 0),
-            "agent_accuracy": agent_cat.get("accuracy", 0),
-            "agent_accuracy_partial": agent_cat.get("accuracy_with_partial", 0),
-            "mem0_total": mem0_cat.get("total", 0),
-            "agent_total": agent_cat.get("total", 0),
-            "winner": _get_winner(mem0_cat, agent_cat),
-        }
+def _count(value) -> str:
+    v = _mean(value)
+    return f"{v:.0f}" if float(v).is_integer() else f"{v:.1f}"
 
-    return taxonomy
+
+def _labels(systems: dict, labels: dict | None) -> dict:
+    return {name: (labels or {}).get(name, name) for name in systems}
 
 
-def _get_winner(mem0_cat: dict, agent_cat: dict) -> str:
-    """Determine which system performs better on a category."""
-    m0 = mem0_cat.get("accuracy_with_partial", 0)
-    ag = agent_cat.get("accuracy_with_partial", 0)
-    if abs(m0 - ag) < 0.1:
+def _winner(scores: dict[str, float]) -> str:
+    """Best-scoring system, or "tie" if the runner-up is within WINNER_MARGIN."""
+    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < WINNER_MARGIN:
         return "tie"
-    return "mem0" if m0 > ag else "agent"
+    return ranked[0][0] if ranked else "tie"
 
 
-def build_failure_mode_comparison(mem0_metrics: dict, agent_metrics: dict) -> dict:
-    """Compare failure modes between the two systems."""
-    all_modes = set(
-        list(mem0_metrics.get("failure_modes", {}).keys()) +
-        list(agent_metrics.get("failure_modes", {}).keys())
-    )
+# ---------------------------------------------------------------------------
+# N-system comparison
+# ---------------------------------------------------------------------------
 
-    comparison = {}
-    for mode in sorted(all_modes):
-        comparison[mode] = {
-            "mem0_count": mem0_metrics.get("failure_modes", {}).get(mode, 0),
-            "agent_count": agent_metrics.get("failure_modes", {}).get(mode, 0),
+def categorize_failures_n(systems: dict[str, dict]) -> dict:
+    """Per-category accuracy of every system, and the category winner."""
+    taxonomy = {}
+    for cat in FAILURE_CATEGORIES:
+        cats = {name: m.get("by_category", {}).get(cat, {}) for name, m in systems.items()}
+        partial = {name: _mean(c.get("accuracy_with_partial", 0)) for name, c in cats.items()}
+        taxonomy[cat] = {
+            "accuracy": {name: _mean(c.get("accuracy", 0)) for name, c in cats.items()},
+            "accuracy_partial": partial,
+            "total": {name: _mean(c.get("total", 0)) for name, c in cats.items()},
+            "winner": _winner(partial),
         }
+    return taxonomy
 
-    return comparison
 
+def failure_mode_table(systems: dict[str, dict]) -> dict:
+    """{failure mode: {system: count}} over every mode any system hit."""
+    modes = sorted({mode for m in systems.values() for mode in m.get("failure_modes", {})})
+    return {
+        mode: {name: _mean(m.get("failure_modes", {}).get(mode, 0)) for name, m in systems.items()}
+        for mode in modes
+    }
 
-def generate_paper_tables(mem0_metrics: dict, agent_metrics: dict) -> str:
-    """Generate LaTeX-ready tables for the paper."""
-    taxonomy = categorize_failures(mem0_metrics, agent_metrics)
-    failure_comparison = build_failure_mode_comparison(mem0_metrics, agent_metrics)
+
+def generate_comparison_tables(systems: dict[str, dict], labels: dict = None,
+                               test_details: dict[str, list] = None) -> str:
+    """Text tables comparing every system, one column per system.
+
+    test_details ({system: compute_metrics test_details}) feeds the per-test
+    table; by default it is taken from the metrics where present, so it is
+    skipped for aggregated comparisons unless passed in.
+    """
+    names = list(systems)
+    labels = _labels(systems, labels)
+    width = max([12] + [len(labels[n]) + 2 for n in names])
+    header = "".join(f"{labels[n]:>{width}}" for n in names)
+    taxonomy = categorize_failures_n(systems)
+    modes = failure_mode_table(systems)
 
     output = []
 
+    def title(text, rule_width):
+        output.append("")
+        output.append("=" * rule_width)
+        output.append(text)
+        output.append("=" * rule_width)
+
     # Table 1: Overall Results
-    output.append("=" * 70)
-    output.append("TABLE 1: Overall Results")
-    output.append("=" * 70)
-    output.append(f"{'Metric':<30} {'Mem0':>15} {'Agent-Driven':>15}")
-    output.append("-" * 70)
-
-    m0_overall = mem0_metrics["overall"]
-    ag_overall = agent_metrics["overall"]
-    output.append(f"{'Accuracy':<30} {m0_overall['accuracy']:>14.1%} {ag_overall['accuracy']:>14.1%}")
-    output.append(f"{'Accuracy (w/ partial)':<30} {m0_overall['accuracy_with_partial']:>14.1%} {ag_overall['accuracy_with_partial']:>14.1%}")
-    output.append(f"{'Correct':<30} {m0_overall['correct']:>15} {ag_overall['correct']:>15}")
-    output.append(f"{'Partially Correct':<30} {m0_overall['partially_correct']:>15} {ag_overall['partially_correct']:>15}")
-    output.append(f"{'Incorrect':<30} {m0_overall['incorrect']:>15} {ag_overall['incorrect']:>15}")
+    rule = 30 + width * len(names)
+    title("TABLE 1: Overall Results", max(70, rule))
+    output.append(f"{'Metric':<30}{header}")
+    output.append("-" * max(70, rule))
+    overall = {n: systems[n]["overall"] for n in names}
+    for label, key in (("Accuracy", "accuracy"), ("Accuracy (w/ partial)", "accuracy_with_partial")):
+        output.append(f"{label:<30}" + "".join(f"{_mean(overall[n][key]):>{width}.1%}" for n in names))
+    for label, key in (("Correct", "correct"), ("Partially Correct", "partially_correct"),
+                       ("Incorrect", "incorrect")):
+        output.append(f"{label:<30}" + "".join(f"{_count(overall[n][key]):>{width}}" for n in names))
 
     # Table 2: Category Breakdown (the failure taxonomy)
-    output.append("")
-    output.append("=" * 80)
-    output.append("TABLE 2: Failure Taxonomy — Accuracy by Category")
-    output.append("=" * 80)
-    output.append(f"{'Category':<25} {'N':>5} {'Mem0':>10} {'Agent':>10} {'Winner':>10}")
-    output.append("-" * 80)
-
+    winner_width = max(12, width)
+    rule = 30 + width * len(names) + winner_width
+    title("TABLE 2: Failure Taxonomy — Accuracy by Category", max(80, rule))
+    output.append(f"{'Category':<25}{'N':>5}{header}{'Winner':>{winner_width}}")
+    output.append("-" * max(80, rule))
     for cat in FAILURE_CATEGORIES:
         t = taxonomy[cat]
-        n = t["mem0_total"]
-        m0_acc = f"{t['mem0_accuracy']:.0%}" if n > 0 else "N/A"
-        ag_acc = f"{t['agent_accuracy']:.0%}" if n > 0 else "N/A"
-        winner = t["winner"]
-        output.append(f"{cat:<25} {n:>5} {m0_acc:>10} {ag_acc:>10} {winner:>10}")
+        n = max(t["total"].values(), default=0)
+        accs = "".join(
+            f"{t['accuracy'][name]:>{width}.0%}" if n > 0 else f"{'N/A':>{width}}" for name in names
+        )
+        winner = labels.get(t["winner"], t["winner"])
+        output.append(f"{cat:<25}{_count(n):>5}{accs}{winner:>{winner_width}}")
 
     # Table 3: Failure Modes
-    output.append("")
-    output.append("=" * 60)
-    output.append("TABLE 3: Failure Mode Frequency")
-    output.append("=" * 60)
-    output.append(f"{'Failure Mode':<30} {'Mem0':>10} {'Agent':>10}")
-    output.append("-" * 60)
-
-    for mode, counts in sorted(failure_comparison.items()):
-        output.append(f"{mode:<30} {counts['mem0_count']:>10} {counts['agent_count']:>10}")
+    rule = 30 + width * len(names)
+    title("TABLE 3: Failure Mode Frequency", max(60, rule))
+    output.append(f"{'Failure Mode':<30}{header}")
+    output.append("-" * max(60, rule))
+    for mode, counts in modes.items():
+        output.append(f"{mode:<30}" + "".join(f"{_count(counts[n]):>{width}}" for n in names))
 
     # Table 4: Memory Efficiency
-    output.append("")
-    output.append("=" * 60)
-    output.append("TABLE 4: Memory Efficiency")
-    output.append("=" * 60)
-    output.append(f"{'Metric':<30} {'Mem0':>12} {'Agent':>12}")
-    output.append("-" * 60)
-
-    m0_eff = mem0_metrics["memory_efficiency"]
-    ag_eff = agent_metrics["memory_efficiency"]
-    output.append(f"{'Avg memories stored':<30} {m0_eff['avg_total_entries']:>11.1f} {ag_eff['avg_total_entries']:>11.1f}")
-    output.append(f"{'Avg entries added':<30} {m0_eff['avg_entries_added']:>11.1f} {ag_eff['avg_entries_added']:>11.1f}")
-    output.append(f"{'Avg entries updated':<30} {m0_eff['avg_entries_updated']:>11.1f} {ag_eff['avg_entries_updated']:>11.1f}")
-    output.append(f"{'Avg entries deleted':<30} {m0_eff['avg_entries_deleted']:>11.1f} {ag_eff['avg_entries_deleted']:>11.1f}")
-    output.append(f"{'Avg LLM calls (memory ops)':<30} {m0_eff['avg_llm_calls']:>11.1f} {ag_eff['avg_llm_calls']:>11.1f}")
-    output.append(f"{'Total input tokens':<30} {m0_eff['total_input_tokens']:>11,} {ag_eff['total_input_tokens']:>11,}")
-    output.append(f"{'Total output tokens':<30} {m0_eff['total_output_tokens']:>11,} {ag_eff['total_output_tokens']:>11,}")
+    title("TABLE 4: Memory Efficiency", max(60, rule))
+    output.append(f"{'Metric':<30}{header}")
+    output.append("-" * max(60, rule))
+    eff = {n: systems[n]["memory_efficiency"] for n in names}
+    for label, key in (("Avg memories stored", "avg_total_entries"),
+                       ("Avg entries added", "avg_entries_added"),
+                       ("Avg entries updated", "avg_entries_updated"),
+                       ("Avg entries deleted", "avg_entries_deleted"),
+                       ("Avg LLM calls (memory ops)", "avg_llm_calls")):
+        output.append(f"{label:<30}" + "".join(f"{_mean(eff[n].get(key, 0)):>{width}.1f}" for n in names))
+    for label, key in (("Total input tokens", "total_input_tokens"),
+                       ("Total output tokens", "total_output_tokens"),
+                       ("Cached input tokens", "total_cached_input_tokens")):
+        output.append(f"{label:<30}" + "".join(f"{_mean(eff[n].get(key, 0)):>{width},.0f}" for n in names))
 
     # Table 5: Per-test comparison
-    output.append("")
-    output.append("=" * 90)
-    output.append("TABLE 5: Head-to-Head Per-Test Comparison")
-    output.append("=" * 90)
-    output.append(f"{'Test ID':<20} {'Category':<22} {'Mem0':>12} {'Agent':>12} {'Match':>8}")
-    output.append("-" * 90)
-
-    m0_tests = {t["test_id"]: t for t in mem0_metrics["test_details"]}
-    ag_tests = {t["test_id"]: t for t in agent_metrics["test_details"]}
-
-    for test_id in sorted(set(list(m0_tests.keys()) + list(ag_tests.keys()))):
-        m0_rating = m0_tests.get(test_id, {}).get("rating", "N/A")
-        ag_rating = ag_tests.get(test_id, {}).get("rating", "N/A")
-        cat = m0_tests.get(test_id, ag_tests.get(test_id, {})).get("category", "unknown")
-        match = "Y" if m0_rating == ag_rating else "N"
-        output.append(f"{test_id:<20} {cat:<22} {m0_rating:>12} {ag_rating:>12} {match:>8}")
-
-    return "\n".join(output)
-
-
-def generate_latex_tables(mem0_metrics: dict, agent_metrics: dict) -> str:
-    """Generate LaTeX table code for the paper."""
-    taxonomy = categorize_failures(mem0_metrics, agent_metrics)
+    if test_details is None:
+        test_details = {n: systems[n]["test_details"] for n in names if "test_details" in systems[n]}
+    if test_details:
+        per_test = {n: {t["test_id"]: t for t in test_details[n]} for n in names if n in test_details}
+        rating_width = max(width, len("partially_correct") + 2)
+        rule = 42 + rating_width * len(per_test) + 8
+        title("TABLE 5: Head-to-Head Per-Test Comparison", max(90, rule))
+        output.append(f"{'Test ID':<20}{'Category':<22}"
+                      + "".join(f"{labels[n]:>{rating_width}}" for n in per_test) + f"{'Match':>8}")
+        output.append("-" * max(90, rule))
+        test_ids = sorted({tid for tests in per_test.values() for tid in tests})
+        for test_id in test_ids:
+            ratings = [per_test[n].get(test_id, {}).get("rating", "N/A") for n in per_test]
+            cat = next(
+                (per_test[n][test_id]["category"] for n in per_test if test_id in per_test[n]),
+                "unknown",
+            )
+            match = "Y" if len(set(ratings)) == 1 else "N"
+            output.append(f"{test_id:<20}{cat:<22}"
+                          + "".join(f"{r:>{rating_width}}" for r in ratings) + f"{match:>8}")
+
+    return "\n".join(output[1:])
+
+
+def generate_comparison_latex(systems: dict[str, dict], labels: dict = None) -> str:
+    """LaTeX failure-taxonomy table with one accuracy column per system."""
+    names = list(systems)
+    labels = _labels(systems, labels)
+    taxonomy = categorize_failures_n(systems)
 
     latex = []
     latex.append(r"\begin{table}[t]")
     latex.append(r"\centering")
     latex.append(r"\caption{Failure Taxonomy: Accuracy by Category}")
     latex.append(r"\label{tab:failure_taxonomy}")
-    latex.append(r"\begin{tabular}{lcccl}")
+    latex.append(r"\begin{tabular}{lc" + "c" * len(names) + "l}")
     latex.append(r"\toprule")
-    latex.append(r"\textbf{Category} & \textbf{N} & \textbf{Mem0} & \textbf{Agent-Driven} & \textbf{Winner} \\")
+    columns = " & ".join(rf"\textbf{{{labels[n]}}}" for n in names)
+    latex.append(rf"\textbf{{Category}} & \textbf{{N}} & {columns} & \textbf{{Winner}} \\")
     latex.append(r"\midrule")
 
     for cat in FAILURE_CATEGORIES:
         t = taxonomy[cat]
-        n = t["mem0_total"]
+        n = max(t["total"].values(), default=0)
         cat_display = cat.replace("_", " ").title()
-        m0 = f"{t['mem0_accuracy']:.0%}" if n > 0 else "N/A"
-        ag = f"{t['agent_accuracy']:.0%}" if n > 0 else "N/A"
-        winner = t["winner"].title()
-        latex.append(f"{cat_display} & {n} & {m0} & {ag} & {winner} \\\\")
+        accs = " & ".join(f"{t['accuracy'][name]:.0%}" if n > 0 else "N/A" for name in names)
+        accs = accs.replace("%", r"\%")
+        winner = labels.get(t["winner"], t["winner"]).title()
+        latex.append(f"{cat_display} & {_count(n)} & {accs} & {winner} \\\\")
 
     latex.append(r"\bottomrule")
     latex.append(r"\end{tabular}")
     latex.append(r"\end{table}")
 
     return "\n".join(latex)
+
+
+# ---------------------------------------------------------------------------
+# Two-system (Mem0 vs agent-driven) wrappers
+# ---------------------------------------------------------------------------
+
+PAIR_LABELS = {"mem0": "Mem0", "agent": "Agent-Driven"}
+
+
+def categorize_failures(mem0_metrics: dict, agent_metrics: dict) -> dict:
+    """Build the comparative failure taxonomy.
+
+    This is the main table in the paper — showing where each system
+    succeeds and fails across the 7 failure categories.
+    """
+    taxonomy = categorize_failures_n({"mem0": mem0_metrics, "agent": agent_metrics})
+    return {
+        cat: {
+            "mem0_accuracy": t["accuracy"]["mem0"],
+            "mem0_accuracy_partial": t["accuracy_partial"]["mem0"],
+            "agent_accuracy": t["accuracy"]["agent"],
+            "agent_accuracy_partial": t["accuracy_partial"]["agent"],
+            "mem0_total": t["total"]["mem0"],
+            "agent_total": t["total"]["agent"],
+            "winner": t["winner"],
+        }
+        for cat, t in taxonomy.items()
+    }
+
+
+def build_failure_mode_comparison(mem0_metrics: dict, agent_metrics: dict) -> dict:
+    """Compare failure modes between the two systems."""
+    table = failure_mode_table({"mem0": mem0_metrics, "agent": agent_metrics})
+    return {
+        mode: {"mem0_count": counts["mem0"], "agent_count": counts["agent"]}
+        for mode, counts in table.items()
+    }
+
+
+def generate_paper_tables(mem0_metrics: dict, agent_metrics: dict) -> str:
+    """Generate LaTeX-ready tables for the paper."""
+    return generate_comparison_tables(
+        {"mem0": mem0_metrics, "agent": agent_metrics}, labels=PAIR_LABELS,
+    )
+
+
+def generate_latex_tables(mem0_metrics: dict, agent_metrics: dict) -> str:
+    """Generate LaTeX table code for the paper."""
+    return generate_comparison_latex(
+        {"mem0": mem0_metrics, "agent": agent_metrics}, labels=PAIR_LABELS,
+    )
@@ -0,0 +1,76 @@
+"""Persistent cache of LLM-judge evaluations.
+
+Answers recur constantly across trials and systems ("I don't have that
+information"), so an identical judge input is judged once and reused. The
+input is the query, system answer and ground truth plus the required and
+retrieved memories: the verdict's failure modes (noise_retrieved,
+stale_memory, missing_memory) diagnose the retrieval, so one system's
+diagnosis must not be reused for another that retrieved something else.
+Entries are keyed by a content hash that also covers the judge model and the
+evaluation prompt template, so changing either one naturally starts a fresh
+cache. Stored as append-only JSONL.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+def fingerprint(*parts: str) -> str:
+    """Stable short hash of arbitrary strings (e.g. model name + template)."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class JudgeCache:
+    """Content-hashed judge results, persisted to a JSONL file."""
+
+    def __init__(self, path: str, namespace: str = ""):
+        self.path = path
+        self.namespace = namespace
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # tolerate a truncated last line
+                self._entries[record["key"]] = record["evaluation"]
+
+    def key(self, query: str, system_answer: str, correct_answer: str,
+            required_memories: str, retrieved_memories: str) -> str:
+        payload = json.dumps([self.namespace, query, system_answer, correct_answer,
+                              required_memories, retrieved_memories])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            evaluation = self._entries.get(key)
+        return dict(evaluation) if evaluation is not None else None
+
+    def put(self, key: str, evaluation: dict):
+        """Store a judge evaluation. Parse errors are never cached."""
+        if evaluation.get("rating") == "error":
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = evaluation
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"key": key, "evaluation": evaluation}) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,34 +1,46 @@
-"""Compute metrics from experiment results."""
+"""Compute metrics from experiment results.
 
-from collections import defaultdict
+Test results are flattened into one table (a row per test) in a single pass,
+and every metric is a column reduction or group-by over it, so cost stays
+linear in the number of tests however many categories and ratings there are.
+"""
+
+import pandas as pd
 from benchmark.data import FAILURE_CATEGORIES
 
+RATINGS = ["correct", "partially_correct", "incorrect"]
 
-def compute_metrics(experiment_results: dict) -> dict:
-    """Compute aggregate metrics from experiment results.
+# Per-test fields the metrics are computed from
+METRIC_COLUMNS = ["category", "rating", "failure_modes", "context_tokens"]
+
+MEAN_STATS = ["total_entries", "entries_added", "entries_updated", "entries_deleted", "llm_calls"]
+SUM_STATS = ["total_input_tokens", "total_output_tokens", "total_cached_input_tokens"]
 
-    Returns metrics at three levels:
-    1. Overall accuracy
-    2. Per-category accuracy (the failure taxonomy)
-    3. Memory efficiency metrics
-    """
-    all_tests = []
-    all_stats = []
 
+def _test_rows(experiment_results: dict) -> list[dict]:
+    rows = []
     for profile_result in experiment_results["profile_results"]:
-        for test_result in profile_result["test_results"]:
-            all_tests.append(test_result)
-        if profile_result.get("memory_stats"):
-            all_stats.append(profile_result["memory_stats"])
+        for t in profile_result["test_results"]:
+            evaluation = t["evaluation"]
+            rows.append({
+                "test_id": t["test_id"],
+                "category": t["category"],
+                "rating": evaluation.get("rating", "unknown"),
+                "failure_modes": evaluation.get("failure_modes", []),
+                "explanation": evaluation.get("explanation", ""),
+                "num_memories_retrieved": len(t.get("retrieved_memories", [])),
+                # Older results don't record the context handed to the answer model
+                "context_tokens": t.get("context_tokens"),
+            })
+    return rows
 
-    # 1. Overall accuracy
-    total = len(all_tests)
-    correct = sum(1 for t in all_tests if t["evaluation"].get("rating") == "correct")
-    partial = sum(1 for t in all_tests if t["evaluation"].get("rating") == "partially_correct")
-    incorrect = sum(1 for t in all_tests if t["evaluation"].get("rating") == "incorrect")
 
-    overall = {
-        "total_tests": total,
+def _rating_counts(frame: pd.DataFrame) -> dict:
+    total = len(frame)
+    counts = frame["rating"].value_counts()
+    correct, partial, incorrect = (int(counts.get(r, 0)) for r in RATINGS)
+    return {
+        "total": total,
         "correct": correct,
         "partially_correct": partial,
         "incorrect": incorrect,
@@ -36,70 +48,77 @@ def compute_metrics(experiment_results: dict) -> dict:
         "accuracy_with_partial": (correct + 0.5 * partial) / total if total > 0 else 0,
     }
 
-    # 2. Per-category breakdown (the failure taxonomy)
+
+def compute_metrics(experiment_results: dict) -> dict:
+    """Compute aggregate metrics from experiment results.
+
+    Returns metrics at three levels:
+    1. Overall accuracy
+    2. Per-category accuracy (the failure taxonomy)
+    3. Memory efficiency metrics
+    """
+    rows = _test_rows(experiment_results)
+    tests = pd.DataFrame({c: [r[c] for r in rows] for c in METRIC_COLUMNS})
+    all_stats = [
+        p["memory_stats"] for p in experiment_results["profile_results"] if p.get("memory_stats")
+    ]
+
+    # 1. Overall accuracy
+    counts = _rating_counts(tests)
+    overall = {"total_tests": counts.pop("total"), **counts}
+
+    # 2. Per-category breakdown (the failure taxonomy), one group-by
+    by_rating = (
+        tests.groupby(["category", "rating"], dropna=False).size()
+        .unstack(fill_value=0)
+        .reindex(columns=RATINGS, fill_value=0)
+    )
+    totals = tests.groupby("category").size()
     by_category = {}
     for cat in FAILURE_CATEGORIES:
-        cat_tests = [t for t in all_tests if t["category"] == cat]
-        if not cat_tests:
+        total = int(totals.get(cat, 0))
+        if not total:
             by_category[cat] = {"total": 0, "correct": 0, "accuracy": 0}
             continue
-        cat_correct = sum(1 for t in cat_tests if t["evaluation"].get("rating") == "correct")
-        cat_partial = sum(1 for t in cat_tests if t["evaluation"].get("rating") == "partially_correct")
+        cat_correct = int(by_rating.at[cat, "correct"])
+        cat_partial = int(by_rating.at[cat, "partially_correct"])
         by_category[cat] = {
-            "total": len(cat_tests),
+            "total": total,
             "correct": cat_correct,
             "partially_correct": cat_partial,
-            "incorrect": len(cat_tests) - cat_correct - cat_partial,
-            "accuracy": cat_correct / len(cat_tests),
-            "accuracy_with_partial": (cat_correct + 0.5 * cat_partial) / len(cat_tests),
+            # Anything not rated correct or partial, parse errors included
+            "incorrect": total - cat_correct - cat_partial,
+            "accuracy": cat_correct / total,
+            "accuracy_with_partial": (cat_correct + 0.5 * cat_partial) / total,
         }
 
-    # 3. Failure mode analysis
-    failure_modes = defaultdict(int)
-    for t in all_tests:
-        for mode in t["evaluation"].get("failure_modes", []):
-            failure_modes[mode] += 1
+    # 3. Failure mode analysis (first-seen order)
+    modes = tests["failure_modes"].explode().dropna()
+    failure_modes = {mode: int(n) for mode, n in modes.value_counts(sort=False).items()}
 
     # 4. Memory efficiency
-    memory_efficiency = {
-        "avg_total_entries": 0,
-        "avg_entries_added": 0,
-        "avg_entries_updated": 0,
-        "avg_entries_deleted": 0,
-        "avg_llm_calls": 0,
-        "total_input_tokens": 0,
-        "total_output_tokens": 0,
-    }
+    memory_efficiency = {f"avg_{k}": 0 for k in MEAN_STATS}
+    memory_efficiency.update({k: 0 for k in SUM_STATS})
     if all_stats:
-        n = len(all_stats)
-        memory_efficiency = {
-            "avg_total_entries": sum(s["total_entries"] for s in all_stats) / n,
-            "avg_entries_added": sum(s["entries_added"] for s in all_stats) / n,
-            "avg_entries_updated": sum(s["entries_updated"] for s in all_stats) / n,
-            "avg_entries_deleted": sum(s["entries_deleted"] for s in all_stats) / n,
-            "avg_llm_calls": sum(s["llm_calls"] for s in all_stats) / n,
-            "total_input_tokens": sum(s["total_input_tokens"] for s in all_stats),
-            "total_output_tokens": sum(s["total_output_tokens"] for s in all_stats),
-        }
+        stats = pd.DataFrame(all_stats, columns=MEAN_STATS + SUM_STATS)
+        means = stats[MEAN_STATS].mean()
+        sums = stats[SUM_STATS].sum()
+        memory_efficiency = {f"avg_{k}": float(means[k]) for k in MEAN_STATS}
+        memory_efficiency.update({k: int(sums[k]) for k in SUM_STATS})
 
-    # 5. Per-test detailed results (for the paper)
-    test_details = []
-    for t in all_tests:
-        test_details.append({
-            "test_id": t["test_id"],
-            "category": t["category"],
-            "rating": t["evaluation"].get("rating", "unknown"),
-            "failure_modes": t["evaluation"].get("failure_modes", []),
-            "explanation": t["evaluation"].get("explanation", ""),
-            "num_memories_retrieved": len(t.get("retrieved_memories", [])),
-        })
+    # Memory context handed to the answer model
+    context_tokens = tests["context_tokens"].dropna()
+    if not context_tokens.empty:
+        memory_efficiency["avg_context_tokens"] = float(context_tokens.mean())
+        memory_efficiency["max_context_tokens"] = int(context_tokens.max())
 
     return {
         "system_name": experiment_results["system_name"],
         "overall": overall,
         "by_category": by_category,
-        "failure_modes": dict(failure_modes),
+        "failure_modes": failure_modes,
         "memory_efficiency": memory_efficiency,
-        "test_details": test_details,
+        # 5. Per-test detailed results (for the paper)
+        "test_details": rows,
         "eval_costs": experiment_results.get("eval_costs", {}),
     }
@@ -0,0 +1,1095 @@
+"""Systems-level performance workloads for memory systems.
+
+The accuracy benchmark tells us whether a system remembers the right things;
+these workloads tell us what it costs to do so. Every system is driven through
+the same three standardized workloads built from the benchmark sessions:
+
+0. startup — construct one system per profile, with and without the
+             per-process client pool, measure construction latency
+1. ingest  — feed N training sessions, measure turns/sec and per-session latency
+2. search  — run M test queries, measure p50/p99 search latency
+3. growth  — keep feeding sessions to one user until the store holds K entries,
+             measure bytes per stored memory
+
+Component workloads isolate a single piece of a system instead: langmem_index
+compares LangGraph's InMemoryStore with and without its embedding index,
+langmem_existing tracks LangMem's extraction prompt size session by session,
+retrieval compares vector, BM25 and hybrid ranking of memories, coalescer
+measures how many embedding calls concurrent profiles make with and without
+cross-thread batching, backfill compares the agent's per-turn ingestion with
+its batched-session backfill mode, prompt_cache compares agent call latency
+and input cost with and without a cacheable static prompt prefix,
+multi_tenant load-tests MultiTenantMemory with thousands of simulated users,
+and imports reports what importing each package and entry point costs,
+failing if a light one pulls in a heavy dependency.
+
+OpenAI API calls are counted at the HTTP layer, so systems whose SDKs call the
+API internally (Mem0, LangMem) are measured the same way as our own code.
+"""
+
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from benchmark.data import PROFILES
+
+
+# ---------------------------------------------------------------------------
+# Workload inputs
+# ---------------------------------------------------------------------------
+
+def training_sessions(profile: dict) -> list[tuple[list[dict], int]]:
+    """Return (turns, session_id) for a profile's ingestible sessions.
+
+    Mirrors ExperimentRunner.run_single_profile: session 5 is test-only and
+    [MEMORY TEST] placeholder turns are dropped.
+    """
+    sessions = []
+    for session in profile["sessions"]:
+        if session["session_id"] >= 5:
+            continue
+        real_turns = [t for t in session["turns"] if "[MEMORY TEST]" not in t.get("content", "")]
+        if real_turns:
+            sessions.append((real_turns, session["session_id"]))
+    return sessions
+
+
+def _count_user_turns(turns: list[dict]) -> int:
+    return sum(1 for t in turns if t["role"] == "user")
+
+
+def _percentiles(latencies: list[float]) -> dict:
+    if not latencies:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ms = np.array(latencies) * 1000.0
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+# ---------------------------------------------------------------------------
+# API call accounting
+# ---------------------------------------------------------------------------
+
+class ApiCallCounter:
+    """Counts outgoing OpenAI HTTP requests by endpoint.
+
+    Patches httpx's send methods for the duration of the context, so every
+    client in the process is covered — including the ones Mem0 and LangMem
+    construct internally.
+    """
+
+    def __init__(self):
+        self.completions = 0
+        self.embeddings = 0
+        self.other = 0
+        self._originals = None
+
+    def _record(self, request):
+        path = request.url.path
+        if path.endswith("/chat/completions"):
+            self.completions += 1
+        elif path.endswith("/embeddings"):
+            self.embeddings += 1
+        else:
+            self.other += 1
+
+    def __enter__(self):
+        import httpx
+
+        counter = self
+        sync_send = httpx.Client.send
+        async_send = httpx.AsyncClient.send
+
+        def send(client, request, *args, **kwargs):
+            counter._record(request)
+            return sync_send(client, request, *args, **kwargs)
+
+        async def asend(client, request, *args, **kwargs):
+            counter._record(request)
+            return await async_send(client, request, *args, **kwargs)
+
+        self._originals = (sync_send, async_send)
+        httpx.Client.send = send
+        httpx.AsyncClient.send = asend
+        return self
+
+    def __exit__(self, *exc):
+        import httpx
+
+        httpx.Client.send, httpx.AsyncClient.send = self._originals
+        return False
+
+    def snapshot(self) -> dict:
+        return {
+            "completions": self.completions,
+            "embeddings": self.embeddings,
+            "other": self.other,
+            "total": self.completions + self.embeddings + self.other,
+        }
+
+
+def _per_unit(calls: dict, units: int) -> dict:
+    return {k: (v / units if units else 0.0) for k, v in calls.items()}
+
+
+def _diff(after: dict, before: dict) -> dict:
+    return {k: after[k] - before[k] for k in after}
+
+
+# ---------------------------------------------------------------------------
+# Workloads
+# ---------------------------------------------------------------------------
+
+def run_startup_workload(factory, profiles: list[dict], pooled: bool) -> dict:
+    """Time constructing one memory system per profile, from an empty pool.
+
+    With pooled=False every client is rebuilt per profile (the old behavior);
+    with pooled=True only the first profile pays for them.
+    """
+    from memory_systems import resources
+
+    resources.clear()
+    resources.set_pooling(pooled)
+    latencies = []
+    try:
+        for profile in profiles:
+            t0 = time.perf_counter()
+            factory(profile["user_id"])
+            latencies.append(time.perf_counter() - t0)
+    finally:
+        resources.set_pooling(True)
+    return {
+        "profiles": len(latencies),
+        "first_ms": latencies[0] * 1000.0 if latencies else 0.0,
+        "latency": _percentiles(latencies),
+    }
+
+
+def run_ingest_workload(factory, profiles: list[dict], num_sessions: int,
+                        counter: ApiCallCounter) -> tuple[dict, dict]:
+    """Feed up to num_sessions training sessions, one fresh system per profile.
+
+    Returns (metrics, systems) where systems maps user_id -> populated system,
+    so the search workload can query the same stores.
+    """
+    systems = {}
+    session_latencies = []
+    turns_ingested = 0
+    sessions_ingested = 0
+    calls_before = counter.snapshot()
+    start = time.perf_counter()
+
+    for profile in profiles:
+        if sessions_ingested >= num_sessions:
+            break
+        system = factory(profile["user_id"])
+        systems[profile["user_id"]] = system
+        for turns, session_id in training_sessions(profile):
+            if sessions_ingested >= num_sessions:
+                break
+            t0 = time.perf_counter()
+            system.add_conversation(turns, session_id)
+            session_latencies.append(time.perf_counter() - t0)
+            turns_ingested += _count_user_turns(turns)
+            sessions_ingested += 1
+
+    elapsed = time.perf_counter() - start
+    calls = _diff(counter.snapshot(), calls_before)
+
+    metrics = {
+        "sessions": sessions_ingested,
+        "user_turns": turns_ingested,
+        "seconds": elapsed,
+        "turns_per_sec": turns_ingested / elapsed if elapsed > 0 else 0.0,
+        "session_latency": _percentiles(session_latencies),
+        "api_calls": calls,
+        "api_calls_per_session": _per_unit(calls, sessions_ingested),
+    }
+    return metrics, systems
+
+
+def run_search_workload(systems: dict, profiles: list[dict], num_searches: int,
+                        counter: ApiCallCounter, top_k: int = 5) -> dict:
+    """Run num_searches test queries round-robin against the ingested stores."""
+    queries = [
+        (profile["user_id"], test["query"])
+        for profile in profiles
+        if profile["user_id"] in systems
+        for test in profile["memory_tests"]
+    ]
+    if not queries:
+        return {"searches": 0, "latency": _percentiles([]), "api_calls": {}}
+
+    latencies = []
+    results_returned = 0
+    calls_before = counter.snapshot()
+
+    for i in range(num_searches):
+        user_id, query = queries[i % len(queries)]
+        t0 = time.perf_counter()
+        results = systems[user_id].search(query, top_k=top_k)
+        latencies.append(time.perf_counter() - t0)
+        results_returned += len(results)
+
+    calls = _diff(counter.snapshot(), calls_before)
+    return {
+        "searches": num_searches,
+        "latency": _percentiles(latencies),
+        "avg_results": results_returned / num_searches if num_searches else 0.0,
+        "api_calls": calls,
+        "api_calls_per_search": _per_unit(calls, num_searches),
+    }
+
+
+def run_growth_workload(factory, profiles: list[dict], target_entries: int) -> dict:
+    """Grow a single user's store towards target_entries and measure its footprint.
+
+    Sessions from every profile are replayed into one store until it holds
+    target_entries memories or the session pool is exhausted (systems that
+    consolidate aggressively may never reach the target).
+    """
+    session_pool = [s for profile in profiles for s in training_sessions(profile)]
+    system = factory("perf_growth_user")
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    sessions_used = 0
+    entries = 0
+    try:
+        for offset, (turns, _session_id) in enumerate(session_pool):
+            system.add_conversation(turns, offset + 1)
+            sessions_used += 1
+            entries = len(system.get_all())
+            if entries >= target_entries:
+                break
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stored = system.get_all()
+    content_bytes = sum(len(m.content.encode("utf-8")) for m in stored)
+    grown = current - baseline
+    return {
+        "target_entries": target_entries,
+        "entries": entries,
+        "sessions": sessions_used,
+        "reached_target": entries >= target_entries,
+        "traced_bytes": grown,
+        "traced_peak_bytes": peak - baseline,
+        "bytes_per_memory": grown / entries if entries else 0.0,
+        "content_bytes_per_memory": content_bytes / len(stored) if stored else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Component workloads
+# ---------------------------------------------------------------------------
+
+def _matches(required: str, retrieved: list[str]) -> bool:
+    """True if some retrieved text covers most of required's words."""
+    from evaluation.retrieval_eval import OVERLAP_THRESHOLD, token_overlap
+
+    return any(token_overlap(required, r) >= OVERLAP_THRESHOLD for r in retrieved)
+
+
+def _ground_truth_facts(profile: dict) -> list[str]:
+    return [
+        m["fact"]
+        for session in profile["sessions"]
+        for m in session.get("expected_memories_after", [])
+    ]
+
+
+def run_langmem_index_workload(embedder, profiles: list[dict], top_k: int = 5) -> dict:
+    """LangGraph InMemoryStore retrieval with and without the embedding index.
+
+    Each profile's ground-truth facts are loaded into its own namespace and
+    searched with that profile's test queries. Reports put cost (one embedding
+    call per memory vs one per batch), search latency, and how often a
+    required memory makes the top_k.
+    """
+    from langgraph.store.base import PutOp
+    from langgraph.store.memory import InMemoryStore
+    from memory_systems.embedder import clear_memo
+
+    embed_calls = [0]
+
+    def embed(texts):
+        embed_calls[0] += 1
+        return embedder.embed_batch(list(texts))
+
+    def index():
+        return {"dims": len(embedder.embed("dimension probe")), "embed": embed, "fields": ["text"]}
+
+    modes = {
+        "unindexed": (lambda: InMemoryStore(), True),
+        "indexed_per_item_put": (lambda: InMemoryStore(index=index()), False),
+        "indexed_batched_put": (lambda: InMemoryStore(index=index()), True),
+    }
+    report = {}
+    for mode, (make_store, batched) in modes.items():
+        clear_memo()  # every mode pays for its own embeddings
+        store = make_store()
+        embed_calls[0] = 0
+        t0 = time.perf_counter()
+        num_facts = 0
+        for profile in profiles:
+            namespace = (profile["user_id"], "memories")
+            facts = _ground_truth_facts(profile)
+            num_facts += len(facts)
+            if batched:
+                store.batch([PutOp(namespace, str(i), {"text": f}) for i, f in enumerate(facts)])
+            else:
+                for i, fact in enumerate(facts):
+                    store.put(namespace, str(i), {"text": fact})
+        put_seconds = time.perf_counter() - t0
+        put_calls = embed_calls[0]
+
+        latencies = []
+        hits = 0
+        total = 0
+        for profile in profiles:
+            namespace = (profile["user_id"], "memories")
+            for test in profile["memory_tests"]:
+                t0 = time.perf_counter()
+                items = store.search(namespace, query=test["query"], limit=top_k)
+                latencies.append(time.perf_counter() - t0)
+                retrieved = [item.value["text"] for item in items]
+                for required in test["required_memories"]:
+                    total += 1
+                    hits += _matches(required, retrieved)
+
+        report[mode] = {
+            "memories": num_facts,
+            "put_seconds": put_seconds,
+            "put_embedding_calls": put_calls,
+            "search_latency": _percentiles(latencies),
+            "required_recall_at_k": hits / total if total else 0.0,
+        }
+    return report
+
+
+def run_retrieval_workload(embedder, profiles: list[dict], top_k: int = 5) -> dict:
+    """Vector vs BM25 vs hybrid (RRF) ranking over ground-truth memories.
+
+    Each profile's expected facts are embedded and keyword-indexed once, the
+    test queries are embedded once, and only the ranking step is timed, so
+    the modes are compared on equal inputs. Recall counts a required memory
+    as found when some top_k result covers most of its words.
+    """
+    from benchmark.data import FAILURE_CATEGORIES
+    from memory_systems.bm25 import BM25Index, reciprocal_rank_fusion
+
+    def vector_rank(ctx, query, query_vec):
+        return [fid for fid, _ in embedder.rank(query_vec, ctx["vectors"], top_k=len(ctx["vectors"]))]
+
+    def keyword_rank(ctx, query, query_vec):
+        return [fid for fid, _ in ctx["bm25"].search(query, top_k=len(ctx["bm25"]))]
+
+    def hybrid_rank(ctx, query, query_vec):
+        fused = reciprocal_rank_fusion([vector_rank(ctx, query, query_vec),
+                                        keyword_rank(ctx, query, query_vec)])
+        return [fid for fid, _ in fused]
+
+    contexts = []
+    index_seconds = 0.0
+    for profile in profiles:
+        facts = {str(i): fact for i, fact in enumerate(_ground_truth_facts(profile))}
+        if not facts:
+            continue
+        vectors = dict(zip(facts, embedder.embed_batch(list(facts.values()))))
+        t0 = time.perf_counter()
+        bm25 = BM25Index()
+        for fid, fact in facts.items():
+            bm25.add(fid, fact)
+        index_seconds += time.perf_counter() - t0
+        tests = profile["memory_tests"]
+        query_vecs = embedder.embed_batch([t["query"] for t in tests])
+        contexts.append({"facts": facts, "vectors": vectors, "bm25": bm25,
+                         "tests": list(zip(tests, query_vecs))})
+
+    report = {"bm25_index_seconds": index_seconds, "modes": {}}
+    for mode, rank in (("vector", vector_rank), ("bm25", keyword_rank), ("hybrid", hybrid_rank)):
+        latencies = []
+        hits = {cat: 0 for cat in FAILURE_CATEGORIES}
+        totals = {cat: 0 for cat in FAILURE_CATEGORIES}
+        for ctx in contexts:
+            for test, query_vec in ctx["tests"]:
+                t0 = time.perf_counter()
+                ranked = rank(ctx, test["query"], query_vec)[:top_k]
+                latencies.append(time.perf_counter() - t0)
+                retrieved = [ctx["facts"][fid] for fid in ranked]
+                category = test["category"]
+                for required in test["required_memories"]:
+                    totals[category] = totals.get(category, 0) + 1
+                    hits[category] = hits.get(category, 0) + _matches(required, retrieved)
+        total = sum(totals.values())
+        report["modes"][mode] = {
+            "rank_latency": _percentiles(latencies),
+            "recall_at_k": sum(hits.values()) / total if total else 0.0,
+            "recall_by_category": {
+                cat: hits[cat] / totals[cat] for cat in totals if totals[cat]
+            },
+        }
+    return report
+
+
+def run_langmem_existing_workload(profiles: list[dict], existing_top_k: int = 10) -> dict:
+    """Per-session LangMem extraction prompt size, full vs top-k existing memories.
+
+    Feeds each profile's training sessions to two LangMemMemory instances and
+    reports the estimated manager prompt tokens for every session, so the
+    growth curve of the full-history mode is visible next to the bounded one.
+    """
+    from memory_systems.langmem_memory import LangMemMemory
+
+    report = {}
+    for mode, top_k in (("all_existing", None), (f"top_{existing_top_k}_existing", existing_top_k)):
+        curves = []
+        entries = 0
+        t0 = time.perf_counter()
+        with ApiCallCounter() as counter:
+            for profile in profiles:
+                system = LangMemMemory(user_id=profile["user_id"], existing_top_k=top_k)
+                for turns, session_id in training_sessions(profile):
+                    system.add_conversation(turns, session_id)
+                curves.append(system.prompt_tokens_per_session)
+                entries += len(system.get_all())
+        elapsed = time.perf_counter() - t0
+
+        longest = max((len(c) for c in curves), default=0)
+        mean_curve = [
+            float(np.mean([c[i] for c in curves if len(c) > i])) for i in range(longest)
+        ]
+        report[mode] = {
+            "prompt_tokens_per_session": mean_curve,
+            "total_prompt_tokens": int(sum(sum(c) for c in curves)),
+            "entries": entries,
+            "seconds": elapsed,
+            "api_calls": counter.snapshot(),
+        }
+    return report
+
+
+def run_coalescer_workload(api_key: str, profiles: list[dict], threads: int = 8) -> dict:
+    """Concurrent per-turn embedding, with and without the cross-thread coalescer.
+
+    One thread per profile (up to `threads` at a time) embeds that profile's
+    user turns one request at a time, the way memory systems do during
+    ingest. Reports embedding HTTP calls, wall time and per-request latency;
+    the memo is cleared before each mode so both pay for every text.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from memory_systems import resources
+    from memory_systems.embedder import clear_memo
+
+    texts_by_profile = [
+        [t["content"] for turns, _ in training_sessions(p) for t in turns if t["role"] == "user"]
+        for p in profiles
+    ]
+    report = {}
+    for mode, coalescing in (("direct", False), ("coalesced", True)):
+        resources.clear()
+        clear_memo()
+        resources.set_coalescing(coalescing)
+        embedder = resources.embedder(api_key)
+        latencies = []
+
+        def embed_profile(texts):
+            for text in texts:
+                t0 = time.perf_counter()
+                embedder.embed(text)
+                latencies.append(time.perf_counter() - t0)
+
+        try:
+            with ApiCallCounter() as counter:
+                t0 = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=threads) as pool:
+                    list(pool.map(embed_profile, texts_by_profile))
+                elapsed = time.perf_counter() - t0
+        finally:
+            resources.set_coalescing(False)
+        report[mode] = {
+            "requests": len(latencies),
+            "embedding_calls": counter.snapshot()["embeddings"],
+            "seconds": elapsed,
+            "request_latency": _percentiles(latencies),
+        }
+        if coalescing:
+            report[mode]["coalescer"] = resources.coalescer_stats()
+    resources.clear()
+    report["threads"] = threads
+    report["max_wait_ms"] = resources.COALESCE_MAX_WAIT_MS
+    return report
+
+
+def run_backfill_workload(api_key: str, model: str, profiles: list[dict],
+                          backfill_sizes: list[int] = (1, 4), top_k: int = 5) -> dict:
+    """Agent-driven ingestion per turn vs in backfill mode, N sessions per call.
+
+    Each mode ingests every profile's training sessions into a fresh
+    AgentDrivenMemory and reports wall time, user turns/sec, LLM calls and
+    tokens. Accuracy is measured without the judge: recall@top_k of each
+    test's required memories from search(), and the share of the profile's
+    ground-truth facts that some stored memory covers. For judged accuracy,
+    run run_experiment.py --system agent_backfill.
+    """
+    from benchmark.data import FAILURE_CATEGORIES
+    from memory_systems.agent_driven import AgentDrivenMemory
+    from memory_systems.embedder import clear_memo
+
+    modes = [("per_turn", 0)] + [(f"backfill_{n}", n) for n in backfill_sizes]
+    report = {}
+    for mode, backfill_sessions in modes:
+        clear_memo()
+        seconds = 0.0
+        user_turns = entries = facts = facts_covered = 0
+        llm_calls = input_tokens = output_tokens = 0
+        hits = {cat: 0 for cat in FAILURE_CATEGORIES}
+        totals = {cat: 0 for cat in FAILURE_CATEGORIES}
+        for profile in profiles:
+            system = AgentDrivenMemory(profile["user_id"], openai_api_key=api_key, model=model,
+                                       backfill_sessions=backfill_sessions)
+            sessions = training_sessions(profile)
+            t0 = time.perf_counter()
+            system.add_sessions(sessions)
+            seconds += time.perf_counter() - t0
+            user_turns += sum(_count_user_turns(turns) for turns, _ in sessions)
+
+            stored = [m.content for m in system.get_all()]
+            entries += len(stored)
+            for fact in _ground_truth_facts(profile):
+                facts += 1
+                facts_covered += _matches(fact, stored)
+            for test in profile["memory_tests"]:
+                retrieved = [m.content for m in system.search(test["query"], top_k=top_k)]
+                category = test["category"]
+                for required in test["required_memories"]:
+                    totals[category] = totals.get(category, 0) + 1
+                    hits[category] = hits.get(category, 0) + _matches(required, retrieved)
+
+            stats = system.get_stats()
+            llm_calls += stats.llm_calls
+            input_tokens += stats.total_input_tokens
+            output_tokens += stats.total_output_tokens
+
+        total = sum(totals.values())
+        report[mode] = {
+            "backfill_sessions": backfill_sessions,
+            "seconds": seconds,
+            "user_turns": user_turns,
+            "turns_per_sec": user_turns / seconds if seconds > 0 else 0.0,
+            "llm_calls": llm_calls,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "entries": entries,
+            "fact_coverage": facts_covered / facts if facts else 0.0,
+            "recall_at_k": sum(hits.values()) / total if total else 0.0,
+            "recall_by_category": {cat: hits[cat] / totals[cat] for cat in totals if totals[cat]},
+        }
+    report["model"] = model
+    report["top_k"] = top_k
+    return report
+
+
+def run_prompt_cache_workload(api_key: str, model: str, profiles: list[dict],
+                              max_calls: int = 40) -> dict:
+    """Agent conversation calls with a volatile-first vs a stable-prefix layout.
+
+    Replays the agent's per-turn prompts (recent user messages stand in for
+    retrieved memories) in two layouts: "volatile_first", one user message
+    with memories and transcript before the static instructions (the layout
+    before the system/user split), and "stable_prefix", the static system
+    message followed by the per-turn user message, as AgentDrivenMemory sends
+    them. Responses are capped at one token, so latency is prompt processing
+    plus the round trip, which is what a prefix cache hit shortens.
+    """
+    from evaluation.cost_model import PRICING
+    from memory_systems import resources
+    from memory_systems.agent_driven import CONVERSATION_PROMPT, CONVERSATION_SYSTEM_PROMPT
+    from memory_systems.tokens import cached_prompt_tokens
+
+    def format_turns(turns):
+        return "\n".join(f"{'User' if t['role'] == 'user' else 'Assistant'}: {t['content']}" for t in turns)
+
+    calls = []
+    for profile in profiles:
+        seen = []
+        for turns, session_id in training_sessions(profile):
+            so_far = []
+            for turn in turns:
+                so_far.append(turn)
+                if turn["role"] != "user":
+                    continue
+                memories = "\n".join(f"[m{i}] {text}" for i, text in enumerate(seen[-5:])) or "(No memories stored yet)"
+                calls.append((session_id, format_turns(so_far), memories))
+                seen.append(turn["content"])
+    calls = calls[:max_calls]
+
+    client = resources.openai_client(api_key)
+    prices = PRICING.get(model, PRICING["gpt-4o-mini"])
+    report = {}
+    for mode in ("volatile_first", "stable_prefix"):
+        latencies = []
+        prompt_tokens = cached_tokens = 0
+        for session_id, conversation, memories in calls:
+            if mode == "stable_prefix":
+                messages = [
+                    {"role": "system", "content": CONVERSATION_SYSTEM_PROMPT},
+                    {"role": "user", "content": CONVERSATION_PROMPT.format(
+                        session_id=session_id, conversation=conversation, retrieved_memories=memories)},
+                ]
+            else:
+                messages = [{"role": "user", "content": (
+                    f"## Your Current Memories\n{memories}\n\n"
+                    f"## Conversation So Far (Session {session_id})\n{conversation}\n\n"
+                    f"{CONVERSATION_SYSTEM_PROMPT}"
+                )}]
+            t0 = time.perf_counter()
+            response = client.chat.completions.create(model=model, max_tokens=1, messages=messages)
+            latencies.append(time.perf_counter() - t0)
+            prompt_tokens += response.usage.prompt_tokens
+            cached_tokens += cached_prompt_tokens(response.usage)
+        report[mode] = {
+            "calls": len(latencies),
+            "latency": _percentiles(latencies),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "cached_share": cached_tokens / prompt_tokens if prompt_tokens else 0.0,
+            "input_cost_usd": ((prompt_tokens - cached_tokens) * prices["input"]
+                               + cached_tokens * prices["cached_input"]) / 1e6,
+        }
+    before, after = report["volatile_first"], report["stable_prefix"]
+    report["reduction"] = {
+        "p50_latency": 1 - after["latency"]["p50_ms"] / before["latency"]["p50_ms"] if before["calls"] else 0.0,
+        "mean_latency": 1 - after["latency"]["mean_ms"] / before["latency"]["mean_ms"] if before["calls"] else 0.0,
+        "input_cost": 1 - after["input_cost_usd"] / before["input_cost_usd"] if before["input_cost_usd"] else 0.0,
+    }
+    report["model"] = model
+    return report
+
+
+def _hashing_embedder(dim: int = 256):
+    """Offline, deterministic Embedder: signed feature hashing of word unigrams
+    and bigrams. Lets a load test run thousands of users without the API."""
+    import hashlib
+    import re
+
+    from memory_systems.embedder import Embedder
+
+    class HashingEmbedder(Embedder):
+        def __init__(self):
+            self.client = None
+            self.coalescer = None
+            self.model = f"hashing-{dim}"
+
+        def _request(self, texts: list[str]) -> list[list[float]]:
+            vectors = []
+            for text in texts:
+                vector = [0.0] * dim
+                words = re.findall(r"[a-z0-9']+", text.lower())
+                for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                    h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                    vector[h % dim] += 1.0 if h >> 63 else -1.0
+                vectors.append(vector)
+            return vectors
+
+    return HashingEmbedder()
+
+
+def run_multi_tenant_workload(profiles: list[dict], users: int = 2000, max_resident: int = 200,
+                              threads: int = 8, requests_per_user: int = 5, write_share: float = 0.1,
+                              top_k: int = 5, seed: int = 0) -> dict:
+    """Thousands of simulated users served by one MultiTenantMemory.
+
+    Simulated user i is a copy of profile i % len(profiles) under its own user
+    id. Three phases, each from `threads` threads:
+
+    1. ingest — every user's sessions are loaded one session at a time, each
+       session's expected_memories_after facts imported as memories
+    2. serve — a skewed request stream (80% of requests go to 20% of users) of
+       test-query searches, with write_share of requests adding a memory
+    3. verify — every user's store is read back, paging in whoever is on disk
+
+    Memories are imported rather than extracted by the LLM and embedded with
+    an offline hashing embedder, so no API key is needed and the numbers
+    measure the manager (locking, paging, shared matrix), not the network.
+    Reports throughput, latency, paging, footprint, judge-free recall@top_k,
+    searches that returned another user's memory, and memories lost across
+    page-outs.
+    """
+    import random
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    from memory_systems.agent_driven import AgentDrivenMemory
+    from memory_systems.base import MemoryEntry
+    from memory_systems.multi_tenant import MultiTenantMemory
+
+    embedder = _hashing_embedder()
+    snapshot_dir = tempfile.mkdtemp(prefix="multi_tenant_")
+    # The LLM client is built but never called on the import path
+    service = MultiTenantMemory(snapshot_dir, max_resident=max_resident, factory=lambda uid, vectors: (
+        AgentDrivenMemory(uid, openai_api_key="offline", embedder=embedder, vectors=vectors)
+    ))
+    tenants = [(f"{profiles[i % len(profiles)]['user_id']}_sim{i:05d}", profiles[i % len(profiles)])
+               for i in range(users)]
+    expected = {uid: 0 for uid, _ in tenants}
+    report = {"users": users, "max_resident": max_resident, "threads": threads, "top_k": top_k}
+
+    def timed(pool_fn, items):
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(pool_fn, items))
+        return results, time.perf_counter() - t0
+
+    try:
+        # 1. ingest
+        def ingest(tenant):
+            uid, profile = tenant
+            latencies = []
+            for session in profile["sessions"]:
+                sid = session["session_id"]
+                memories = [
+                    MemoryEntry(id=f"{uid}/{sid}.{j}", content=m["fact"], created_at=sid, updated_at=sid)
+                    for j, m in enumerate(session.get("expected_memories_after", []))
+                ]
+                if memories:
+                    t0 = time.perf_counter()
+                    service.import_memories(uid, memories)
+                    latencies.append(time.perf_counter() - t0)
+            return latencies
+
+        for uid, profile in tenants:
+            expected[uid] = len(_ground_truth_facts(profile))
+        latencies, seconds = timed(ingest, tenants)
+        latencies = [s for per_user in latencies for s in per_user]
+        report["ingest"] = {
+            "sessions": len(latencies),
+            "seconds": seconds,
+            "sessions_per_sec": len(latencies) / seconds if seconds > 0 else 0.0,
+            "latency": _percentiles(latencies),
+            "page_outs": service.page_outs,
+        }
+
+        # 2. serve
+        rng = random.Random(seed)
+        hot = max(1, users // 5)
+        stream = []
+        for n in range(users * requests_per_user):
+            i = rng.randrange(hot) if rng.random() < 0.8 else rng.randrange(users)
+            uid, profile = tenants[i]
+            if rng.random() < write_share:
+                fact = rng.choice(_ground_truth_facts(profile))
+                stream.append(("write", uid, MemoryEntry(id=f"{uid}/w{n}", content=f"Update: {fact}")))
+                expected[uid] += 1
+            else:
+                stream.append(("search", uid, rng.choice(profile["memory_tests"])))
+
+        def serve(request):
+            op, uid, payload = request
+            t0 = time.perf_counter()
+            if op == "write":
+                service.import_memories(uid, [payload])
+                return op, time.perf_counter() - t0, 0, 0, False
+            retrieved = service.search(uid, payload["query"], top_k=top_k)
+            elapsed = time.perf_counter() - t0
+            leaked = any(not m.id.startswith(f"{uid}/") for m in retrieved)
+            contents = [m.content for m in retrieved]
+            hits = sum(_matches(required, contents) for required in payload["required_memories"])
+            return op, elapsed, hits, len(payload["required_memories"]), leaked
+
+        page_ins, page_outs = service.page_ins, service.page_outs
+        results, seconds = timed(serve, stream)
+        searches = [r for r in results if r[0] == "search"]
+        required = sum(r[3] for r in searches)
+        report["serve"] = {
+            "requests": len(results),
+            "searches": len(searches),
+            "writes": len(results) - len(searches),
+            "seconds": seconds,
+            "requests_per_sec": len(results) / seconds if seconds > 0 else 0.0,
+            "search_latency": _percentiles([r[1] for r in searches]),
+            "write_latency": _percentiles([r[1] for r in results if r[0] == "write"]),
+            "page_ins": service.page_ins - page_ins,
+            "page_outs": service.page_outs - page_outs,
+            "recall_at_k": sum(r[2] for r in searches) / required if required else 0.0,
+            "isolation_violations": sum(r[4] for r in searches),
+        }
+
+        # 3. verify
+        page_ins = service.page_ins
+        counts, seconds = timed(lambda uid: len(service.get_all(uid)), list(expected))
+        report["verify"] = {
+            "seconds": seconds,
+            "page_ins": service.page_ins - page_ins,
+            "expected_memories": sum(expected.values()),
+            "lost_memories": sum(max(0, expected[uid] - n) for uid, n in zip(expected, counts)),
+        }
+
+        service.flush()
+        report["footprint"] = {
+            **service.stats(),
+            "snapshot_bytes": sum(
+                os.path.getsize(os.path.join(snapshot_dir, name)) for name in os.listdir(snapshot_dir)
+            ),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+    return report
+
+
+# Packages and entry points that must import without any HEAVY_MODULES;
+# heavy dependencies are imported where they're used
+LIGHT_IMPORTS = [
+    "memory_systems",
+    "evaluation",
+    "evaluation.warehouse",
+    "memory_systems.registry",
+    "run_experiment",
+    "run_perf_benchmark",
+    "analyze_results",
+    "ingest_results",
+]
+HEAVY_MODULES = [
+    "numpy", "pandas", "openai", "httpx", "matplotlib", "seaborn",
+    "mem0", "langmem", "langgraph", "qdrant_client",
+]
+# Import-time slowdowns smaller than this are not flagged as regressions
+IMPORT_NOISE_MS = 20.0
+CLI_SCRIPTS = ["run_experiment.py", "run_perf_benchmark.py", "analyze_results.py", "ingest_results.py"]
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _importtime(statement: str) -> dict[str, int]:
+    """{module: self us} from `python -X importtime` in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=_REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = {}
+    for line in out.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            rows[fields[2].strip()] = int(fields[0])
+    return rows
+
+
+def run_import_workload(modules: list[str] = None, repeats: int = 5, top: int = 5) -> dict:
+    """Import cost of each module, and `--help` latency of each CLI script.
+
+    Every measurement runs in a fresh interpreter (best of `repeats`).
+    import_ms sums the -X importtime self times of every module the import
+    loads beyond interpreter startup; heavy lists the HEAVY_MODULES among
+    them, which is a violation for LIGHT_IMPORTS.
+    """
+    startup = _importtime("pass").keys()
+    report = {"modules": {}, "cli_help_ms": {}, "violations": []}
+    for module in modules or LIGHT_IMPORTS:
+        runs = []
+        for _ in range(repeats):
+            rows = _importtime(f"import {module}")
+            runs.append({name: us for name, us in rows.items() if name not in startup})
+        best = min(runs, key=lambda rows: sum(rows.values()))
+        heavy = sorted({name.split(".")[0] for name in best if name.split(".")[0] in HEAVY_MODULES})
+        slowest = sorted(best.items(), key=lambda r: r[1], reverse=True)[:top]
+        report["modules"][module] = {
+            "import_ms": sum(best.values()) / 1000,
+            "modules_imported": len(best),
+            "heavy": heavy,
+            "slowest": [{"module": name, "self_ms": us / 1000} for name, us in slowest],
+        }
+        if heavy and module in LIGHT_IMPORTS:
+            report["violations"].append(f"{module} imports {', '.join(heavy)}")
+
+    for script in CLI_SCRIPTS:
+        timings = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, script, "--help"], cwd=_REPO_ROOT,
+                           capture_output=True, check=True)
+            timings.append(time.perf_counter() - t0)
+        report["cli_help_ms"][script] = min(timings) * 1000
+    return report
+
+
+def compare_import_reports(current: dict, baseline: dict) -> str:
+    """Render import and --help latency deltas against a baseline imports report."""
+    lines = []
+    base_commit = baseline.get("meta", {}).get("git_commit")
+    cur_commit = current.get("meta", {}).get("git_commit")
+    lines.append(f"Comparing {cur_commit} against baseline {base_commit}")
+    rows = [
+        (f"import {m}", r["import_ms"], baseline["results"]["modules"].get(m, {}).get("import_ms"))
+        for m, r in current["results"]["modules"].items()
+    ] + [
+        (f"{script} --help", ms, baseline["results"]["cli_help_ms"].get(script))
+        for script, ms in current["results"]["cli_help_ms"].items()
+    ]
+    for label, now, before in rows:
+        if before is None:
+            continue
+        change = (now - before) / before if before else 0.0
+        # Sub-millisecond imports jitter by more than 10%; require a real slowdown too
+        flag = "  REGRESSION" if change > 0.10 and now - before > IMPORT_NOISE_MS else ""
+        lines.append(f"    {label:<36} {before:>9.1f} -> {now:>9.1f} ms ({change:+.1%}){flag}")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Suite driver
+# ---------------------------------------------------------------------------
+
+def run_system_suite(system_name: str, model: str, num_sessions: int,
+                     num_searches: int, target_entries: int) -> dict:
+    """Run all workloads for one system in the current process."""
+    from memory_systems.registry import get_factory
+
+    factory = get_factory(system_name, model)
+    profiles = PROFILES
+
+    startup = {
+        "unpooled": run_startup_workload(factory, profiles, pooled=False),
+        "pooled": run_startup_workload(factory, profiles, pooled=True),
+    }
+    with ApiCallCounter() as counter:
+        ingest, systems = run_ingest_workload(factory, profiles, num_sessions, counter)
+        search = run_search_workload(systems, profiles, num_searches, counter)
+    growth = run_growth_workload(factory, profiles, target_entries)
+
+    from memory_systems.embedder import memo_stats
+
+    return {
+        "startup": startup,
+        "ingest": ingest,
+        "search": search,
+        "growth": growth,
+        "embedding_memo": memo_stats(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _run_isolated(system_name: str, *args) -> dict:
+    try:
+        return run_system_suite(system_name, *args)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def run_suite(system_names: list[str], model: str, num_sessions: int,
+              num_searches: int, target_entries: int) -> dict:
+    """Run the suite for every system, each in a fresh process.
+
+    Process isolation keeps peak RSS attributable to a single system and stops
+    one system's import side effects from leaking into another's numbers.
+    """
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model": model,
+            "workload": {
+                "sessions": num_sessions,
+                "searches": num_searches,
+                "grow_to": target_entries,
+            },
+        },
+        "systems": {},
+    }
+
+    ctx = get_context("spawn")
+    for system_name in system_names:
+        print(f"  Benchmarking {system_name}...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            future = pool.submit(
+                _run_isolated, system_name, model, num_sessions, num_searches, target_entries,
+            )
+            report["systems"][system_name] = future.result()
+
+    return report
+
+
+def git_commit() -> str | None:
+    """Current git commit of the working tree, if available."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=_REPO_ROOT,
+            capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Regression comparison
+# ---------------------------------------------------------------------------
+
+# (label, path into a system's report, True if higher is better)
+KEY_METRICS = [
+    ("startup ms/profile", ("startup", "pooled", "latency", "mean_ms"), False),
+    ("ingest turns/sec", ("ingest", "turns_per_sec"), True),
+    ("search p50 ms", ("search", "latency", "p50_ms"), False),
+    ("search p99 ms", ("search", "latency", "p99_ms"), False),
+    ("peak RSS MB", ("peak_rss_mb",), False),
+    ("bytes/memory", ("growth", "bytes_per_memory"), False),
+    ("API calls/session", ("ingest", "api_calls_per_session", "total"), False),
+]
+
+
+def _lookup(d: dict, path: tuple):
+    for key in path:
+        if not isinstance(d, dict) or key not in d:
+            return None
+        d = d[key]
+    return d
+
+
+def compare_reports(current: dict, baseline: dict) -> str:
+    """Render per-system deltas of the key metrics against a baseline report."""
+    lines = []
+    base_commit = baseline.get("meta", {}).get("git_commit")
+    cur_commit = current.get("meta", {}).get("git_commit")
+    lines.append(f"Comparing {cur_commit} against baseline {base_commit}")
+
+    for system_name, metrics in current["systems"].items():
+        base = baseline.get("systems", {}).get(system_name)
+        if not base or "error" in metrics or "error" in base:
+            continue
+        lines.append(f"\n  {system_name}")
+        for label, path, higher_is_better in KEY_METRICS:
+            now, before = _lookup(metrics, path), _lookup(base, path)
+            if now is None or before is None:
+                continue
+            change = (now - before) / before if before else 0.0
+            worse = change < 0 if higher_is_better else change > 0
+            flag = "  REGRESSION" if worse and abs(change) > 0.10 else ""
+            lines.append(f"    {label:<20} {before:>12.2f} -> {now:>12.2f} ({change:+.1%}){flag}")
+
+    return "\n".join(lines)
@@ -0,0 +1,235 @@
+"""Per-phase profiling of experiment runs (run_experiment.py --profile).
+
+A slow sweep can be slow anywhere: JSON parsing, prompt formatting, NumPy
+similarity, or waiting on the network. The runner marks each phase of a
+profile's run — setup, ingest, retrieve, answer, judge — and PhaseProfiler
+measures each one three ways:
+
+- cProfile, one profiler per (thread, phase), merged into one pstats file
+  per phase; load with `python -m pstats` or snakeviz.
+- A sampling thread that records every phase thread's Python stack at a
+  fixed interval, written as collapsed stacks (`frame;frame;frame count`)
+  that flamegraph.pl and speedscope read directly. Unlike cProfile this shows
+  where wall time goes, network waits included.
+- Optionally tracemalloc: peak traced memory per phase and the top
+  allocation sites of memory each phase retained (snapshot diffs).
+
+Python 3.12+ allows one cProfile profiler at a time per process, so with
+concurrent profiles some phase calls may go unprofiled; they are counted in
+the summary and still show up in the sampled stacks. Memory mode takes two
+whole-heap snapshots per phase call, which is slow and process-wide, so it
+needs profiles run one at a time (run_experiment.py refuses
+--profile-memory with --concurrency > 1).
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+PHASES = ["setup", "ingest", "retrieve", "answer", "judge"]
+
+# Stack sampling interval and depth
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 64
+
+# Rows in the text report, per phase
+TOP_N = 25
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class PhaseProfiler:
+    """Collects cProfile stats, sampled stacks and (optionally) allocations per phase."""
+
+    def __init__(self, memory: bool = False, sample_interval: float = SAMPLE_INTERVAL):
+        self.memory = memory
+        self.sample_interval = sample_interval
+        self._lock = threading.Lock()
+        self._profiles: dict[tuple[int, str], cProfile.Profile] = {}
+        self._active: dict[int, str] = {}  # thread id -> phase it is in
+        self._calls = Counter()
+        self._unprofiled = Counter()
+        self._seconds = Counter()
+        self._stacks = Counter()
+        self._peak_bytes = Counter()
+        self._allocations: dict[str, Counter] = {p: Counter() for p in PHASES}
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._sampler = threading.Thread(target=self._sample, daemon=True, name="phase-sampler")
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # -----------------------------------------------------------------------
+    # Collection
+    # -----------------------------------------------------------------------
+
+    def _snapshot(self):
+        # The profiler's own bookkeeping isn't part of any phase
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+    @contextmanager
+    def phase(self, name: str):
+        """Profile the enclosed block as one call of phase `name`."""
+        thread = threading.get_ident()
+        with self._lock:
+            profile = self._profiles.get((thread, name)) or cProfile.Profile()
+            self._calls[name] += 1
+        before = None
+        if self.memory:
+            before = self._snapshot()
+            tracemalloc.reset_peak()
+        # Marked active only between the snapshots, so the sampler doesn't
+        # count tracemalloc's own work as the phase's
+        with self._lock:
+            self._active[thread] = name
+        try:
+            profile.enable()
+        except ValueError:
+            # Another thread's profiler is active (Python 3.12+); a profile
+            # that never ran has no stats and would break phase_stats
+            profile = None
+        else:
+            with self._lock:
+                self._profiles[(thread, name)] = profile
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self._active.pop(thread, None)
+            diff = None
+            if before is not None:
+                peak = tracemalloc.get_traced_memory()[1]
+                diff = self._snapshot().compare_to(before, "lineno")
+            with self._lock:
+                self._seconds[name] += elapsed
+                if profile is None:
+                    self._unprofiled[name] += 1
+                if diff is not None:
+                    self._peak_bytes[name] = max(self._peak_bytes[name], peak)
+                    for stat in diff:
+                        if stat.size_diff > 0:
+                            frame = stat.traceback[0]
+                            self._allocations[name][f"{frame.filename}:{frame.lineno}"] += stat.size_diff
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread, name in active.items():
+                frame = frames.get(thread)
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    if frame.f_code.co_filename != __file__:
+                        stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self._stacks[";".join([name] + stack[::-1])] += 1
+
+    # -----------------------------------------------------------------------
+    # Reports
+    # -----------------------------------------------------------------------
+
+    def phase_stats(self, name: str) -> pstats.Stats | None:
+        """cProfile stats for a phase, merged across threads."""
+        profiles = [p for (_, phase), p in self._profiles.items() if phase == name]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for p in profiles[1:]:
+            stats.add(p)
+        return stats
+
+    def summary(self) -> dict:
+        phases = {}
+        for name in PHASES:
+            if not self._calls[name]:
+                continue
+            phases[name] = {
+                "calls": self._calls[name],
+                "unprofiled_calls": self._unprofiled[name],
+                "seconds": self._seconds[name],
+                "samples": sum(n for stack, n in self._stacks.items() if stack.split(";", 1)[0] == name),
+            }
+            if self.memory:
+                phases[name]["peak_traced_mb"] = self._peak_bytes[name] / (1024 * 1024)
+                phases[name]["retained_mb"] = sum(self._allocations[name].values()) / (1024 * 1024)
+        return {"sample_interval_ms": self.sample_interval * 1000, "phases": phases}
+
+    def write(self, output_dir: str, prefix: str, top: int = TOP_N) -> dict:
+        """Write <prefix>_<phase>.pstats, <prefix>.collapsed, <prefix>_profile.txt
+        and <prefix>_profile.json; returns the summary with the written paths."""
+        os.makedirs(output_dir, exist_ok=True)
+        summary = self.summary()
+        report = io.StringIO()
+        paths = {}
+
+        for name, phase in summary["phases"].items():
+            report.write(f"{'=' * 80}\n{name.upper()}: {phase['calls']} calls, "
+                         f"{phase['seconds']:.2f} s wall\n{'=' * 80}\n")
+            stats = self.phase_stats(name)
+            if stats is not None:
+                path = os.path.join(output_dir, f"{prefix}_{name}.pstats")
+                stats.dump_stats(path)
+                paths[f"{name}_pstats"] = path
+                stats.stream = report
+                stats.sort_stats("cumulative").print_stats(top)
+            if self.memory:
+                report.write(f"Top allocation sites (retained, peak {phase['peak_traced_mb']:.1f} MB):\n")
+                for site, size in self._allocations[name].most_common(top):
+                    report.write(f"  {size / 1024:>10.1f} KiB  {site}\n")
+                report.write("\n")
+
+        path = os.path.join(output_dir, f"{prefix}.collapsed")
+        with open(path, "w") as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write(f"{stack} {count}\n")
+        paths["collapsed_stacks"] = path
+
+        path = os.path.join(output_dir, f"{prefix}_profile.txt")
+        with open(path, "w") as f:
+            f.write(report.getvalue())
+        paths["report"] = path
+
+        summary["files"] = paths
+        path = os.path.join(output_dir, f"{prefix}_profile.json")
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
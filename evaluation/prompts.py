@@ -0,0 +1,115 @@
+"""Answer and judge prompt templates, and how retrieved memories are shown to them.
+
+Kept apart from evaluation.runner so the --plan cost model can format the
+exact prompts without importing the runner's OpenAI and NumPy dependencies.
+"""
+
+
+# Judge prompts are split the same way as the agent's conversation prompt: the
+# criteria and output format are a static system message (cacheable prefix),
+# and the test being judged is the user message.
+ANSWER_EVALUATION_SYSTEM_PROMPT = """You are evaluating whether a memory-assisted AI answer is correct.
+
+You are given a test question, its ground truth answer, the memories the answer requires, what the system retrieved from memory, and the system's answer.
+
+## Evaluation Criteria
+1. Did the system retrieve the RIGHT memories? (not outdated/contradicted versions)
+2. Is the answer factually correct based on ground truth?
+3. Does it use the most up-to-date information?
+
+Rate as:
+- "correct": Answer is factually correct and uses current information
+- "partially_correct": Has some right info but missing key details or includes stale info
+- "incorrect": Wrong answer, uses outdated info, or completely missing
+
+Also note specific failure modes:
+- "stale_memory": Retrieved an outdated version of a fact that was updated
+- "missing_memory": Failed to retrieve a needed memory
+- "noise_retrieved": Retrieved irrelevant memories
+- "hallucinated_memory": Answer includes information never in any conversation
+- "contradiction_unresolved": Both old and new versions of a fact exist
+
+Output ONLY valid JSON:
+{
+    "rating": "correct|partially_correct|incorrect",
+    "failure_modes": ["mode1", "mode2"],
+    "explanation": "Brief explanation"
+}"""
+
+ANSWER_EVALUATION_PROMPT = """## Test Question
+{query}
+
+## Ground Truth Answer
+{correct_answer}
+
+## Required Memories
+{required_memories}
+
+## What the System Retrieved from Memory
+{retrieved_memories}
+
+## System's Answer
+{system_answer}"""
+
+ANSWER_GENERATION_PROMPT = """You are an AI assistant with access to stored memories about the user.
+
+## Retrieved Memories
+{memories}
+
+## User's Question
+{query}
+
+Answer the user's question using ONLY the information from your retrieved memories. If you don't have relevant memories, say so honestly. Be concise."""
+
+BATCH_EVALUATION_SYSTEM_PROMPT = """You are evaluating whether memory-assisted AI answers are correct. Each item you are given is independent — judge it only against its own ground truth.
+
+## Evaluation Criteria
+1. Did the system retrieve the RIGHT memories? (not outdated/contradicted versions)
+2. Is the answer factually correct based on ground truth?
+3. Does it use the most up-to-date information?
+
+Rate each item as:
+- "correct": Answer is factually correct and uses current information
+- "partially_correct": Has some right info but missing key details or includes stale info
+- "incorrect": Wrong answer, uses outdated info, or completely missing
+
+Also note specific failure modes:
+- "stale_memory": Retrieved an outdated version of a fact that was updated
+- "missing_memory": Failed to retrieve a needed memory
+- "noise_retrieved": Retrieved irrelevant memories
+- "hallucinated_memory": Answer includes information never in any conversation
+- "contradiction_unresolved": Both old and new versions of a fact exist
+
+Output ONLY a valid JSON array with exactly one object per item, in item order:
+[
+    {
+        "item": 1,
+        "rating": "correct|partially_correct|incorrect",
+        "failure_modes": ["mode1", "mode2"],
+        "explanation": "Brief explanation"
+    }
+]"""
+
+BATCH_ITEM_TEMPLATE = """# Item {index}
+
+## Test Question
+{query}
+
+## Ground Truth Answer
+{correct_answer}
+
+## Required Memories
+{required_memories}
+
+## What the System Retrieved from Memory
+{retrieved_memories}
+
+## System's Answer
+{system_answer}"""
+
+VALID_RATINGS = {"correct", "partially_correct", "incorrect"}
+
+
+def format_retrieved(contents: list[str]) -> str:
+    """Retrieved memory contents as the answer and judge prompts list them."""
+    return "\n".join([f"- {c}" for c in contents]) if contents else "(No memories found)"
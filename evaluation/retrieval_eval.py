@@ -0,0 +1,162 @@
+"""Offline retrieval-quality evaluation, with no answer generation or judging.
+
+Judged accuracy mixes retrieval quality with answer generation and the judge's
+own noise, and every iteration costs a full paid sweep. For retrieval changes
+we only need to know whether search() surfaces each test's required_memories.
+This module answers that directly: a retrieved memory matches a required one
+when it covers most of its words or when their embeddings are close, and we
+report recall@k and MRR per failure category.
+
+Memory stores are rebuilt from the `all_memories_after` snapshot saved in a
+trial's results file, so the only API calls are embeddings (memory contents,
+queries, and required memories for matching) — no completions.
+"""
+
+import json
+
+import numpy as np
+
+from benchmark.data import FAILURE_CATEGORIES, PROFILES
+from memory_systems.base import MemoryEntry
+
+# A retrieved memory matches a required one if it covers this share of the
+# required memory's words, or if their embeddings are at least this similar.
+OVERLAP_THRESHOLD = 0.5
+SIMILARITY_THRESHOLD = 0.7
+
+
+def _words(text: str) -> set[str]:
+    return {w.strip(".,!?'\"()").lower() for w in text.split() if len(w) > 2}
+
+
+def token_overlap(required: str, retrieved: str) -> float:
+    """Share of required's (3+ letter) words that also appear in retrieved."""
+    req = _words(required)
+    if not req:
+        return 0.0
+    return len(req & _words(retrieved)) / len(req)
+
+
+class MemoryMatcher:
+    """Decides whether a retrieved memory satisfies a required one.
+
+    Embeddings are memoized per text, so each distinct string is embedded
+    once per matcher however many tests mention it.
+    """
+
+    def __init__(self, embedder=None, overlap_threshold: float = OVERLAP_THRESHOLD,
+                 similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.embedder = embedder
+        self.overlap_threshold = overlap_threshold
+        self.similarity_threshold = similarity_threshold
+        self._vectors: dict[str, np.ndarray] = {}
+
+    def prefetch(self, texts: list[str]):
+        """Embed every not-yet-seen text in one batch."""
+        if self.embedder is None:
+            return
+        missing = list(dict.fromkeys(t for t in texts if t not in self._vectors))
+        if not missing:
+            return
+        for text, vector in zip(missing, self.embedder.embed_batch(missing)):
+            v = np.asarray(vector, dtype=np.float32)
+            self._vectors[text] = v / (np.linalg.norm(v) + 1e-10)
+
+    def matches(self, required: str, retrieved: str) -> bool:
+        if token_overlap(required, retrieved) >= self.overlap_threshold:
+            return True
+        if self.embedder is None:
+            return False
+        self.prefetch([required, retrieved])
+        similarity = float(self._vectors[required] @ self._vectors[retrieved])
+        return similarity >= self.similarity_threshold
+
+
+def score_test(test: dict, retrieved: list[str], matcher: MemoryMatcher, k: int) -> dict:
+    """Recall@k and reciprocal rank for one test's ranked retrieval.
+
+    Tests with no required memories (noise_resistance) get None for both:
+    there is nothing to recall, and the judge covers whether noise leaked.
+    """
+    required = test["required_memories"]
+    if not required:
+        return {"test_id": test["test_id"], "category": test["category"], "required": 0,
+                "found": 0, "recall_at_k": None, "reciprocal_rank": None}
+    matcher.prefetch(required + retrieved)
+    found = [any(matcher.matches(r, m) for m in retrieved[:k]) for r in required]
+    first_hit = next(
+        (rank for rank, m in enumerate(retrieved, start=1)
+         if any(matcher.matches(r, m) for r in required)),
+        None,
+    )
+    return {
+        "test_id": test["test_id"],
+        "category": test["category"],
+        "required": len(required),
+        "found": sum(found),
+        "recall_at_k": sum(found) / len(required),
+        "reciprocal_rank": 1.0 / first_hit if first_hit else 0.0,
+    }
+
+
+def summarize(per_test: list[dict]) -> dict:
+    """Mean recall@k and MRR overall and per failure category.
+
+    Only tests with required memories are scored; categories with none
+    report None.
+    """
+    def block(rows):
+        rows = [r for r in rows if r["recall_at_k"] is not None]
+        if not rows:
+            return {"tests": 0, "recall_at_k": None, "mrr": None}
+        return {
+            "tests": len(rows),
+            "recall_at_k": sum(r["recall_at_k"] for r in rows) / len(rows),
+            "mrr": sum(r["reciprocal_rank"] for r in rows) / len(rows),
+        }
+
+    return {
+        "overall": block(per_test),
+        "by_category": {
+            cat: block([r for r in per_test if r["category"] == cat])
+            for cat in FAILURE_CATEGORIES
+        },
+    }
+
+
+def load_memory_snapshots(results_path: str) -> dict[str, list[MemoryEntry]]:
+    """{user_id: memories} from a trial results file's all_memories_after."""
+    with open(results_path) as f:
+        data = json.load(f)
+    return {
+        p["user_id"]: [
+            MemoryEntry(id=m["id"], content=m["content"], metadata=m.get("metadata", {}))
+            for m in p.get("all_memories_after", [])
+        ]
+        for p in data["profile_results"]
+    }
+
+
+def evaluate_retrieval(system_factory, snapshots: dict[str, list[MemoryEntry]],
+                       matcher: MemoryMatcher, k: int = 5,
+                       profiles: list[dict] = None) -> dict:
+    """Rebuild each profile's store from its snapshot and score search().
+
+    system_factory(user_id) must return a system with import_memories().
+    """
+    if profiles is None:
+        profiles = PROFILES
+    per_test = []
+    for profile in profiles:
+        memories = snapshots.get(profile["user_id"])
+        if memories is None:
+            continue
+        system = system_factory(profile["user_id"])
+        system.import_memories(memories)
+        for test in profile["memory_tests"]:
+            retrieved = [m.content for m in system.search(test["query"], top_k=k)]
+            per_test.append(score_test(test, retrieved, matcher, k))
+    summary = summarize(per_test)
+    summary["k"] = k
+    summary["per_test"] = per_test
+    return summary
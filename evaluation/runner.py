@@ -2,84 +2,70 @@
 
 import json
 import os
+import threading
 import time
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from benchmark.data import PROFILES, get_all_tests
+from memory_systems import resources, telemetry
+from memory_systems.embedder import memo_stats
 from memory_systems.base import BaseMemorySystem
-
-
-ANSWER_EVALUATION_PROMPT = """You are evaluating whether a memory-assisted AI answer is correct.
-
-## Test Question
-{query}
-
-## Ground Truth Answer
-{correct_answer}
-
-## Required Memories
-{required_memories}
-
-## What the System Retrieved from Memory
-{retrieved_memories}
-
-## System's Answer
-{system_answer}
-
-## Evaluation Criteria
-1. Did the system retrieve the RIGHT memories? (not outdated/contradicted versions)
-2. Is the answer factually correct based on ground truth?
-3. Does it use the most up-to-date information?
-
-Rate as:
-- "correct": Answer is factually correct and uses current information
-- "partially_correct": Has some right info but missing key details or includes stale info
-- "incorrect": Wrong answer, uses outdated info, or completely missing
-
-Also note specific failure modes:
-- "stale_memory": Retrieved an outdated version of a fact that was updated
-- "missing_memory": Failed to retrieve a needed memory
-- "noise_retrieved": Retrieved irrelevant memories
-- "hallucinated_memory": Answer includes information never in any conversation
-- "contradiction_unresolved": Both old and new versions of a fact exist
-
-Output ONLY valid JSON:
-{{
-    "rating": "correct|partially_correct|incorrect",
-    "failure_modes": ["mode1", "mode2"],
-    "explanation": "Brief explanation"
-}}"""
-
-ANSWER_GENERATION_PROMPT = """You are an AI assistant with access to stored memories about the user.
-
-## Retrieved Memories
-{memories}
-
-## User's Question
-{query}
-
-Answer the user's question using ONLY the information from your retrieved memories. If you don't have relevant memories, say so honestly. Be concise."""
+from memory_systems.tokens import cached_prompt_tokens, estimate_tokens
+from .judge_cache import JudgeCache
+from .prompts import (
+    ANSWER_EVALUATION_PROMPT, ANSWER_EVALUATION_SYSTEM_PROMPT, ANSWER_GENERATION_PROMPT,
+    BATCH_EVALUATION_SYSTEM_PROMPT, BATCH_ITEM_TEMPLATE, VALID_RATINGS, format_retrieved,
+)
 
 
 class ExperimentRunner:
     """Runs the full experiment: feeds conversations, tests memory, evaluates."""
 
-    def __init__(self, openai_api_key: str = None, model: str = "gpt-4o-mini"):
-        self.client = OpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str = None, model: str = "gpt-4o-mini",
+                 judge_cache: JudgeCache = None, judge_batch_size: int = 1,
+                 concurrency: int = 1, profiler=None):
+        self.client = resources.openai_client(openai_api_key)
         self.model = model
+        self.judge_cache = judge_cache
+        self.judge_batch_size = max(1, judge_batch_size)
+        self.concurrency = max(1, concurrency)
+        # Optional evaluation.profiling.PhaseProfiler
+        self.profiler = profiler
+        # Profiles may run in threads; counters below are updated under this
+        self._lock = threading.Lock()
         self.eval_llm_calls = 0
         self.eval_input_tokens = 0
         self.eval_output_tokens = 0
-
-    def _call_llm(self, prompt: str) -> str:
+        self.eval_cached_input_tokens = 0
+        self.judge_cache_hits = 0
+        self.judge_cache_misses = 0
+        self.judge_batches = 0
+        self.judge_batch_fallbacks = 0
+
+    def _phase(self, name: str):
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def _call_llm(self, prompt: str, max_tokens: int = 1000, system: str = None) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
         response = self.client.chat.completions.create(
             model=self.model,
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            messages=messages,
         )
-        self.eval_llm_calls += 1
+        cached = cached_prompt_tokens(response.usage) if response.usage else 0
+        with self._lock:
+            self.eval_llm_calls += 1
+            if response.usage:
+                self.eval_input_tokens += response.usage.prompt_tokens
+                self.eval_output_tokens += response.usage.completion_tokens
+                self.eval_cached_input_tokens += cached
         if response.usage:
-            self.eval_input_tokens += response.usage.prompt_tokens
-            self.eval_output_tokens += response.usage.completion_tokens
+            telemetry.publish("llm_call", source="eval",
+                              input_tokens=response.usage.prompt_tokens,
+                              output_tokens=response.usage.completion_tokens,
+                              cached_tokens=cached)
         return response.choices[0].message.content
 
     def run_single_profile(self, profile: dict, memory_system: BaseMemorySystem) -> dict:
@@ -101,13 +87,16 @@ class ExperimentRunner:
         }
 
         # Step 1: Feed sessions 1-4 into memory
+        sessions = []
         for session in profile["sessions"]:
             if session["session_id"] >= 5:  # Session 5 is test-only
                 continue
             # Filter out [MEMORY TEST] placeholder responses
             real_turns = [t for t in session["turns"] if "[MEMORY TEST]" not in t.get("content", "")]
             if real_turns:
-                memory_system.add_conversation(real_turns, session["session_id"])
+                sessions.append((real_turns, session["session_id"]))
+        with self._phase("ingest"):
+            memory_system.add_sessions(sessions)
 
         # Step 2: Get all stored memories (for analysis)
         all_memories = memory_system.get_all()
@@ -116,10 +105,11 @@ class ExperimentRunner:
             for m in all_memories
         ]
 
-        # Step 3: For each test, search memory and evaluate
+        # Step 3: For each test, search memory and answer, then evaluate
         for test in profile["memory_tests"]:
-            test_result = self._run_single_test(test, memory_system)
-            results["test_results"].append(test_result)
+            results["test_results"].append(self._answer_test(test, memory_system))
+        with self._phase("judge"):
+            self._evaluate_tests(results["test_results"])
 
         # Step 4: Capture stats
         stats = memory_system.get_stats()
@@ -131,61 +121,178 @@ class ExperimentRunner:
             "llm_calls": stats.llm_calls,
             "total_input_tokens": stats.total_input_tokens,
             "total_output_tokens": stats.total_output_tokens,
+            "total_cached_input_tokens": stats.cached_input_tokens,
         }
+        if hasattr(memory_system, "prompt_tokens_per_session"):
+            results["memory_stats"]["prompt_tokens_per_session"] = list(
+                memory_system.prompt_tokens_per_session
+            )
+        if getattr(memory_system, "backfill_sessions", 0):
+            results["memory_stats"]["backfill_sessions"] = memory_system.backfill_sessions
 
         return results
 
     def _run_single_test(self, test: dict, memory_system: BaseMemorySystem) -> dict:
         """Run a single memory test: retrieve, generate answer, evaluate."""
+        test_result = self._answer_test(test, memory_system)
+        with self._phase("judge"):
+            self._evaluate_tests([test_result])
+        return test_result
+
+    def _answer_test(self, test: dict, memory_system: BaseMemorySystem) -> dict:
+        """Retrieve memories and generate an answer; evaluation is filled in later."""
         query = test["query"]
 
         # Retrieve memories
-        retrieved = memory_system.search(query, top_k=5)
-        retrieved_text = "\n".join([f"- {m.content}" for m in retrieved]) if retrieved else "(No memories found)"
+        with self._phase("retrieve"):
+            retrieved = memory_system.search(query, top_k=5)
+        retrieved_contents = [m.content for m in retrieved]
 
         # Generate answer using retrieved memories
-        answer_prompt = ANSWER_GENERATION_PROMPT.format(
-            memories=retrieved_text,
-            query=query,
-        )
-        system_answer = self._call_llm(answer_prompt)
+        with self._phase("answer"):
+            context = format_retrieved(retrieved_contents)
+            answer_prompt = ANSWER_GENERATION_PROMPT.format(
+                memories=context,
+                query=query,
+            )
+            system_answer = self._call_llm(answer_prompt)
+
+        telemetry.publish("test_answered", test_id=test["test_id"])
+        return {
+            "test_id": test["test_id"],
+            "category": test["category"],
+            "query": query,
+            "required_memories": test["required_memories"],
+            "retrieved_memories": retrieved_contents,
+            "context_tokens": estimate_tokens(context),
+            "system_answer": system_answer,
+            "correct_answer": test["correct_answer"],
+            "evaluation": None,
+            "judge_cached": False,
+            "notes": test.get("notes", ""),
+        }
+
+    def _evaluate_tests(self, test_results: list[dict]):
+        """Fill in the judge evaluation for each answered test, in place.
 
-        # Evaluate answer
+        Cached verdicts are reused first; the rest go to the judge in batches
+        of judge_batch_size (one call per test when the batch size is 1).
+        """
+        pending = []
+        for tr in test_results:
+            cache_key = None
+            if self.judge_cache is not None:
+                cache_key = self.judge_cache.key(
+                    tr["query"], tr["system_answer"], tr["correct_answer"],
+                    "\n".join(f"- {m}" for m in tr["required_memories"]),
+                    format_retrieved(tr["retrieved_memories"]),
+                )
+                evaluation = self.judge_cache.get(cache_key)
+                with self._lock:
+                    if evaluation is not None:
+                        self.judge_cache_hits += 1
+                    else:
+                        self.judge_cache_misses += 1
+                if evaluation is not None:
+                    tr["evaluation"] = evaluation
+                    tr["judge_cached"] = True
+                    telemetry.publish("test_judged", test_id=tr["test_id"],
+                                      rating=evaluation.get("rating"), cached=True)
+                    continue
+            pending.append((tr, cache_key))
+
+        for i in range(0, len(pending), self.judge_batch_size):
+            chunk = pending[i:i + self.judge_batch_size]
+            if len(chunk) == 1:
+                evaluations = [self._judge(chunk[0][0])]
+            else:
+                evaluations = self._judge_batch([tr for tr, _ in chunk])
+            for (tr, cache_key), evaluation in zip(chunk, evaluations):
+                tr["evaluation"] = evaluation
+                if cache_key is not None:
+                    self.judge_cache.put(cache_key, evaluation)
+                telemetry.publish("test_judged", test_id=tr["test_id"],
+                                  rating=evaluation.get("rating"), cached=False)
+
+    @staticmethod
+    def _extract_json(raw: str):
+        json_str = raw
+        if "```json" in json_str:
+            json_str = json_str.split("```json")[1].split("```")[0]
+        elif "```" in json_str:
+            json_str = json_str.split("```")[1].split("```")[0]
+        return json.loads(json_str.strip())
+
+    def _judge(self, test_result: dict) -> dict:
+        """Ask the LLM judge to rate one answer against ground truth."""
         eval_prompt = ANSWER_EVALUATION_PROMPT.format(
-            query=query,
-            correct_answer=test["correct_answer"],
-            required_memories="\n".join(f"- {m}" for m in test["required_memories"]),
-            retrieved_memories=retrieved_text,
-            system_answer=system_answer,
+            query=test_result["query"],
+            correct_answer=test_result["correct_answer"],
+            required_memories="\n".join(f"- {m}" for m in test_result["required_memories"]),
+            retrieved_memories=format_retrieved(test_result["retrieved_memories"]),
+            system_answer=test_result["system_answer"],
         )
-        eval_response = self._call_llm(eval_prompt)
+        eval_response = self._call_llm(eval_prompt, system=ANSWER_EVALUATION_SYSTEM_PROMPT)
 
         # Parse evaluation
         try:
-            json_str = eval_response
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0]
-            elif "```" in json_str:
-                json_str = json_str.split("```")[1].split("```")[0]
-            evaluation = json.loads(json_str.strip())
+            return self._extract_json(eval_response)
         except (json.JSONDecodeError, IndexError):
-            evaluation = {
+            return {
                 "rating": "error",
                 "failure_modes": ["parse_error"],
                 "explanation": f"Failed to parse evaluation: {eval_response[:200]}",
             }
 
-        return {
-            "test_id": test["test_id"],
-            "category": test["category"],
-            "query": query,
-            "required_memories": test["required_memories"],
-            "retrieved_memories": [m.content for m in retrieved],
-            "system_answer": system_answer,
-            "correct_answer": test["correct_answer"],
-            "evaluation": evaluation,
-            "notes": test.get("notes", ""),
-        }
+    def _judge_batch(self, test_results: list[dict]) -> list[dict]:
+        """Rate several answers in one judge call.
+
+        Items missing from the response, or with an invalid rating, are
+        re-judged individually so one malformed entry never costs the batch.
+        """
+        items = "\n\n".join(
+            BATCH_ITEM_TEMPLATE.format(
+                index=i,
+                query=tr["query"],
+                correct_answer=tr["correct_answer"],
+                required_memories="\n".join(f"- {m}" for m in tr["required_memories"]),
+                retrieved_memories=format_retrieved(tr["retrieved_memories"]),
+                system_answer=tr["system_answer"],
+            )
+            for i, tr in enumerate(test_results, start=1)
+        )
+        raw_response = self._call_llm(items, max_tokens=300 * len(test_results) + 200,
+                                      system=BATCH_EVALUATION_SYSTEM_PROMPT)
+        with self._lock:
+            self.judge_batches += 1
+
+        by_item = {}
+        try:
+            parsed = self._extract_json(raw_response)
+        except (json.JSONDecodeError, IndexError):
+            parsed = []
+        if isinstance(parsed, list):
+            for position, entry in enumerate(parsed, start=1):
+                if not isinstance(entry, dict) or entry.get("rating") not in VALID_RATINGS:
+                    continue
+                index = entry.get("item", position)
+                if not isinstance(index, int) or index in by_item:
+                    continue
+                by_item[index] = {
+                    "rating": entry["rating"],
+                    "failure_modes": entry.get("failure_modes", []),
+                    "explanation": entry.get("explanation", ""),
+                }
+
+        evaluations = []
+        for i, tr in enumerate(test_results, start=1):
+            if i in by_item:
+                evaluations.append(by_item[i])
+            else:
+                with self._lock:
+                    self.judge_batch_fallbacks += 1
+                evaluations.append(self._judge(tr))
+        return evaluations
 
     def run_full_experiment(
         self,
@@ -202,6 +309,8 @@ class ExperimentRunner:
         """
         if profiles is None:
             profiles = PROFILES
+        memo_before = memo_stats()
+        coalescer_before = resources.coalescer_stats()
 
         experiment_results = {
             "system_name": system_name,
@@ -212,29 +321,73 @@ class ExperimentRunner:
                 "llm_calls": 0,
                 "input_tokens": 0,
                 "output_tokens": 0,
+                "cached_input_tokens": 0,
             },
         }
 
-        for i, profile in enumerate(profiles):
+        telemetry.publish("run_start", system=system_name, profiles=len(profiles),
+                          tests=sum(len(p["memory_tests"]) for p in profiles))
+
+        def run_profile(i: int, profile: dict) -> dict:
             print(f"  [{i+1}/{len(profiles)}] Running profile: {profile['name']} ({profile['user_id']})")
+            telemetry.publish("profile_start", user_id=profile["user_id"])
 
             # Create fresh memory system for each user
-            memory_system = memory_system_factory(profile["user_id"])
+            t0 = time.perf_counter()
+            with self._phase("setup"):
+                memory_system = memory_system_factory(profile["user_id"])
+            setup_seconds = time.perf_counter() - t0
 
             profile_result = self.run_single_profile(profile, memory_system)
-            experiment_results["profile_results"].append(profile_result)
+            profile_result["setup_seconds"] = setup_seconds
+            telemetry.publish("profile_end", user_id=profile["user_id"],
+                              tests=len(profile_result["test_results"]))
+            return profile_result
+
+        if self.concurrency > 1:
+            # Results come back in profile order whatever order they finish in
+            pool = ThreadPoolExecutor(max_workers=self.concurrency)
+            profile_results = pool.map(run_profile, range(len(profiles)), profiles)
+        else:
+            pool = None
+            profile_results = (run_profile(i, p) for i, p in enumerate(profiles))
 
-            # Print quick summary
-            for tr in profile_result["test_results"]:
-                rating = tr["evaluation"].get("rating", "unknown")
-                symbol = {"correct": "+", "partially_correct": "~", "incorrect": "-"}.get(rating, "?")
-                print(f"    [{symbol}] {tr['test_id']}: {rating} ({tr['category']})")
+        try:
+            for profile_result in profile_results:
+                experiment_results["profile_results"].append(profile_result)
+
+                # Print quick summary
+                print(f"    {profile_result['user_name']}:")
+                for tr in profile_result["test_results"]:
+                    rating = tr["evaluation"].get("rating", "unknown")
+                    symbol = {"correct": "+", "partially_correct": "~", "incorrect": "-"}.get(rating, "?")
+                    print(f"    [{symbol}] {tr['test_id']}: {rating} ({tr['category']})")
+        finally:
+            # If a profile failed, don't start the queued ones (and their API calls)
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        telemetry.publish("run_end", system=system_name)
 
         # Record eval costs
+        memo_after = memo_stats()
+        coalescer_after = resources.coalescer_stats()
+        judged = self.judge_cache_hits + self.judge_cache_misses
         experiment_results["eval_costs"] = {
             "llm_calls": self.eval_llm_calls,
             "input_tokens": self.eval_input_tokens,
             "output_tokens": self.eval_output_tokens,
+            "cached_input_tokens": self.eval_cached_input_tokens,
+            "judge_cache_hits": self.judge_cache_hits,
+            "judge_cache_misses": self.judge_cache_misses,
+            "judge_cache_hit_rate": self.judge_cache_hits / judged if judged else 0.0,
+            "judge_batches": self.judge_batches,
+            "judge_batch_fallbacks": self.judge_batch_fallbacks,
+            # Process-wide embedding memo, over this run (memory systems + search)
+            "embedding_memo_hits": memo_after["hits"] - memo_before["hits"],
+            "embedding_memo_misses": memo_after["misses"] - memo_before["misses"],
+            # Embed requests merged across concurrent profiles, and the API calls they took
+            "embedding_coalesced_requests": coalescer_after["requests"] - coalescer_before["requests"],
+            "embedding_coalesced_calls": coalescer_after["api_calls"] - coalescer_before["api_calls"],
         }
 
         return experiment_results
@@ -0,0 +1,203 @@
+"""Per-test confidence intervals and paired significance tests between systems.
+
+Mean +/- std over three trials says little about whether one system really
+beats another. Every system answers the same tests, so comparisons here are
+paired by test_id: each test's score is its accuracy averaged over trials,
+and we report
+
+- a bootstrap CI for each system's accuracy and for the paired difference,
+- McNemar's test on per-test majority verdicts (correct in most trials),
+- a paired sign-flip permutation test on the per-test score differences.
+
+Resampling is vectorized with NumPy. Per-test scores take only a handful of
+distinct values (trial-averaged verdicts), so a bootstrap resample is fully
+described by how many times each distinct (score_a, score_b) pair is drawn —
+one multinomial draw per resample instead of n index draws — and a sign-flip
+permutation by how many of each distinct difference are flipped, a binomial
+draw. All resamples come out of one draw and one matrix product. With many
+distinct values (continuous scores) we fall back to gathering resample
+indices, a chunk of resamples at a time to bound memory.
+"""
+
+import math
+from itertools import combinations
+
+import numpy as np
+
+BOOTSTRAP_RESAMPLES = 10000
+CONFIDENCE = 0.95
+
+# Resample-matrix entries materialized at once (~16 MB of int32 indices)
+_CHUNK_ELEMENTS = 1 << 22
+
+# Above this many distinct score values, resample by index instead of counts
+_MAX_DISTINCT = 256
+
+# McNemar uses the exact binomial test below this many discordant tests
+_EXACT_MCNEMAR_BELOW = 25
+
+
+def per_test_scores(trial_metrics_list: list[dict], partial_credit: float = 0.0) -> dict[str, float]:
+    """{test_id: score averaged over trials} from compute_metrics test_details.
+
+    A correct rating scores 1, partially_correct scores partial_credit, and
+    anything else 0. Tests missing from a trial are averaged over the rest.
+    """
+    totals: dict[str, float] = {}
+    counts: dict[str, int] = {}
+    for metrics in trial_metrics_list:
+        for t in metrics.get("test_details", []):
+            score = 1.0 if t["rating"] == "correct" else (
+                partial_credit if t["rating"] == "partially_correct" else 0.0)
+            totals[t["test_id"]] = totals.get(t["test_id"], 0.0) + score
+            counts[t["test_id"]] = counts.get(t["test_id"], 0) + 1
+    return {tid: totals[tid] / counts[tid] for tid in totals}
+
+
+def align(scores_a: dict[str, float], scores_b: dict[str, float]) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Tests both systems answered, with their scores as aligned arrays."""
+    ids = sorted(scores_a.keys() & scores_b.keys())
+    a = np.array([scores_a[t] for t in ids], dtype=np.float64)
+    b = np.array([scores_b[t] for t in ids], dtype=np.float64)
+    return ids, a, b
+
+
+def _chunks(resamples: int, n: int):
+    size = max(1, _CHUNK_ELEMENTS // max(n, 1))
+    for start in range(0, resamples, size):
+        yield min(size, resamples - start)
+
+
+def bootstrap_means(values: np.ndarray, resamples: int = BOOTSTRAP_RESAMPLES,
+                    seed: int = 0) -> np.ndarray:
+    """Means of `resamples` bootstrap resamples of the columns of values.
+
+    values is (k, n): k aligned score vectors over the same n tests. The same
+    resampled tests are used for every row, which keeps comparisons paired.
+    Returns a (resamples, k) array.
+    """
+    values = np.atleast_2d(values)
+    n = values.shape[1]
+    rng = np.random.default_rng(seed)
+    distinct, counts = np.unique(values.T, axis=0, return_counts=True)
+    if len(distinct) <= _MAX_DISTINCT:
+        draws = rng.multinomial(n, counts / n, size=resamples)
+        return draws @ distinct / n
+    out = []
+    for size in _chunks(resamples, n):
+        idx = rng.integers(0, n, size=(size, n), dtype=np.int32)
+        out.append(values[:, idx].mean(axis=-1).T)
+    return np.concatenate(out) if out else np.empty((0, values.shape[0]))
+
+
+def _interval(samples: np.ndarray, confidence: float) -> tuple[float, float]:
+    alpha = (1.0 - confidence) / 2
+    low, high = np.quantile(samples, [alpha, 1.0 - alpha])
+    return float(low), float(high)
+
+
+def bootstrap_ci(scores: np.ndarray, resamples: int = BOOTSTRAP_RESAMPLES,
+                 confidence: float = CONFIDENCE, seed: int = 0) -> tuple[float, float]:
+    """Percentile bootstrap CI for the mean of per-test scores."""
+    if len(scores) == 0:
+        return 0.0, 0.0
+    return _interval(bootstrap_means(scores, resamples, seed)[:, 0], confidence)
+
+
+def paired_bootstrap(a: np.ndarray, b: np.ndarray, resamples: int = BOOTSTRAP_RESAMPLES,
+                     confidence: float = CONFIDENCE, seed: int = 0) -> dict:
+    """Bootstrap CIs for both systems' accuracy and their difference (a - b)."""
+    if len(a) == 0:
+        return {"mean_a": 0.0, "mean_b": 0.0, "diff": 0.0, "ci_a": (0.0, 0.0),
+                "ci_b": (0.0, 0.0), "ci_diff": (0.0, 0.0)}
+    means = bootstrap_means(np.vstack([a, b]), resamples, seed)
+    return {
+        "mean_a": float(a.mean()),
+        "mean_b": float(b.mean()),
+        "diff": float(a.mean() - b.mean()),
+        "ci_a": _interval(means[:, 0], confidence),
+        "ci_b": _interval(means[:, 1], confidence),
+        "ci_diff": _interval(means[:, 0] - means[:, 1], confidence),
+    }
+
+
+def mcnemar(a_correct: np.ndarray, b_correct: np.ndarray) -> dict:
+    """McNemar's test on paired binary outcomes.
+
+    Exact two-sided binomial test when there are few discordant pairs,
+    otherwise the continuity-corrected chi-square (1 df).
+    """
+    a_correct = np.asarray(a_correct, dtype=bool)
+    b_correct = np.asarray(b_correct, dtype=bool)
+    a_only = int(np.sum(a_correct & ~b_correct))
+    b_only = int(np.sum(~a_correct & b_correct))
+    discordant = a_only + b_only
+    if discordant == 0:
+        return {"a_only": 0, "b_only": 0, "statistic": 0.0, "p_value": 1.0, "exact": True}
+    if discordant < _EXACT_MCNEMAR_BELOW:
+        k = min(a_only, b_only)
+        tail = sum(math.comb(discordant, i) for i in range(k + 1)) / 2 ** discordant
+        return {"a_only": a_only, "b_only": b_only, "statistic": float(k),
+                "p_value": min(1.0, 2 * tail), "exact": True}
+    statistic = (abs(a_only - b_only) - 1) ** 2 / discordant
+    return {"a_only": a_only, "b_only": b_only, "statistic": statistic,
+            "p_value": math.erfc(math.sqrt(statistic / 2)), "exact": False}
+
+
+def paired_permutation(a: np.ndarray, b: np.ndarray, resamples: int = BOOTSTRAP_RESAMPLES,
+                       seed: int = 0) -> float:
+    """Two-sided p-value of a sign-flip permutation test on mean(a - b).
+
+    Under the null either system is equally likely to have produced each
+    test's score, so every difference's sign is flipped at random.
+    """
+    diff = a - b
+    n = len(diff)
+    if n == 0:
+        return 1.0
+    observed = abs(diff.mean())
+    rng = np.random.default_rng(seed)
+    distinct, counts = np.unique(diff, return_counts=True)
+    if len(distinct) <= _MAX_DISTINCT:
+        kept = rng.binomial(counts, 0.5, size=(resamples, len(distinct)))
+        means = np.abs((2 * kept - counts) @ distinct) / n
+        return (int(np.sum(means >= observed - 1e-12)) + 1) / (resamples + 1)
+    extreme = 0
+    for size in _chunks(resamples, n):
+        signs = rng.integers(0, 2, size=(size, n), dtype=np.int8) * 2 - 1
+        extreme += int(np.sum(np.abs(signs @ diff) / n >= observed - 1e-12))
+    return (extreme + 1) / (resamples + 1)
+
+
+def compare_systems(trial_metrics: dict[str, list[dict]], resamples: int = BOOTSTRAP_RESAMPLES,
+                    confidence: float = CONFIDENCE, seed: int = 0) -> dict:
+    """Per-system accuracy CIs and paired tests for every pair of systems.
+
+    trial_metrics maps system name -> its per-trial compute_metrics outputs.
+    """
+    scores = {name: per_test_scores(trials) for name, trials in trial_metrics.items()}
+    report = {"resamples": resamples, "confidence": confidence, "systems": {}, "pairs": []}
+    for name, s in scores.items():
+        values = np.fromiter(s.values(), dtype=np.float64, count=len(s))
+        low, high = bootstrap_ci(values, resamples, confidence, seed)
+        report["systems"][name] = {
+            "tests": len(values),
+            "accuracy": float(values.mean()) if len(values) else 0.0,
+            "ci_low": low,
+            "ci_high": high,
+        }
+    for name_a, name_b in combinations(scores, 2):
+        ids, a, b = align(scores[name_a], scores[name_b])
+        boot = paired_bootstrap(a, b, resamples, confidence, seed)
+        report["pairs"].append({
+            "a": name_a,
+            "b": name_b,
+            "tests": len(ids),
+            "diff": boot["diff"],
+            "ci_low": boot["ci_diff"][0],
+            "ci_high": boot["ci_diff"][1],
+            # Majority verdict per test: correct in more than half the trials
+            "mcnemar": mcnemar(a > 0.5, b > 0.5),
+            "permutation_p": paired_permutation(a, b, resamples, seed),
+        })
+    return report
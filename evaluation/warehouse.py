@@ -0,0 +1,269 @@
+"""SQLite warehouse of experiment results across runs.
+
+Every trial writes its own timestamped results JSON, so questions spanning
+runs ("accuracy by category for agent over its last 5 runs") used to mean
+globbing, sorting filenames and re-reading whole files. The warehouse loads
+runs, profiles and tests into indexed tables once; such questions become a
+single query, and any run can be turned back into the results-file shape so
+compute_metrics and the analysis scripts work unchanged.
+
+One results file is one run. Re-ingesting an unchanged file is a no-op; a
+file that changed since it was loaded replaces its run.
+"""
+
+import json
+import os
+import re
+import sqlite3
+
+DEFAULT_DB_PATH = os.path.join("results", "warehouse.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id          INTEGER PRIMARY KEY,
+    source_path     TEXT NOT NULL UNIQUE,
+    source_mtime    REAL NOT NULL,
+    system          TEXT NOT NULL,      -- registry key, e.g. "agent"
+    system_name     TEXT NOT NULL,      -- display name
+    trial           INTEGER,
+    run_timestamp   TEXT NOT NULL,      -- "YYYY-MM-DD HH:MM:SS"
+    num_profiles    INTEGER NOT NULL,
+    eval_costs      TEXT NOT NULL       -- JSON
+);
+CREATE INDEX IF NOT EXISTS idx_runs_system_time ON runs (system, run_timestamp);
+
+CREATE TABLE IF NOT EXISTS profiles (
+    run_id              INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    user_id             TEXT NOT NULL,
+    user_name           TEXT,
+    memory_system       TEXT,
+    total_entries       INTEGER,
+    entries_added       INTEGER,
+    entries_updated     INTEGER,
+    entries_deleted     INTEGER,
+    llm_calls           INTEGER,
+    total_input_tokens  INTEGER,
+    total_output_tokens INTEGER,
+    setup_seconds       REAL,
+    memory_stats        TEXT,           -- JSON, including fields not broken out above
+    memories            TEXT,           -- JSON all_memories_after
+    PRIMARY KEY (run_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS tests (
+    run_id              INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    user_id             TEXT NOT NULL,
+    position            INTEGER NOT NULL,   -- order within the profile
+    test_id             TEXT NOT NULL,
+    category            TEXT NOT NULL,
+    rating              TEXT,
+    query               TEXT,
+    correct_answer      TEXT,
+    system_answer       TEXT,
+    explanation         TEXT,
+    context_tokens      INTEGER,
+    judge_cached        INTEGER,
+    required_memories   TEXT,           -- JSON
+    retrieved_memories  TEXT,           -- JSON
+    evaluation          TEXT,           -- JSON, as returned by the judge
+    notes               TEXT,
+    PRIMARY KEY (run_id, test_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tests_run_category ON tests (run_id, category, rating);
+CREATE INDEX IF NOT EXISTS idx_tests_test_id ON tests (test_id, run_id);
+
+CREATE TABLE IF NOT EXISTS failure_modes (
+    run_id      INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    test_id     TEXT NOT NULL,
+    mode        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_failure_modes_run ON failure_modes (run_id, mode);
+"""
+
+# <system>_trial<N>_results_<YYYYmmdd_HHMMSS>.json
+_RESULTS_NAME = re.compile(r"^(?P<system>.+?)_trial(?P<trial>\d+)_results_(?P<ts>\d{8}_\d{6})\.json$")
+
+
+def connect(path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """Open (creating if needed) a warehouse database."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _run_identity(path: str, data: dict) -> tuple[str, int | None, str]:
+    """(system key, trial, timestamp) from the file name, else the file body."""
+    match = _RESULTS_NAME.match(os.path.basename(path))
+    if match:
+        ts = match.group("ts")
+        timestamp = f"{ts[:4]}-{ts[4:6]}-{ts[6:8]} {ts[9:11]}:{ts[11:13]}:{ts[13:15]}"
+        return match.group("system"), int(match.group("trial")), timestamp
+    return data["system_name"], None, data.get("timestamp", "")
+
+
+def ingest_results_file(conn: sqlite3.Connection, path: str) -> bool:
+    """Load one trial results file. Returns False if it was already loaded."""
+    source = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    row = conn.execute(
+        "SELECT run_id, source_mtime FROM runs WHERE source_path = ?", (source,)
+    ).fetchone()
+    if row is not None and row["source_mtime"] == mtime:
+        return False
+
+    with open(path) as f:
+        data = json.load(f)
+    system, trial, timestamp = _run_identity(path, data)
+
+    with conn:
+        if row is not None:
+            conn.execute("DELETE FROM runs WHERE run_id = ?", (row["run_id"],))
+        run_id = conn.execute(
+            "INSERT INTO runs (source_path, source_mtime, system, system_name, trial, "
+            "run_timestamp, num_profiles, eval_costs) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, mtime, system, data["system_name"], trial, timestamp,
+             data.get("num_profiles", len(data["profile_results"])),
+             json.dumps(data.get("eval_costs", {}))),
+        ).lastrowid
+
+        profiles, tests, modes = [], [], []
+        for p in data["profile_results"]:
+            stats = p.get("memory_stats") or {}
+            profiles.append((
+                run_id, p["user_id"], p.get("user_name"), p.get("memory_system"),
+                stats.get("total_entries"), stats.get("entries_added"),
+                stats.get("entries_updated"), stats.get("entries_deleted"),
+                stats.get("llm_calls"), stats.get("total_input_tokens"),
+                stats.get("total_output_tokens"), p.get("setup_seconds"),
+                json.dumps(p.get("memory_stats")), json.dumps(p.get("all_memories_after", [])),
+            ))
+            for position, t in enumerate(p["test_results"]):
+                evaluation = t.get("evaluation") or {}
+                tests.append((
+                    run_id, p["user_id"], position, t["test_id"], t["category"],
+                    evaluation.get("rating"), t.get("query"), t.get("correct_answer"),
+                    t.get("system_answer"), evaluation.get("explanation"),
+                    t.get("context_tokens"), int(bool(t.get("judge_cached", False))),
+                    json.dumps(t.get("required_memories", [])),
+                    json.dumps(t.get("retrieved_memories", [])),
+                    json.dumps(t.get("evaluation")), t.get("notes", ""),
+                ))
+                modes.extend((run_id, t["test_id"], m) for m in evaluation.get("failure_modes", []))
+
+        conn.executemany(f"INSERT INTO profiles VALUES ({', '.join('?' * 14)})", profiles)
+        conn.executemany(f"INSERT INTO tests VALUES ({', '.join('?' * 16)})", tests)
+        conn.executemany("INSERT INTO failure_modes VALUES (?, ?, ?)", modes)
+    return True
+
+
+def ingest_paths(conn: sqlite3.Connection, paths: list[str]) -> tuple[int, int, list[str]]:
+    """Ingest results files, and every *_results_*.json under directories.
+
+    Paths that don't exist are skipped. Returns (files loaded, files already
+    up to date, missing paths).
+    """
+    files = []
+    missing = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if "_results_" in name and name.endswith(".json")
+            )
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            missing.append(path)
+    loaded = sum(ingest_results_file(conn, f) for f in files)
+    return loaded, len(files) - loaded, missing
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def latest_runs(conn: sqlite3.Connection, system: str, limit: int = 1) -> list[sqlite3.Row]:
+    """A system's most recent runs, newest first."""
+    return conn.execute(
+        "SELECT * FROM runs WHERE system = ? ORDER BY run_timestamp DESC, run_id DESC LIMIT ?",
+        (system, limit),
+    ).fetchall()
+
+
+def accuracy_by_category(conn: sqlite3.Connection, system: str, last_n: int = 5) -> list[sqlite3.Row]:
+    """Pooled accuracy per category over a system's last_n runs."""
+    return conn.execute(
+        """
+        WITH recent AS (
+            SELECT run_id FROM runs WHERE system = ?
+            ORDER BY run_timestamp DESC, run_id DESC LIMIT ?
+        )
+        SELECT category,
+               COUNT(*) AS tests,
+               SUM(rating = 'correct') AS correct,
+               SUM(rating = 'partially_correct') AS partially_correct,
+               AVG(rating = 'correct') AS accuracy,
+               COUNT(DISTINCT run_id) AS runs
+        FROM tests
+        WHERE run_id IN (SELECT run_id FROM recent)
+        GROUP BY category
+        ORDER BY category
+        """,
+        (system, last_n),
+    ).fetchall()
+
+
+def load_run(conn: sqlite3.Connection, run_id: int) -> dict:
+    """Rebuild a run in the trial results-file format (for compute_metrics)."""
+    run = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    tests_by_user: dict[str, list[dict]] = {}
+    for t in conn.execute(
+        "SELECT * FROM tests WHERE run_id = ? ORDER BY user_id, position", (run_id,)
+    ):
+        test = {
+            "test_id": t["test_id"],
+            "category": t["category"],
+            "query": t["query"],
+            "required_memories": json.loads(t["required_memories"]),
+            "retrieved_memories": json.loads(t["retrieved_memories"]),
+            "system_answer": t["system_answer"],
+            "correct_answer": t["correct_answer"],
+            "evaluation": json.loads(t["evaluation"]),
+            "judge_cached": bool(t["judge_cached"]),
+            "notes": t["notes"],
+        }
+        if t["context_tokens"] is not None:
+            test["context_tokens"] = t["context_tokens"]
+        tests_by_user.setdefault(t["user_id"], []).append(test)
+
+    profile_results = []
+    for p in conn.execute("SELECT * FROM profiles WHERE run_id = ? ORDER BY rowid", (run_id,)):
+        profile = {
+            "user_id": p["user_id"],
+            "user_name": p["user_name"],
+            "memory_system": p["memory_system"],
+            "test_results": tests_by_user.get(p["user_id"], []),
+            "all_memories_after": json.loads(p["memories"]),
+            "memory_stats": json.loads(p["memory_stats"]),
+        }
+        if p["setup_seconds"] is not None:
+            profile["setup_seconds"] = p["setup_seconds"]
+        profile_results.append(profile)
+
+    return {
+        "system_name": run["system_name"],
+        "timestamp": run["run_timestamp"],
+        "num_profiles": run["num_profiles"],
+        "profile_results": profile_results,
+        "eval_costs": json.loads(run["eval_costs"]),
+    }
+
+
+def latest_run_results(conn: sqlite3.Connection, system: str) -> dict | None:
+    """The newest run of a system, in results-file format."""
+    runs = latest_runs(conn, system, limit=1)
+    return load_run(conn, runs[0]["run_id"]) if runs else None
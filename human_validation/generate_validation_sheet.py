@@ -4,14 +4,21 @@ Generate a human validation spreadsheet for LLM judge agreement analysis.
 
 Samples ~30 test results stratified across systems and categories,
 outputs a CSV for human annotation and a script to compute agreement.
+
+Usage:
+    python human_validation/generate_validation_sheet.py
+    python human_validation/generate_validation_sheet.py --db results/warehouse.db  # latest runs
+
+With --db the answer key records each row's warehouse run_id, so
+validate_batched_judge.py --db re-judges the runs the sheet was sampled from.
 """
 
+import argparse
 import json
 import csv
 import random
 import os
-
-random.seed(42)
+import sys
 
 # Result files (one per system)
 RESULT_FILES = {
@@ -20,6 +27,13 @@ RESULT_FILES = {
     "LangMem": "results_v5/langmem_trial1_results_20260213_105500.json",
 }
 
+# Warehouse system keys for the same systems (used with --db)
+WAREHOUSE_SYSTEMS = {
+    "Agent-Driven": "agent",
+    "Mem0": "mem0",
+    "LangMem": "langmem",
+}
+
 CATEGORIES = [
     "contradiction_update", "temporal_relevance", "noise_resistance",
     "implicit_preference", "simple_recall", "consolidation", "cross_session"
@@ -37,6 +51,23 @@ def load_results(filepath):
     return results
 
 
+def load_results_db(conn, system):
+    """Tests from the system's latest warehouse run, shaped like load_results()
+    and tagged with the run_id they came from."""
+    from evaluation.warehouse import latest_runs, load_run
+    runs = latest_runs(conn, system, limit=1)
+    if not runs:
+        return None
+    run_id = runs[0]["run_id"]
+    results = []
+    for profile in load_run(conn, run_id)["profile_results"]:
+        for test in profile["test_results"]:
+            test["user_id"] = profile["user_id"]
+            test["run_id"] = run_id
+            results.append(test)
+    return results
+
+
 def sample_stratified(all_results, n=30):
     """Sample n results stratified by system and category."""
     # Group by (system, category)
@@ -75,13 +106,35 @@ def sample_stratified(all_results, n=30):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate the human validation sheet")
+    parser.add_argument("--db", default=None,
+                        help="Sample from the latest warehouse runs instead of RESULT_FILES")
+    args = parser.parse_args()
+
+    # Seeded here, not at import, so importing RESULT_FILES (validate_batched_judge.py)
+    # doesn't reseed the importer's random module
+    random.seed(42)
+
     os.makedirs("human_validation", exist_ok=True)
 
     # Load all results
     all_results = {}
-    for system, filepath in RESULT_FILES.items():
-        all_results[system] = load_results(filepath)
-        print(f"Loaded {len(all_results[system])} results for {system}")
+    if args.db:
+        # Run as a script from the repo root; make the evaluation package importable
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from evaluation.warehouse import connect
+        conn = connect(args.db)
+        for system, key in WAREHOUSE_SYSTEMS.items():
+            results = load_results_db(conn, key)
+            if results is None:
+                print(f"Error: no {key} runs in {args.db}")
+                sys.exit(1)
+            all_results[system] = results
+            print(f"Loaded {len(all_results[system])} results for {system}")
+    else:
+        for system, filepath in RESULT_FILES.items():
+            all_results[system] = load_results(filepath)
+            print(f"Loaded {len(all_results[system])} results for {system}")
 
     # Sample
     sampled = sample_stratified(all_results, n=30)
@@ -112,7 +165,7 @@ def main():
         writer = csv.writer(f)
         writer.writerow([
             "id", "test_id", "system", "category",
-            "llm_judge_rating", "llm_judge_explanation"
+            "llm_judge_rating", "llm_judge_explanation", "run_id"
         ])
         for i, (result, system) in enumerate(sampled, 1):
             writer.writerow([
@@ -121,13 +174,14 @@ def main():
                 system,
                 result["category"],
                 result["evaluation"]["rating"],
-                result["evaluation"]["explanation"]
+                result["evaluation"]["explanation"],
+                result.get("run_id", ""),  # empty when sampled from RESULT_FILES
             ])
 
     print(f"\nGenerated:")
     print(f"  {annotation_path} — give this to your human rater(s)")
     print(f"  {key_path} — DO NOT show to rater until after they finish")
-    print(f"\nSampled {len(sampled)} results across {len(RESULT_FILES)} systems")
+    print(f"\nSampled {len(sampled)} results across {len(all_results)} systems")
 
     # Print category distribution
     from collections import Counter
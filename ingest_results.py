@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Load trial results files into the SQLite results warehouse.
+
+Every run, profile and test goes into indexed tables (see
+evaluation/warehouse.py), so analysis can query across runs instead of
+globbing timestamped JSON files. Ingesting is incremental: files already
+loaded and unchanged are skipped.
+
+Usage:
+    # Load everything under the results directories
+    python ingest_results.py results_v5 results
+
+    # Accuracy by category for agent over its last 5 runs
+    python ingest_results.py --category-accuracy agent --last 5
+
+    # Then analyze from the warehouse
+    python analyze_results.py --db results/warehouse.db
+"""
+
+import argparse
+
+from evaluation.warehouse import DEFAULT_DB_PATH, accuracy_by_category, connect, ingest_paths
+
+
+def print_category_accuracy(conn, system: str, last_n: int):
+    rows = accuracy_by_category(conn, system, last_n)
+    if not rows:
+        print(f"No runs of {system} in the warehouse.")
+        return
+    print(f"\n{system}: accuracy by category over the last {rows[0]['runs']} run(s)")
+    print(f"\n{'Category':<25} {'tests':>6} {'correct':>8} {'partial':>8} {'accuracy':>9}")
+    print("-" * 60)
+    for r in rows:
+        print(f"  {r['category']:<23} {r['tests']:>6} {r['correct']:>8} "
+              f"{r['partially_correct']:>8} {r['accuracy']:>9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load results into the SQLite warehouse")
+    parser.add_argument("paths", nargs="*",
+                        help="Results JSON files or directories to scan for *_results_*.json")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH,
+                        help=f"Warehouse database (default: {DEFAULT_DB_PATH})")
+    parser.add_argument("--category-accuracy", metavar="SYSTEM", default=None,
+                        help="Print accuracy by category for a system (e.g. agent)")
+    parser.add_argument("--last", type=int, default=5,
+                        help="Runs included by --category-accuracy (default: 5)")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.paths:
+        loaded, skipped, missing = ingest_paths(conn, args.paths)
+        for path in missing:
+            print(f"Warning: {path} does not exist; skipped")
+        runs = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        print(f"Loaded {loaded} results file(s), {skipped} already up to date; "
+              f"{runs} run(s) in {args.db}")
+    if args.category_accuracy:
+        print_category_accuracy(conn, args.category_accuracy, args.last)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,26 @@
-from .base import BaseMemorySystem
-from .embedder import Embedder
-from .external_mem0 import Mem0Memory
-from .agent_driven import AgentDrivenMemory
+"""Memory systems under test.
+
+Exports are resolved on first access, so importing one system (or
+memory_systems.tokens, say) doesn't import the OpenAI SDK, NumPy or an
+optional backend such as mem0 along with every other system.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "BaseMemorySystem": ".base",
+    "Embedder": ".embedder",
+    "Mem0Memory": ".external_mem0",
+    "AgentDrivenMemory": ".agent_driven",
+    "MultiTenantMemory": ".multi_tenant",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
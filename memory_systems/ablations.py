@@ -71,8 +71,7 @@ class AgentNoFeedback(AgentDrivenMemory):
                     created_at=session_id,
                     updated_at=session_id,
                 )
-                self._memories[mem_id] = entry
-                self._vectors[mem_id] = vector
+                self._put_memory(mem_id, entry, vector)
                 entries.append(entry)
                 self.stats.entries_added += 1
 
@@ -89,19 +88,18 @@ class AgentNoFeedback(AgentDrivenMemory):
         if update_texts:
             update_vectors = self.embedder.embed_batch(update_texts)
             for (old_id, item), vector in zip(update_ids, update_vectors):
-                self._memories[old_id].content = item["new_content"]
-                self._memories[old_id].updated_at = session_id
-                self._memories[old_id].metadata["last_update_reason"] = item.get("reason", "")
-                self._vectors[old_id] = vector
-                entries.append(self._memories[old_id])
+                entry = self._memories[old_id]
+                entry.content = item["new_content"]
+                entry.updated_at = session_id
+                entry.metadata["last_update_reason"] = item.get("reason", "")
+                self._put_memory(old_id, entry, vector)
+                entries.append(entry)
                 self.stats.entries_updated += 1
 
         # --- deletes (still honoured, though unlikely to hit valid IDs) ---
         for item in decisions.get("delete", []):
             del_id = item if isinstance(item, str) else item.get("id", "")
-            if del_id in self._memories:
-                del self._memories[del_id]
-                self._vectors.pop(del_id, None)
+            if self._drop_memory(del_id):
                 self.stats.entries_deleted += 1
 
         # Consolidation still runs (only the feedback loop is ablated).
@@ -127,13 +125,14 @@ class AgentNoConsolidation(AgentDrivenMemory):
 
     def __init__(self, user_id: str, openai_api_key: str = None,
                  model: str = "gpt-4o-mini", **kwargs):
-        # Set consolidation_threshold to infinity so the check in
-        # add_conversation (len > threshold) is never True.
+        # Set consolidation_threshold to infinity so the consolidation
+        # check after each session (len > threshold) is never True.
         super().__init__(
             user_id=user_id,
             openai_api_key=openai_api_key,
             model=model,
             consolidation_threshold=math.inf,
+            **kwargs,
         )
 
 
@@ -191,8 +190,7 @@ class AgentAddOnly(AgentDrivenMemory):
                     created_at=session_id,
                     updated_at=session_id,
                 )
-                self._memories[mem_id] = entry
-                self._vectors[mem_id] = vector
+                self._put_memory(mem_id, entry, vector)
                 entries.append(entry)
                 self.stats.entries_added += 1
 
@@ -8,11 +8,18 @@ Key characteristic: memory management is woven into the conversation itself,
 not bolted on as a post-hoc batch job.
 """
 
+import base64
 import json
 import uuid
-from openai import OpenAI
+from array import array
+from dataclasses import asdict
+from . import resources
 from .base import BaseMemorySystem, MemoryEntry, MemoryStats
-from .embedder import Embedder
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .llm import LLMMemoryMixin
+
+# Version of the snapshot()/restore() format
+SNAPSHOT_FORMAT = 1
 
 # ---------------------------------------------------------------------------
 # Legacy prompt — still used by ablation variants (imported from ablations.py)
@@ -60,23 +67,8 @@ Output ONLY valid JSON:
 # Conversationalist prompt — single LLM call produces response + memory ops
 # ---------------------------------------------------------------------------
 
-CONVERSATION_PROMPT = """You are a personal AI assistant with persistent memory. You remember things about the user across conversations so you can be helpful in future sessions.
-
-## Memory Schema
-Each memory has: [id] content (importance: high|medium|low)
-
-## Your Current Memories (retrieved by relevance to this conversation)
-{retrieved_memories}
-
-## Conversation So Far (Session {session_id})
-{conversation}
-
-## Instructions
-
-1. Respond to the user's latest message naturally and helpfully.
-2. Decide what memory operations are needed. Your goal is to build a rich, accurate profile of the user over time.
-
-### What to ADD
+# What to add, update, delete and skip; shared by the per-turn and backfill prompts
+_MEMORY_GUIDELINES = """### What to ADD
 Store any fact that would help you be a better assistant in future conversations:
 - Identity and role (name, job title, company, location)
 - Projects and work details (what they're building, tools used, team size)
@@ -124,23 +116,98 @@ Example 4 — User mentions a milestone in a progression:
 Existing memory: [def2] User's model achieves 78% accuracy on the validation set (high)
 Conversation: "After switching to a larger embedding model, we're at 86% accuracy now."
 Good memory_ops:
-  update: id=def2, new_content="User's model accuracy improved from 78% to 86% after switching to a larger embedding model" (reason: "metric improved, preserving progression")
+  update: id=def2, new_content="User's model accuracy improved from 78% to 86% after switching to a larger embedding model" (reason: "metric improved, preserving progression")"""
+
+# The instructions and examples are identical on every call, so they go in the
+# system message where the provider's prompt cache can reuse them; everything
+# that changes per turn is in the user message that follows. Within a session
+# the conversation only grows, so it comes before the retrieved memories and the
+# previous turn's transcript stays part of the cacheable prefix too.
+CONVERSATION_SYSTEM_PROMPT = """You are a personal AI assistant with persistent memory. You remember things about the user across conversations so you can be helpful in future sessions.
+
+## Memory Schema
+Each memory has: [id] content (importance: high|medium|low)
+
+Each turn you are given the conversation so far, followed by your current memories (retrieved by relevance to the user's latest message).
+
+## Instructions
+
+1. Respond to the user's latest message naturally and helpfully.
+2. Decide what memory operations are needed. Your goal is to build a rich, accurate profile of the user over time.
+
+""" + _MEMORY_GUIDELINES + """
 
 Output ONLY valid JSON (no markdown code blocks, no extra text):
-{{
+{
     "response": "Your natural response to the user...",
-    "memory_ops": {{
+    "memory_ops": {
         "add": [
-            {{"content": "...", "importance": "high|medium|low"}}
+            {"content": "...", "importance": "high|medium|low"}
         ],
         "update": [
-            {{"id": "...", "new_content": "...", "reason": "..."}}
+            {"id": "...", "new_content": "...", "reason": "..."}
         ],
         "delete": [
-            {{"id": "...", "reason": "..."}}
+            {"id": "...", "reason": "..."}
         ]
-    }}
-}}"""
+    }
+}"""
+
+CONVERSATION_PROMPT = """## Conversation So Far (Session {session_id})
+{conversation}
+
+## Your Current Memories (retrieved by relevance to the latest message)
+{retrieved_memories}"""
+
+# ---------------------------------------------------------------------------
+# Backfill prompt — one LLM call replays whole sessions, no responses
+# ---------------------------------------------------------------------------
+
+BACKFILL_SYSTEM_PROMPT = """You are the memory manager of a personal AI assistant, replaying past conversations to build the user's memory profile. The assistant's replies are already in the transcript; you do not write responses.
+
+## Memory Schema
+Each memory has: [id] content (importance: high|medium|low)
+
+You are given one or more past sessions, oldest first, with every user turn numbered ([T1], [T2], ...), followed by your current memories (retrieved by relevance to those user turns).
+
+## Instructions
+
+Go through the user turns in order and give, for each turn, the memory operations you would make if you were processing that turn live, with the operations for earlier turns already applied.
+- To update or delete a memory you added for an earlier turn of this transcript, give that add a "ref" (e.g. "r1") and use the ref as the id.
+- Leave out turns that need no operations.
+
+""" + _MEMORY_GUIDELINES + """
+
+Output ONLY valid JSON (no markdown code blocks, no extra text):
+{
+    "turns": [
+        {
+            "turn": 1,
+            "add": [
+                {"content": "...", "importance": "high|medium|low", "ref": "r1"}
+            ],
+            "update": [
+                {"id": "...", "new_content": "...", "reason": "..."}
+            ],
+            "delete": [
+                {"id": "...", "reason": "..."}
+            ]
+        }
+    ]
+}"""
+
+BACKFILL_PROMPT = """## Sessions
+{transcript}
+
+## Your Current Memories (retrieved by relevance to the user turns)
+{retrieved_memories}"""
+
+# Output budget per session replayed in one backfill call, and the cap
+BACKFILL_MAX_TOKENS_PER_SESSION = 2000
+BACKFILL_MAX_TOKENS = 16000
+
+# Sessions per backfill call for the agent_backfill system in run_experiment.py
+DEFAULT_BACKFILL_SESSIONS = 4
 
 CONSOLIDATION_PROMPT = """You are a memory consolidation system. Review these memories and merge/clean them up.
 
@@ -164,7 +231,7 @@ Output ONLY valid JSON:
 }}"""
 
 
-class AgentDrivenMemory(BaseMemorySystem):
+class AgentDrivenMemory(LLMMemoryMixin, BaseMemorySystem):
     """Memory system where the LLM agent decides what to remember."""
 
     def __init__(
@@ -173,28 +240,64 @@ class AgentDrivenMemory(BaseMemorySystem):
         openai_api_key: str = None,
         model: str = "gpt-4o-mini",
         consolidation_threshold: int = 20,
+        retrieval: str = "vector",
+        backfill_sessions: int = 0,
+        embedder=None,
+        vectors=None,
     ):
+        """
+        Args:
+            retrieval: "vector" (cosine only) or "hybrid" (cosine and BM25,
+                fused with reciprocal rank fusion).
+            backfill_sessions: 0 processes every user turn live (one LLM call
+                per turn, with a response). N > 0 is backfill mode for historic
+                conversations: up to N sessions per LLM call, no responses, with
+                memory ops tagged by turn and applied in turn order.
+            embedder: Embedder to use instead of the pooled OpenAI one.
+            vectors: Mutable mapping {id: vector} to keep embeddings in
+                (default a dict), e.g. a multi_tenant.VectorPartition.
+        """
+        if retrieval not in ("vector", "hybrid"):
+            raise ValueError(f"Unknown retrieval mode: {retrieval}")
+        if backfill_sessions < 0:
+            raise ValueError(f"backfill_sessions must be >= 0, got {backfill_sessions}")
         super().__init__(user_id)
-        self.client = OpenAI(api_key=openai_api_key)
+        # Clients come from the per-process pool; only memories are per user
+        self.client = resources.openai_client(openai_api_key)
         self.model = model
         self.consolidation_threshold = consolidation_threshold
-        self.embedder = Embedder(api_key=openai_api_key)
+        self.embedder = embedder or resources.embedder(openai_api_key)
+        self.retrieval = retrieval
+        self.backfill_sessions = backfill_sessions
 
-        # Simple storage: {id: MemoryEntry} and {id: embedding_vector}
+        # Simple storage: {id: MemoryEntry} and {id: embedding_vector}, plus a
+        # keyword index over the same contents (kept in sync by _put/_drop_memory)
         self._memories: dict[str, MemoryEntry] = {}
-        self._vectors: dict[str, list[float]] = {}
-
-    def _call_llm(self, prompt: str) -> str:
-        response = self.client.chat.completions.create(
-            model=self.model,
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}],
-        )
-        self.stats.llm_calls += 1
-        if response.usage:
-            self.stats.total_input_tokens += response.usage.prompt_tokens
-            self.stats.total_output_tokens += response.usage.completion_tokens
-        return response.choices[0].message.content
+        self._vectors: dict[str, list[float]] = vectors if vectors is not None else {}
+        self._bm25 = BM25Index()
+
+    def _put_memory(self, mem_id: str, entry: MemoryEntry, vector: list[float]):
+        """Store or overwrite a memory in every index."""
+        self._memories[mem_id] = entry
+        self._vectors[mem_id] = vector
+        self._bm25.add(mem_id, entry.content)
+
+    def _drop_memory(self, mem_id: str) -> bool:
+        """Remove a memory from every index; False if it wasn't stored."""
+        if self._memories.pop(mem_id, None) is None:
+            return False
+        self._vectors.pop(mem_id, None)
+        self._bm25.remove(mem_id)
+        return True
+
+    def _rank(self, text: str, top_k: int) -> list[str]:
+        """Memory ids most relevant to text, best first."""
+        if self.retrieval == "vector":
+            return [mid for mid, _ in self.embedder.search(text, self._vectors, top_k=top_k)]
+        # Fuse full rankings so a strong keyword hit can outrank weak cosine ones
+        vector_ids = [mid for mid, _ in self.embedder.search(text, self._vectors, top_k=len(self._vectors))]
+        keyword_ids = [mid for mid, _ in self._bm25.search(text, top_k=len(self._bm25))]
+        return [mid for mid, _ in reciprocal_rank_fusion([vector_ids, keyword_ids])[:top_k]]
 
     def _format_memories(self) -> str:
         if not self._memories:
@@ -204,31 +307,11 @@ class AgentDrivenMemory(BaseMemorySystem):
             lines.append(f"[{mid}] {mem.content} (importance: {mem.metadata.get('importance', 'unknown')})")
         return "\n".join(lines)
 
-    def _format_conversation(self, turns: list[dict]) -> str:
-        lines = []
-        for turn in turns:
-            role = "User" if turn["role"] == "user" else "Assistant"
-            lines.append(f"{role}: {turn['content']}")
-        return "\n".join(lines)
-
-    def _parse_json_response(self, raw_response: str) -> dict | None:
-        """Extract and parse JSON from an LLM response."""
-        try:
-            json_str = raw_response
-            if "```json" in json_str:
-                json_str = json_str.split("```json")[1].split("```")[0]
-            elif "```" in json_str:
-                json_str = json_str.split("```")[1].split("```")[0]
-            return json.loads(json_str.strip())
-        except (json.JSONDecodeError, IndexError):
-            return None
-
     def _retrieve_by_text(self, text: str, top_k: int = 5) -> dict[str, MemoryEntry]:
         """Embed a text string and retrieve the most relevant memories."""
         if not self._memories:
             return {}
-        results = self.embedder.search(text, self._vectors, top_k=top_k)
-        return {mid: self._memories[mid] for mid, _score in results if mid in self._memories}
+        return {mid: self._memories[mid] for mid in self._rank(text, top_k) if mid in self._memories}
 
     def _format_retrieved_memories(self, retrieved: dict[str, MemoryEntry]) -> str:
         """Format retrieved memories for the conversation prompt."""
@@ -262,8 +345,7 @@ class AgentDrivenMemory(BaseMemorySystem):
                     created_at=session_id,
                     updated_at=session_id,
                 )
-                self._memories[mem_id] = entry
-                self._vectors[mem_id] = vector
+                self._put_memory(mem_id, entry, vector)
                 entries.append(entry)
                 self.stats.entries_added += 1
 
@@ -280,24 +362,29 @@ class AgentDrivenMemory(BaseMemorySystem):
         if update_texts:
             update_vectors = self.embedder.embed_batch(update_texts)
             for (old_id, item), vector in zip(update_ids, update_vectors):
-                self._memories[old_id].content = item["new_content"]
-                self._memories[old_id].updated_at = session_id
-                self._memories[old_id].metadata["last_update_reason"] = item.get("reason", "")
-                self._vectors[old_id] = vector
-                entries.append(self._memories[old_id])
+                entry = self._memories[old_id]
+                entry.content = item["new_content"]
+                entry.updated_at = session_id
+                entry.metadata["last_update_reason"] = item.get("reason", "")
+                self._put_memory(old_id, entry, vector)
+                entries.append(entry)
                 self.stats.entries_updated += 1
 
         # Process deletions
         for item in ops.get("delete", []):
             del_id = item if isinstance(item, str) else item.get("id", "")
-            if del_id in self._memories:
-                del self._memories[del_id]
-                self._vectors.pop(del_id, None)
+            if self._drop_memory(del_id):
                 self.stats.entries_deleted += 1
 
         return entries
 
     def add_conversation(self, turns: list[dict], session_id: int) -> list[MemoryEntry]:
+        """Process a conversation turn by turn, or in one call in backfill mode."""
+        if self.backfill_sessions:
+            return self._backfill([(turns, session_id)])
+        return self._converse(turns, session_id)
+
+    def _converse(self, turns: list[dict], session_id: int) -> list[MemoryEntry]:
         """Process a conversation turn-by-turn, like a real conversationalist.
 
         For each user turn:
@@ -324,10 +411,10 @@ class AgentDrivenMemory(BaseMemorySystem):
                 session_id=session_id,
                 conversation=self._format_conversation(conversation_so_far),
             )
-            raw_response = self._call_llm(prompt)
+            raw_response = self._call_llm(prompt, system=CONVERSATION_SYSTEM_PROMPT)
             parsed = self._parse_json_response(raw_response)
 
-            if parsed is None:
+            if not isinstance(parsed, dict):
                 print(f"Warning: Failed to parse response for {self.user_id} session {session_id}")
                 print(f"Raw response: {raw_response[:500]}")
                 continue
@@ -345,6 +432,95 @@ class AgentDrivenMemory(BaseMemorySystem):
 
         return all_entries
 
+    def add_sessions(self, sessions: list[tuple[list[dict], int]]) -> list[MemoryEntry]:
+        """Ingest sessions oldest first; backfill mode replays backfill_sessions per call."""
+        if not self.backfill_sessions:
+            return super().add_sessions(sessions)
+        entries = []
+        for i in range(0, len(sessions), self.backfill_sessions):
+            entries.extend(self._backfill(sessions[i:i + self.backfill_sessions]))
+        return entries
+
+    def _backfill(self, sessions: list[tuple[list[dict], int]]) -> list[MemoryEntry]:
+        """Replay sessions in one LLM call and apply its ops in turn order.
+
+        The ops are speculative: every turn's decisions are made against the
+        memories retrieved before the call, not the ones earlier turns would
+        have produced, so in-call references go through "ref" labels. A
+        response that can't be parsed falls back to per-turn processing for
+        these sessions.
+        """
+        lines = []
+        turn_sessions = []  # session_id of each numbered user turn
+        for turns, session_id in sessions:
+            lines.append(f"### Session {session_id}")
+            for turn in turns:
+                if turn["role"] == "user":
+                    turn_sessions.append(session_id)
+                    lines.append(f"[T{len(turn_sessions)}] User: {turn['content']}")
+                else:
+                    lines.append(f"Assistant: {turn['content']}")
+        if not turn_sessions:
+            return []
+
+        # Union of what each user turn would have retrieved live, embedded in one batch
+        user_texts = [t["content"] for turns, _ in sessions for t in turns if t["role"] == "user"]
+        retrieved = {}
+        if self._memories:
+            self.embedder.embed_batch(user_texts)
+            for text in user_texts:
+                retrieved.update(self._retrieve_by_text(text, top_k=5))
+
+        prompt = BACKFILL_PROMPT.format(
+            transcript="\n".join(lines),
+            retrieved_memories=self._format_retrieved_memories(retrieved),
+        )
+        raw_response = self._call_llm(
+            prompt, system=BACKFILL_SYSTEM_PROMPT,
+            max_tokens=min(BACKFILL_MAX_TOKENS, BACKFILL_MAX_TOKENS_PER_SESSION * len(sessions)),
+        )
+        parsed = self._parse_json_response(raw_response)
+        if not isinstance(parsed, dict) or not isinstance(parsed.get("turns"), list):
+            session_ids = [session_id for _, session_id in sessions]
+            print(f"Warning: Failed to parse backfill for {self.user_id} sessions {session_ids}; "
+                  f"processing them turn by turn")
+            entries = []
+            for turns, session_id in sessions:
+                entries.extend(self._converse(turns, session_id))
+            return entries
+
+        # Stable sort: ops without a valid turn number apply after the last turn
+        last = len(turn_sessions)
+        def turn_of(ops):
+            turn = ops.get("turn")
+            return turn if isinstance(turn, int) and 1 <= turn <= last else last
+        turn_ops = sorted((ops for ops in parsed["turns"] if isinstance(ops, dict)), key=turn_of)
+
+        entries = []
+        refs = {}  # "ref" label -> memory id, for adds made earlier in this call
+        for turn in turn_ops:
+            add_items = [item for item in turn.get("add", []) if isinstance(item, dict) and item.get("content")]
+            ops = {
+                "add": add_items,
+                "update": [{**item, "id": refs.get(item.get("id"), item.get("id"))}
+                           for item in turn.get("update", [])
+                           if isinstance(item, dict) and isinstance(item.get("new_content"), str)
+                           and item["new_content"]],
+                "delete": [refs.get(del_id, del_id) for del_id in (
+                    item if isinstance(item, str) else item.get("id", "")
+                    for item in turn.get("delete", []) if isinstance(item, (str, dict)))],
+            }
+            applied = self._process_memory_ops(ops, turn_sessions[turn_of(turn) - 1])
+            # Adds come back first, in order
+            for item, entry in zip(add_items, applied):
+                if item.get("ref"):
+                    refs[item["ref"]] = entry.id
+            entries.extend(applied)
+
+        if len(self._memories) > self.consolidation_threshold:
+            self._consolidate()
+        return entries
+
     def _consolidate(self):
         prompt = CONSOLIDATION_PROMPT.format(memories=self._format_memories())
         raw_response = self._call_llm(prompt)
@@ -373,30 +549,83 @@ class AgentDrivenMemory(BaseMemorySystem):
             merge_vectors = self.embedder.embed_batch(merge_texts)
             for (source_ids, merged_content), vector in zip(merge_sources, merge_vectors):
                 for sid in source_ids:
-                    self._memories.pop(sid, None)
-                    self._vectors.pop(sid, None)
+                    self._drop_memory(sid)
 
                 new_id = str(uuid.uuid4())[:8]
-                self._memories[new_id] = MemoryEntry(
+                self._put_memory(new_id, MemoryEntry(
                     id=new_id, content=merged_content,
                     metadata={"importance": "high", "source": "consolidation"},
-                )
-                self._vectors[new_id] = vector
+                ), vector)
 
         for del_id in decisions.get("delete", []):
-            self._memories.pop(del_id, None)
-            self._vectors.pop(del_id, None)
+            self._drop_memory(del_id)
+
+    def import_memories(self, memories: list[MemoryEntry]) -> int:
+        """Load existing memories (e.g. a saved snapshot) without any LLM calls.
+
+        Contents are embedded in one batch. Returns the number imported.
+        """
+        memories = [m for m in memories if m.content]
+        vectors = self.embedder.embed_batch([m.content for m in memories])
+        for entry, vector in zip(memories, vectors):
+            self._put_memory(entry.id, entry, vector)
+        return len(memories)
 
     def search(self, query: str, top_k: int = 5) -> list[MemoryEntry]:
         if not self._memories:
             return []
-        results = self.embedder.search(query, self._vectors, top_k=top_k)
-        return [self._memories[mid] for mid, _ in results if mid in self._memories]
+        return [self._memories[mid] for mid in self._rank(query, top_k) if mid in self._memories]
 
     def get_all(self) -> list[MemoryEntry]:
         return list(self._memories.values())
 
+    def snapshot(self) -> dict:
+        """Serializable state: memories (the results files' all_memories_after
+        shape, plus session numbers), their embeddings and the stats."""
+        ids = list(self._memories)
+        vectors = array("f")
+        for mid in ids:
+            vectors.extend(self._vectors[mid])
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "user_id": self.user_id,
+            "memories": [
+                {"id": m.id, "content": m.content, "metadata": m.metadata,
+                 "created_at": m.created_at, "updated_at": m.updated_at}
+                for m in self._memories.values()
+            ],
+            "embedding_model": self.embedder.model,
+            # float32 rows in memory order, base64-encoded
+            "vectors": base64.b64encode(vectors.tobytes()).decode("ascii"),
+            "stats": asdict(self.stats),
+        }
+
+    def restore(self, snapshot: dict) -> int:
+        """Replace this store's state with a snapshot; returns memories loaded.
+
+        Embeddings are reused when the snapshot has them for this embedding
+        model; otherwise (e.g. a results file's all_memories_after) the
+        contents are re-embedded like import_memories.
+        """
+        self.reset()
+        memories = [
+            MemoryEntry(id=m["id"], content=m["content"], metadata=m.get("metadata", {}),
+                        created_at=m.get("created_at"), updated_at=m.get("updated_at"))
+            for m in snapshot.get("memories", [])
+        ]
+        self.stats = MemoryStats(**snapshot.get("stats", {}))
+        vectors = array("f")
+        if snapshot.get("vectors") and snapshot.get("embedding_model") == self.embedder.model:
+            vectors.frombytes(base64.b64decode(snapshot["vectors"]))
+        if not memories or not vectors or len(vectors) % len(memories):
+            return self.import_memories(memories)
+        dim = len(vectors) // len(memories)
+        for i, entry in enumerate(memories):
+            self._put_memory(entry.id, entry, vectors[i * dim:(i + 1) * dim].tolist())
+        return len(memories)
+
     def reset(self):
         self._memories = {}
-        self._vectors = {}
+        self._vectors.clear()
+        self._bm25 = BM25Index()
         self.stats = MemoryStats()
@@ -25,6 +25,7 @@ class MemoryStats:
     llm_calls: int = 0
     total_input_tokens: int = 0
     total_output_tokens: int = 0
+    cached_input_tokens: int = 0  # of total_input_tokens, served from the provider's prompt cache
 
 
 class BaseMemorySystem(ABC):
@@ -47,6 +48,23 @@ class BaseMemorySystem(ABC):
         """
         pass
 
+    def add_sessions(self, sessions: list[tuple[list[dict], int]]) -> list[MemoryEntry]:
+        """Ingest several conversations, oldest first.
+
+        Args:
+            sessions: List of (turns, session_id) pairs in session order.
+
+        Returns:
+            List of MemoryEntry objects that were added/updated.
+
+        Systems with a cheaper bulk path override this; the default is one
+        add_conversation call per session.
+        """
+        entries = []
+        for turns, session_id in sessions:
+            entries.extend(self.add_conversation(turns, session_id))
+        return entries
+
     @abstractmethod
     def search(self, query: str, top_k: int = 5) -> list[MemoryEntry]:
         """Search memories by semantic relevance.
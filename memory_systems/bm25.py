@@ -0,0 +1,96 @@
+"""Keyword retrieval for memory search: an incremental BM25 index plus
+reciprocal rank fusion (RRF) with vector results.
+
+Cosine search over embeddings is good at paraphrase but weak on exact tokens —
+"50K page views", "Python 3.11", a product name. BM25 scores those directly.
+The index is updated in place as memories are added, rewritten and deleted, so
+it never needs a rebuild. Hybrid search ranks memories both ways and fuses the
+two rankings with RRF, which needs no score normalization.
+"""
+
+import math
+import re
+from collections import defaultdict
+
+# Words, numbers and joined tokens like "50k", "3.11", "ci/cd", "e-mail"
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.\-/][a-z0-9]+)*")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by do does for from has have he her his i in is it its "
+    "me my of on or our she so that the their them they this to was we were what when "
+    "where which who will with you your user".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index over short documents with Okapi BM25 scoring."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[str, int]] = defaultdict(dict)  # term -> {doc_id: tf}
+        self._doc_terms: dict[str, dict[str, int]] = {}  # doc_id -> {term: tf}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: str, text: str):
+        """Index a document, replacing any previous version with the same id."""
+        if doc_id in self._doc_terms:
+            self.remove(doc_id)
+        terms = defaultdict(int)
+        for token in tokenize(text):
+            terms[token] += 1
+        self._doc_terms[doc_id] = dict(terms)
+        self._lengths[doc_id] = sum(terms.values())
+        self._total_length += self._lengths[doc_id]
+        for term, tf in terms.items():
+            self._postings[term][doc_id] = tf
+
+    def remove(self, doc_id: str):
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, top_k: int = 5) -> list[tuple[str, float]]:
+        """Return (doc_id, score) pairs for documents sharing a query term."""
+        n = len(self._doc_terms)
+        if n == 0:
+            return []
+        avg_length = self._total_length / n or 1.0
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                length = self._lengths[doc_id]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return ranked[:top_k]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank)."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
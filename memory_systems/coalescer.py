@@ -0,0 +1,124 @@
+"""Cross-thread batching of embedding requests.
+
+Each memory system embeds a handful of texts at a time. When profiles run
+concurrently, those small requests from different users arrive within
+milliseconds of each other; sending each as its own HTTP call wastes round
+trips and rate-limit headroom. The coalescer queues requests from every thread,
+waits up to max_wait for more to arrive, sends them as one embeddings call
+(up to the API's per-request input limit), and hands each caller back its own
+slice of the result.
+
+With one caller at a time this only adds latency, so it is off unless the run
+is concurrent (see resources.set_coalescing).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# OpenAI accepts at most 2048 inputs per embeddings request
+MAX_INPUTS_PER_REQUEST = 2048
+
+
+class EmbeddingCoalescer:
+    """Gathers embed requests from all threads into batched API calls."""
+
+    def __init__(self, client, model: str, max_wait: float = 0.01,
+                 max_batch: int = MAX_INPUTS_PER_REQUEST):
+        """
+        Args:
+            client: OpenAI client used for the batched calls.
+            model: Embedding model name.
+            max_wait: Seconds to wait for more requests after the first one.
+            max_batch: Max texts per API call.
+        """
+        self.client = client
+        self.model = model
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._queue: queue.Queue[tuple[list[str], Future] | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.api_calls = 0
+        self.texts = 0
+        self._worker = threading.Thread(target=self._run, name="embedding-coalescer", daemon=True)
+        self._worker.start()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts as part of the next batch; blocks until it returns."""
+        if not texts:
+            return []
+        future = Future()
+        with self._lock:
+            self.requests += 1
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def close(self):
+        """Send already-queued requests, then stop the dispatcher."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "api_calls": self.api_calls,
+                "texts": self.texts,
+                "texts_per_call": self.texts / self.api_calls if self.api_calls else 0.0,
+            }
+
+    def _run(self):
+        pending = None  # request that didn't fit in the previous batch
+        closing = False
+        while not closing:
+            first = pending or self._queue.get()
+            pending = None
+            if first is None:
+                return
+            batch = [first]
+            size = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                if size + len(item[0]) > self.max_batch:
+                    pending = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._send(batch)
+
+    def _send(self, batch: list[tuple[list[str], Future]]):
+        inputs = [text for texts, _ in batch for text in texts]
+        try:
+            vectors = []
+            # A single oversized request is split across calls
+            for start in range(0, len(inputs), self.max_batch):
+                response = self.client.embeddings.create(
+                    model=self.model,
+                    input=inputs[start:start + self.max_batch],
+                )
+                vectors.extend(d.embedding for d in response.data)
+                with self._lock:
+                    self.api_calls += 1
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self.texts += len(inputs)
+        offset = 0
+        for texts, future in batch:
+            future.set_result(vectors[offset:offset + len(texts)])
+            offset += len(texts)
@@ -1,36 +1,121 @@
 """Shared embedding + vector search using OpenAI text-embedding-3-small.
 
 Both memory systems use this — keeps the comparison fair.
+
+Embeddings are memoized process-wide: the same text is embedded over and over
+during a run (a user turn retrieved against and then stored as a memory, a
+test query searched by the runner after the agent already embedded it). Every
+Embedder in the process shares one bounded LRU memo keyed by (model, text),
+so repeats cost nothing and memo_stats() shows how often that happens.
+
+Texts that miss the memo go to the API directly, or through an
+EmbeddingCoalescer when one is attached, which merges them with concurrent
+requests from other threads into one call.
 """
 
+import os
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from openai import OpenAI
 
+# ---------------------------------------------------------------------------
+# Process-wide embedding memo
+# ---------------------------------------------------------------------------
+
+MEMO_SIZE = int(os.getenv("EMBEDDING_MEMO_SIZE") or 20000)  # 0 disables
+
+_memo: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+_memo_lock = threading.Lock()
+_memo_hits = 0
+_memo_misses = 0
+
+
+def _memo_get(model: str, text: str) -> list[float] | None:
+    global _memo_hits, _memo_misses
+    with _memo_lock:
+        vector = _memo.get((model, text))
+        if vector is None:
+            _memo_misses += 1
+            return None
+        _memo.move_to_end((model, text))
+        _memo_hits += 1
+        return vector
+
+
+def _memo_put(model: str, text: str, vector: list[float]):
+    if MEMO_SIZE <= 0:
+        return
+    with _memo_lock:
+        _memo[(model, text)] = vector
+        _memo.move_to_end((model, text))
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def memo_stats() -> dict:
+    """Hit/miss counters and size of the process-wide embedding memo."""
+    with _memo_lock:
+        lookups = _memo_hits + _memo_misses
+        return {
+            "hits": _memo_hits,
+            "misses": _memo_misses,
+            "hit_rate": _memo_hits / lookups if lookups else 0.0,
+            "size": len(_memo),
+            "max_size": MEMO_SIZE,
+        }
+
+
+def clear_memo():
+    """Empty the memo and reset its counters."""
+    global _memo_hits, _memo_misses
+    with _memo_lock:
+        _memo.clear()
+        _memo_hits = 0
+        _memo_misses = 0
+
 
 class Embedder:
     """Thin wrapper around OpenAI embeddings with cosine similarity search."""
 
-    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small",
+                 client: OpenAI = None, coalescer=None):
+        self.client = client or OpenAI(api_key=api_key)
         self.model = model
+        self.coalescer = coalescer
 
-    def embed(self, text: str) -> list[float]:
-        """Embed a single text string."""
+    def _request(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts that missed the memo, via the coalescer if attached."""
+        if self.coalescer is not None:
+            return self.coalescer.embed(texts)
         response = self.client.embeddings.create(
             model=self.model,
-            input=text,
+            input=texts,
         )
-        return response.data[0].embedding
+        return [d.embedding for d in response.data]
+
+    def embed(self, text: str) -> list[float]:
+        """Embed a single text string."""
+        vector = _memo_get(self.model, text)
+        if vector is not None:
+            return vector
+        vector = self._request([text])[0]
+        _memo_put(self.model, text, vector)
+        return vector
 
     def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        """Embed multiple texts in one API call."""
+        """Embed multiple texts in one API call (memoized texts are skipped)."""
         if not texts:
             return []
-        response = self.client.embeddings.create(
-            model=self.model,
-            input=texts,
-        )
-        return [d.embedding for d in response.data]
+        vectors = [_memo_get(self.model, t) for t in texts]
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            fresh = dict(zip(missing, self._request(missing)))
+            for t, v in fresh.items():
+                _memo_put(self.model, t, v)
+            vectors = [v if v is not None else fresh[t] for t, v in zip(texts, vectors)]
+        return vectors
 
     @staticmethod
     def cosine_similarity(a: list[float], b: list[float]) -> float:
@@ -51,11 +136,19 @@ class Embedder:
         """
         if not documents:
             return []
+        return self.rank(self.embed(query), documents, top_k)
 
-        query_vec = self.embed(query)
+    @classmethod
+    def rank(cls, query_vec: list[float], documents: dict[str, list[float]],
+             top_k: int = 5) -> list[tuple[str, float]]:
+        """Rank documents against an already-embedded query."""
+        # Stores backed by a shared matrix (multi_tenant.VectorPartition) rank
+        # all their rows in one product
+        if hasattr(documents, "rank"):
+            return documents.rank(query_vec, top_k)
         scores = []
         for doc_id, doc_vec in documents.items():
-            score = self.cosine_similarity(query_vec, doc_vec)
+            score = cls.cosine_similarity(query_vec, doc_vec)
             scores.append((doc_id, score))
 
         scores.sort(key=lambda x: x[1], reverse=True)
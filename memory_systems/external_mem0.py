@@ -6,20 +6,39 @@ The key characteristic: the SYSTEM decides what to remember, not the agent.
 
 We configure Mem0 to use the same embedder (text-embedding-3-small)
 and gpt-4o-mini for its internal extraction, keeping the comparison fair.
+
+In local mode every Mem0Memory in a process shares one Qdrant client (in
+memory, or on disk at vector_store_path) and each user gets its own
+collection, so per-profile construction doesn't re-initialize a vector store.
+The client and the Memory instances come from the per-process resource pool.
 """
 
 import uuid
+from . import resources
 from .base import BaseMemorySystem, MemoryEntry, MemoryStats
-from .embedder import Embedder
+
+EMBEDDING_DIMS = 1536  # text-embedding-3-small
+
+# Namespace for ids of results Mem0 returns without one
+_ID_NAMESPACE = uuid.UUID("5b0f7a52-4c1e-4f55-9d59-3a8e3f0c6d10")
 
 
 class Mem0Memory(BaseMemorySystem):
     """Memory system backed by Mem0's automatic extraction."""
 
     def __init__(self, user_id: str, use_local: bool = True, api_key: str = None,
-                 openai_api_key: str = None):
+                 openai_api_key: str = None, vector_store_path: str | None = None,
+                 bulk_ingest: bool = False):
+        """
+        Args:
+            vector_store_path: Directory for the shared local Qdrant store;
+                None keeps it in memory. Ignored for the hosted API.
+            bulk_ingest: If True, add_sessions sends all sessions to Mem0 in
+                a single add() call instead of one call per session.
+        """
         super().__init__(user_id)
         self.use_local = use_local
+        self.bulk_ingest = bulk_ingest
 
         if use_local:
             from mem0 import Memory
@@ -38,14 +57,36 @@ class Mem0Memory(BaseMemorySystem):
                         "model": "text-embedding-3-small",
                     }
                 },
+                "vector_store": {
+                    "provider": "qdrant",
+                    "config": {
+                        "client": resources.qdrant_client(vector_store_path),
+                        "collection_name": f"memorybench_{user_id}",
+                        "embedding_model_dims": EMBEDDING_DIMS,
+                    }
+                },
             }
-            self.memory = Memory.from_config(config)
+            self.memory = resources.mem0_memory(
+                (vector_store_path, user_id), lambda: Memory.from_config(config),
+            )
+            # A pooled instance may hold this user's memories from an earlier trial
+            self.memory.delete_all(user_id=user_id)
         else:
             from mem0 import MemoryClient
             self.memory = MemoryClient(api_key=api_key)
 
         self._entry_cache = {}
 
+        # get_all() result, invalidated whenever memories change
+        self._all_cache = None
+
+    def _entry_id(self, r: dict) -> str:
+        """Mem0's id, or a stable one derived from the content if missing."""
+        if r.get("id"):
+            return r["id"]
+        content = r.get("memory", r.get("text", ""))
+        return str(uuid.uuid5(_ID_NAMESPACE, f"{self.user_id}\0{content}"))
+
     def add_conversation(self, turns: list[dict], session_id: int) -> list[MemoryEntry]:
         """Send conversation to Mem0 for automatic memory extraction.
 
@@ -59,19 +100,45 @@ class Mem0Memory(BaseMemorySystem):
                 "content": turn["content"],
             })
 
+        return self._add(messages, {"session_id": session_id}, session_id)
+
+    def add_sessions(self, sessions: list[tuple[list[dict], int]]) -> list[MemoryEntry]:
+        """Ingest several sessions; one Mem0 call for all of them in bulk mode.
+
+        Session boundaries are kept as system messages so Mem0's extractor
+        still sees which statements are newer.
+        """
+        if not self.bulk_ingest or len(sessions) < 2:
+            return super().add_sessions(sessions)
+
+        messages = []
+        for turns, session_id in sessions:
+            messages.append({"role": "system", "content": f"Session {session_id}"})
+            for turn in turns:
+                messages.append({
+                    "role": turn["role"],
+                    "content": turn["content"],
+                })
+
+        session_ids = [session_id for _, session_id in sessions]
+        return self._add(messages, {"session_id": session_ids[-1], "session_ids": session_ids},
+                         session_ids[-1])
+
+    def _add(self, messages: list[dict], metadata: dict, session_id: int) -> list[MemoryEntry]:
         result = self.memory.add(
             messages=messages,
             user_id=self.user_id,
-            metadata={"session_id": session_id},
+            metadata=metadata,
         )
 
         self.stats.llm_calls += 1
+        self._all_cache = None
 
         entries = []
         if isinstance(result, dict) and "results" in result:
             for r in result["results"]:
                 entry = MemoryEntry(
-                    id=r.get("id", str(uuid.uuid4())),
+                    id=self._entry_id(r),
                     content=r.get("memory", r.get("text", "")),
                     metadata={"session_id": session_id, "source": "mem0", "event": r.get("event", "ADD")},
                     created_at=session_id,
@@ -100,7 +167,7 @@ class Mem0Memory(BaseMemorySystem):
         result_list = results if isinstance(results, list) else results.get("results", [])
         for r in result_list:
             entry = MemoryEntry(
-                id=r.get("id", str(uuid.uuid4())),
+                id=self._entry_id(r),
                 content=r.get("memory", r.get("text", "")),
                 metadata=r.get("metadata", {}),
             )
@@ -110,22 +177,27 @@ class Mem0Memory(BaseMemorySystem):
 
     def get_all(self) -> list[MemoryEntry]:
         """Get all memories stored by Mem0 for this user."""
+        if self._all_cache is not None:
+            return list(self._all_cache)
+
         results = self.memory.get_all(user_id=self.user_id)
 
         entries = []
         result_list = results if isinstance(results, list) else results.get("results", [])
         for r in result_list:
             entry = MemoryEntry(
-                id=r.get("id", str(uuid.uuid4())),
+                id=self._entry_id(r),
                 content=r.get("memory", r.get("text", "")),
                 metadata=r.get("metadata", {}),
             )
             entries.append(entry)
 
-        return entries
+        self._all_cache = entries
+        return list(entries)
 
     def reset(self):
         """Clear all Mem0 memories for this user."""
         self.memory.delete_all(user_id=self.user_id)
         self._entry_cache = {}
+        self._all_cache = None
         self.stats = MemoryStats()
@@ -1,16 +1,23 @@
 """Full-context baseline memory system.
 
 Stores every conversation transcript verbatim with no extraction, summarization,
-or embedding. Retrieval returns all stored transcripts (up to top_k) without
+or embedding. Retrieval returns the most recent transcripts (up to top_k) without
 any semantic ranking. This represents the naive "stuff everything into the
 context window" upper bound baseline.
 
+With a token budget, transcripts are packed newest-first until the budget is
+spent; with compression on, a session that doesn't fit whole is reduced to the
+user's own turns before being dropped. That bounds context size the way a real
+context window would.
+
 No LLM calls are made. No embeddings are computed. This is purely raw storage
 and retrieval of complete conversation histories.
 """
 
+import os
 import uuid
 from .base import BaseMemorySystem, MemoryEntry, MemoryStats
+from .tokens import estimate_tokens
 
 
 class FullContextBaseline(BaseMemorySystem):
@@ -22,9 +29,29 @@ class FullContextBaseline(BaseMemorySystem):
     cost of context window space — the assistant sees everything, unprocessed.
     """
 
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, token_budget: int | None = None, compress: bool = False):
+        """
+        Args:
+            token_budget: Max transcript tokens returned by search; None is
+                unbounded (top_k transcripts).
+            compress: If True, a transcript that doesn't fit the remaining
+                budget is reduced to its user turns before being dropped.
+        """
         super().__init__(user_id)
+        self.token_budget = token_budget
+        self.compress = compress
         self._memories: dict[str, MemoryEntry] = {}
+        self._compressed: dict[str, str] = {}  # id -> user-turns-only transcript
+
+    @classmethod
+    def from_env(cls, user_id: str) -> "FullContextBaseline":
+        """Configured from FULL_CONTEXT_TOKEN_BUDGET and FULL_CONTEXT_COMPRESS."""
+        budget = os.getenv("FULL_CONTEXT_TOKEN_BUDGET")
+        return cls(
+            user_id=user_id,
+            token_budget=int(budget) if budget else None,
+            compress=os.getenv("FULL_CONTEXT_COMPRESS", "").lower() in ("1", "true", "yes"),
+        )
 
     def _format_conversation(self, turns: list[dict]) -> str:
         """Format conversation turns into a single text transcript.
@@ -58,6 +85,7 @@ class FullContextBaseline(BaseMemorySystem):
             return []
 
         transcript = self._format_conversation(turns)
+        compressed = self._format_conversation([t for t in turns if t["role"] == "user"])
         mem_id = str(uuid.uuid4())[:8]
 
         entry = MemoryEntry(
@@ -67,20 +95,24 @@ class FullContextBaseline(BaseMemorySystem):
                 "session_id": session_id,
                 "source": "full_context",
                 "num_turns": len(turns),
+                "tokens": estimate_tokens(transcript),
+                "compressed_tokens": estimate_tokens(compressed),
             },
             created_at=session_id,
             updated_at=session_id,
         )
 
         self._memories[mem_id] = entry
+        self._compressed[mem_id] = compressed
         self.stats.entries_added += 1
         return [entry]
 
     def search(self, query: str, top_k: int = 5) -> list[MemoryEntry]:
-        """Return all stored transcripts, up to top_k.
+        """Return the most recent transcripts that fit, up to top_k.
 
-        No semantic search is performed. Results are returned in insertion
-        order (earliest sessions first), capped at top_k.
+        No semantic search is performed. Sessions are packed newest-first
+        against the token budget, then returned in chronological order so
+        the answer prompt reads like the conversation history.
 
         Args:
             query: Ignored (no semantic search).
@@ -89,8 +121,28 @@ class FullContextBaseline(BaseMemorySystem):
         Returns:
             List of MemoryEntry objects (up to top_k).
         """
-        all_entries = list(self._memories.values())
-        return all_entries[:top_k]
+        packed = []
+        remaining = self.token_budget
+        for entry in reversed(list(self._memories.values())):
+            if len(packed) >= top_k:
+                break
+            if remaining is None or entry.metadata["tokens"] <= remaining:
+                packed.append(entry)
+                cost = entry.metadata["tokens"]
+            elif self.compress and entry.metadata["compressed_tokens"] <= remaining:
+                packed.append(MemoryEntry(
+                    id=entry.id,
+                    content=self._compressed[entry.id],
+                    metadata={**entry.metadata, "packed_compressed": True},
+                    created_at=entry.created_at,
+                    updated_at=entry.updated_at,
+                ))
+                cost = entry.metadata["compressed_tokens"]
+            else:
+                break
+            if remaining is not None:
+                remaining -= cost
+        return packed[::-1]
 
     def get_all(self) -> list[MemoryEntry]:
         """Return all stored conversation transcripts.
@@ -103,4 +155,5 @@ class FullContextBaseline(BaseMemorySystem):
     def reset(self):
         """Clear all stored transcripts."""
         self._memories = {}
+        self._compressed = {}
         self.stats = MemoryStats()
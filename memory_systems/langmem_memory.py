@@ -11,33 +11,44 @@ For this benchmark, we focus on semantic memory for storing facts from conversat
 
 import uuid
 import os
+from . import resources
 from .base import BaseMemorySystem, MemoryEntry, MemoryStats
+from .embedder import Embedder
+from .tokens import estimate_tokens
+
+EMBEDDING_DIMS = 1536  # text-embedding-3-small
 
 
 class LangMemMemory(BaseMemorySystem):
     """Memory system backed by LangMem's semantic memory."""
 
-    def __init__(self, user_id: str, openai_api_key: str = None):
+    def __init__(self, user_id: str, openai_api_key: str = None, embedder: Embedder = None,
+                 existing_top_k: int | None = None):
+        """
+        Args:
+            existing_top_k: If set, only the k stored memories most relevant to
+                the session's user messages are passed to the manager as
+                `existing`, instead of every memory extracted so far.
+        """
         super().__init__(user_id)
         
         # Set OpenAI API key if provided
         if openai_api_key:
             os.environ["OPENAI_API_KEY"] = openai_api_key
         
-        from langmem import create_memory_manager
-        from langgraph.store.memory import InMemoryStore
-        
-        # Create memory manager for extracting facts
-        self.manager = create_memory_manager(
+        # Memory manager for extracting facts, shared across users
+        self.manager = resources.langmem_manager(
             "openai:gpt-4o-mini",  # Same LLM as other systems for fair comparison
             instructions="Extract user preferences, facts, and important information from conversations",
-            enable_inserts=True,
-            enable_updates=True,
         )
         
+        # Same embedder as the other systems — store.search ranks by cosine
+        # similarity over these vectors instead of returning items unranked.
+        self.embedder = embedder or resources.embedder(openai_api_key)
+
         # Create in-memory store for storing memories
         # In production, this would be a DB-backed store
-        self.store = InMemoryStore()
+        self.store = self._create_store()
         
         # Namespace for this user's memories
         self.namespace = (user_id, "memories")
@@ -45,8 +56,21 @@ class LangMemMemory(BaseMemorySystem):
         # Cache for tracking entries
         self._entry_cache = {}
 
-        # Cache for LangMem ExtractedMemory objects
-        self._langmem_memories = []
+        # Cache for LangMem ExtractedMemory objects, keyed by id
+        self._langmem_memories = {}
+
+        self.existing_top_k = existing_top_k
+
+        # Estimated manager prompt tokens (messages + existing) per session
+        self.prompt_tokens_per_session = []
+
+    def _create_store(self):
+        from langgraph.store.memory import InMemoryStore
+        return InMemoryStore(index={
+            "dims": EMBEDDING_DIMS,
+            "embed": self.embedder.embed_batch,
+            "fields": ["text"],
+        })
 
     def add_conversation(self, turns: list[dict], session_id: int) -> list[MemoryEntry]:
         """Process conversation and extract memories using LangMem.
@@ -65,52 +89,57 @@ class LangMemMemory(BaseMemorySystem):
         # Extract memories using LangMem manager
         # Pass existing memories from previous invocations
         invoke_params = {"messages": messages}
-        if self._langmem_memories:
-            invoke_params["existing"] = self._langmem_memories
+        existing = self._select_existing(turns)
+        if existing:
+            invoke_params["existing"] = existing
+
+        self.prompt_tokens_per_session.append(
+            sum(estimate_tokens(m["content"]) for m in messages)
+            + sum(estimate_tokens(self._memory_text(m)) for m in existing)
+        )
 
         result = self.manager.invoke(invoke_params)
 
         self.stats.llm_calls += 1
 
-        # Store the result for next invocation
-        self._langmem_memories = result
+        # Merge the result for next invocation; in top-k mode it only covers
+        # the memories we passed in plus new ones
+        for memory in result if isinstance(result, list) else []:
+            memory_id = getattr(memory, 'id', None)
+            if memory_id is not None:
+                self._langmem_memories[memory_id] = memory
 
         # Process extracted memories
+        from langgraph.store.base import PutOp
+
         entries = []
+        puts = []
         # Result is a list of ExtractedMemory objects
         memories_list = result if isinstance(result, list) else []
 
         for memory in memories_list:
-            # Extract content from memory object
-            if hasattr(memory, 'content'):
-                if hasattr(memory.content, 'content'):
-                    content = memory.content.content
-                else:
-                    content = str(memory.content)
-            else:
-                content = str(memory)
+            content = self._memory_text(memory)
 
             # Generate or use existing ID
             memory_id = getattr(memory, 'id', str(uuid.uuid4()))
 
+            # The manager returns existing memories too; skip the unchanged ones
+            previous = self._entry_cache.get(memory_id)
+            if previous is not None and previous.content == content:
+                continue
+
             # Create MemoryEntry
             entry = MemoryEntry(
                 id=memory_id,
                 content=content,
                 metadata={"session_id": session_id, "source": "langmem"},
-                created_at=session_id,
+                created_at=previous.created_at if previous else session_id,
                 updated_at=session_id,
             )
-
-            # Store in LangMem store
-            self.store.put(
-                self.namespace,
-                memory_id,
-                {"text": content, "session_id": session_id}
-            )
+            puts.append(PutOp(self.namespace, memory_id, {"text": content, "session_id": session_id}))
 
             # Track in cache
-            if memory_id in self._entry_cache:
+            if previous is not None:
                 self.stats.entries_updated += 1
             else:
                 self.stats.entries_added += 1
@@ -118,11 +147,34 @@ class LangMemMemory(BaseMemorySystem):
             self._entry_cache[memory_id] = entry
             entries.append(entry)
 
+        # Store in LangMem store — one embedding call for all changed memories
+        if puts:
+            self.store.batch(puts)
+
         return entries
 
+    @staticmethod
+    def _memory_text(memory) -> str:
+        """Extract content from an ExtractedMemory object."""
+        if hasattr(memory, 'content'):
+            if hasattr(memory.content, 'content'):
+                return memory.content.content
+            return str(memory.content)
+        return str(memory)
+
+    def _select_existing(self, turns: list[dict]) -> list:
+        """Existing memories to show the manager for this session."""
+        if self.existing_top_k is None or len(self._langmem_memories) <= self.existing_top_k:
+            return list(self._langmem_memories.values())
+
+        query = "\n".join(t["content"] for t in turns if t["role"] == "user")
+        items = self.store.search(self.namespace, query=query, limit=self.existing_top_k)
+        return [self._langmem_memories[item.key] for item in items
+                if item.key in self._langmem_memories]
+
     def search(self, query: str, top_k: int = 5) -> list[MemoryEntry]:
         """Search memories using LangMem's semantic search."""
-        # Use store.search() for semantic search
+        # Use store.search() for semantic search (embeds the query, ranks by cosine)
         results = self.store.search(
             self.namespace,
             query=query,
@@ -139,7 +191,7 @@ class LangMemMemory(BaseMemorySystem):
             entry = MemoryEntry(
                 id=memory_id,
                 content=content,
-                metadata={"session_id": session_id, "source": "langmem"},
+                metadata={"session_id": session_id, "source": "langmem", "score": item.score},
             )
             entries.append(entry)
         
@@ -151,15 +203,12 @@ class LangMemMemory(BaseMemorySystem):
 
     def reset(self):
         """Clear all memories for this user."""
-        # Clear from store
-        for memory_id in list(self._entry_cache.keys()):
-            try:
-                self.store.delete(self.namespace, memory_id)
-            except:
-                pass
+        # The store only holds this user's namespace; replace it wholesale
+        self.store = self._create_store()
 
         # Clear cache and stats
         self._entry_cache = {}
-        self._langmem_memories = []
+        self._langmem_memories = {}
+        self.prompt_tokens_per_session = []
         self.stats = MemoryStats()
 
@@ -0,0 +1,67 @@
+"""Chat-model helpers shared by the memory systems that call an LLM themselves.
+
+AgentDrivenMemory and the Zep and Redis stand-ins all send prompts through
+the pooled OpenAI client, count the call and its tokens (cached ones
+included) in their MemoryStats, publish it on the telemetry bus, and parse
+JSON out of the reply. LLMMemoryMixin holds that code once.
+"""
+
+import json
+
+from . import telemetry
+from .tokens import cached_prompt_tokens
+
+
+class LLMMemoryMixin:
+    """_call_llm, _format_conversation and _parse_json_response for a memory system.
+
+    Expects self.client (an OpenAI client), self.model and self.stats, as set
+    up by BaseMemorySystem subclasses.
+    """
+
+    # Completion budget when _call_llm isn't given one
+    llm_max_tokens = 2000
+
+    def _call_llm(self, prompt: str, system: str = None, max_tokens: int = None) -> str:
+        """Send prompt as the user message, after an optional static system message."""
+        messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages.insert(0, {"role": "system", "content": system})
+        response = self.client.chat.completions.create(
+            model=self.model,
+            max_tokens=max_tokens or self.llm_max_tokens,
+            messages=messages,
+        )
+        self.stats.llm_calls += 1
+        if response.usage:
+            cached = cached_prompt_tokens(response.usage)
+            self.stats.total_input_tokens += response.usage.prompt_tokens
+            self.stats.total_output_tokens += response.usage.completion_tokens
+            self.stats.cached_input_tokens += cached
+            telemetry.publish("llm_call", source=self.__class__.__name__,
+                              input_tokens=response.usage.prompt_tokens,
+                              output_tokens=response.usage.completion_tokens,
+                              cached_tokens=cached)
+        return response.choices[0].message.content
+
+    def _format_conversation(self, turns: list[dict]) -> str:
+        lines = []
+        for turn in turns:
+            role = "User" if turn["role"] == "user" else "Assistant"
+            lines.append(f"{role}: {turn['content']}")
+        return "\n".join(lines)
+
+    def _parse_json_response(self, raw_response: str):
+        """Extract and parse JSON from an LLM response; None if it isn't JSON.
+
+        The reply may be any JSON value, so callers check for a dict.
+        """
+        try:
+            json_str = raw_response
+            if "```json" in json_str:
+                json_str = json_str.split("```json")[1].split("```")[0]
+            elif "```" in json_str:
+                json_str = json_str.split("```")[1].split("```")[0]
+            return json.loads(json_str.strip())
+        except (json.JSONDecodeError, IndexError):
+            return None
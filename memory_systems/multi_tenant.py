@@ -0,0 +1,406 @@
+"""Many users' agent-driven memory stores served from one process.
+
+AgentDrivenMemory holds a single user's memories. MultiTenantMemory keeps one
+per user behind a single interface where every call names its user:
+
+- Isolation: each user has their own AgentDrivenMemory, so one user's calls
+  never see another user's memories.
+- Shared vector storage: the embeddings of every resident user live in one
+  float32 SharedVectorMatrix, partitioned by user (VectorPartition), instead
+  of a Python list of floats per memory. A user's search ranks that user's
+  rows with one matrix product.
+- Bounded footprint: at most max_resident users are held in memory. Beyond
+  that, the least recently used idle user is paged out to
+  <snapshot_dir>/<user_id>.json in the AgentDrivenMemory.snapshot() format
+  and paged back in on their next request.
+- Concurrency: each user has a readers-writer lock, so searches for a user
+  run concurrently while writes to that user are exclusive. Different users
+  only share the residency bookkeeping: snapshots are read and written
+  outside it, and a page-in of a user whose page-out is still writing waits
+  for that write to finish.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import numpy as np
+
+from .agent_driven import AgentDrivenMemory
+from .base import MemoryEntry, MemoryStats
+
+# Users held in memory before the least recently used idle one is paged out
+MAX_RESIDENT_USERS = 1000
+
+# Rows the shared matrix starts with; it doubles when full
+INITIAL_MATRIX_ROWS = 1024
+
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer; waiting writers go first."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+# ---------------------------------------------------------------------------
+# Shared vector storage
+# ---------------------------------------------------------------------------
+
+class SharedVectorMatrix:
+    """One float32 matrix of unit-normalized vectors, rows handed out to partitions.
+
+    Rows freed by one user are reused by the next allocation. Growing copies
+    into a new array, so a reader still holding the old one sees consistent
+    rows (its own user's rows can't change while it holds that user's lock).
+    """
+
+    def __init__(self, initial_rows: int = INITIAL_MATRIX_ROWS):
+        self.initial_rows = initial_rows
+        self.rows = None  # allocated on the first write, once the dimension is known
+        self._free: list[int] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def write(self, row: int | None, vector) -> int:
+        """Store vector in row (a fresh one if None); returns the row."""
+        v = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        if norm > 0:
+            v = v / norm
+        with self._lock:
+            if self.rows is None:
+                self.rows = np.zeros((self.initial_rows, len(v)), dtype=np.float32)
+            if len(v) != self.rows.shape[1]:
+                raise ValueError(f"Vector has {len(v)} dimensions, matrix has {self.rows.shape[1]}")
+            if row is None:
+                if self._free:
+                    row = self._free.pop()
+                else:
+                    if self._next == len(self.rows):
+                        grown = np.zeros((2 * len(self.rows), self.rows.shape[1]), dtype=np.float32)
+                        grown[:len(self.rows)] = self.rows
+                        self.rows = grown
+                    row = self._next
+                    self._next += 1
+            self.rows[row] = v
+        return row
+
+    def release(self, rows: list[int]):
+        with self._lock:
+            self._free.extend(rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            capacity = 0 if self.rows is None else len(self.rows)
+            return {
+                "rows_used": self._next - len(self._free),
+                "rows_capacity": capacity,
+                "bytes": 0 if self.rows is None else self.rows.nbytes,
+            }
+
+
+class VectorPartition(MutableMapping):
+    """One user's {memory id: vector} view onto a SharedVectorMatrix.
+
+    Drop-in for AgentDrivenMemory's vector dict; Embedder.rank uses rank()
+    below instead of scoring vectors one at a time.
+    """
+
+    def __init__(self, matrix: SharedVectorMatrix):
+        self.matrix = matrix
+        self._rows: dict[str, int] = {}
+
+    def __getitem__(self, mem_id: str):
+        return self.matrix.rows[self._rows[mem_id]].copy()
+
+    def __setitem__(self, mem_id: str, vector):
+        self._rows[mem_id] = self.matrix.write(self._rows.get(mem_id), vector)
+
+    def __delitem__(self, mem_id: str):
+        self.matrix.release([self._rows.pop(mem_id)])
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self):
+        self.matrix.release(list(self._rows.values()))
+        self._rows.clear()
+
+    def rank(self, query_vec, top_k: int = 5) -> list[tuple[str, float]]:
+        """(id, cosine similarity) of the top_k rows, best first."""
+        if not self._rows:
+            return []
+        ids = list(self._rows)
+        rows = np.fromiter(self._rows.values(), dtype=np.intp, count=len(ids))
+        q = np.asarray(query_vec, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        scores = self.matrix.rows[rows] @ (q / norm if norm > 0 else q)
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[i], float(scores[i])) for i in top]
+
+
+# ---------------------------------------------------------------------------
+# Tenant manager
+# ---------------------------------------------------------------------------
+
+class _Tenant:
+    def __init__(self, system: AgentDrivenMemory):
+        self.system = system
+        self.lock = ReadWriteLock()
+        self.pins = 0  # requests holding or waiting for this tenant
+        self.dirty = False  # written since it was last paged in or flushed
+        self.ready = threading.Event()  # set once its snapshot is loaded
+        self.saved = threading.Event()  # set once its page-out has finished
+        self.error = None  # why loading (or the page-out's save) failed
+
+
+class MultiTenantMemory:
+    """Per-user AgentDrivenMemory stores with shared vectors and LRU paging to disk."""
+
+    def __init__(self, snapshot_dir: str, max_resident: int = MAX_RESIDENT_USERS,
+                 factory=None, openai_api_key: str = None, model: str = "gpt-4o-mini",
+                 retrieval: str = "vector"):
+        """
+        Args:
+            snapshot_dir: Where paged-out users' snapshots are kept.
+            factory: Callable(user_id, vectors) -> AgentDrivenMemory that keeps
+                its embeddings in `vectors`; by default an AgentDrivenMemory
+                built from openai_api_key, model and retrieval.
+        """
+        if max_resident < 1:
+            raise ValueError(f"max_resident must be >= 1, got {max_resident}")
+        os.makedirs(snapshot_dir, exist_ok=True)
+        self.snapshot_dir = snapshot_dir
+        self.max_resident = max_resident
+        self.factory = factory or (lambda user_id, vectors: AgentDrivenMemory(
+            user_id, openai_api_key=openai_api_key, model=model, retrieval=retrieval,
+            vectors=vectors,
+        ))
+        self.matrix = SharedVectorMatrix()
+        self._tenants: OrderedDict[str, _Tenant] = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()
+        # Users popped for page-out whose snapshot may still be being written
+        self._evicting: dict[str, _Tenant] = {}
+        self.page_ins = 0
+        self.page_outs = 0
+        self.users_created = 0
+
+    # -----------------------------------------------------------------------
+    # Residency
+    # -----------------------------------------------------------------------
+
+    def _snapshot_path(self, user_id: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{quote(user_id, safe='')}.json")
+
+    def _load(self, user_id: str, tenant: _Tenant, pending: _Tenant | None):
+        """Restore a newly admitted tenant from its snapshot, if it has one.
+
+        pending is the same user's earlier tenant if it was still being paged
+        out at admission; its save must finish before the snapshot is read.
+        If that save failed, the state is taken from it in memory instead.
+        """
+        path = self._snapshot_path(user_id)
+        try:
+            if pending is not None:
+                pending.saved.wait()
+            if pending is not None and pending.error is not None:
+                tenant.system.restore(pending.system.snapshot())
+                tenant.dirty = True
+                with self._lock:
+                    if self._evicting.get(user_id) is pending:
+                        del self._evicting[user_id]
+                pending.system.reset()
+            elif os.path.exists(path):
+                with open(path) as f:
+                    tenant.system.restore(json.load(f))
+                with self._lock:
+                    self.page_ins += 1
+            else:
+                with self._lock:
+                    self.users_created += 1
+        except Exception as e:
+            tenant.error = e
+            with self._lock:
+                if self._tenants.get(user_id) is tenant:
+                    del self._tenants[user_id]
+            tenant.system.reset()
+        finally:
+            tenant.ready.set()
+
+    def _save(self, user_id: str, tenant: _Tenant):
+        path = self._snapshot_path(user_id)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(tenant.system.snapshot(), f)
+        os.replace(tmp, path)
+        tenant.dirty = False
+
+    def _pick_victims(self) -> list[tuple[str, _Tenant]]:
+        """Pop least recently used idle users until within max_resident.
+
+        Called under self._lock; the victims are written out by _page_out
+        after it is released.
+        """
+        victims = []
+        while len(self._tenants) > self.max_resident:
+            victim = next((uid for uid, t in self._tenants.items() if not t.pins), None)
+            if victim is None:
+                break  # everyone is busy; trim on a later release
+            tenant = self._tenants.pop(victim)
+            self._evicting[victim] = tenant
+            victims.append((victim, tenant))
+        return victims
+
+    def _page_out(self, victims: list[tuple[str, _Tenant]]):
+        for user_id, tenant in victims:
+            try:
+                if tenant.dirty:
+                    self._save(user_id, tenant)
+            except Exception as e:
+                # Kept in memory (and in _evicting) for the user's next page-in
+                tenant.error = e
+            else:
+                tenant.system.reset()  # returns its matrix rows
+                with self._lock:
+                    if self._evicting.get(user_id) is tenant:
+                        del self._evicting[user_id]
+                    self.page_outs += 1
+            finally:
+                tenant.saved.set()
+
+    @contextmanager
+    def _use(self, user_id: str, write: bool):
+        with self._lock:
+            tenant = self._tenants.get(user_id)
+            admitted = tenant is None
+            if admitted:
+                tenant = self._tenants[user_id] = _Tenant(
+                    self.factory(user_id, VectorPartition(self.matrix)))
+            else:
+                self._tenants.move_to_end(user_id)
+            pending = self._evicting.get(user_id) if admitted else None
+            tenant.pins += 1
+            victims = self._pick_victims()
+        try:
+            if admitted:
+                self._load(user_id, tenant, pending)
+            self._page_out(victims)
+            tenant.ready.wait()
+            if tenant.error is not None:
+                raise RuntimeError(f"Could not page in user {user_id!r}") from tenant.error
+            with tenant.lock.write() if write else tenant.lock.read():
+                if write:
+                    tenant.dirty = True
+                yield tenant.system
+        finally:
+            with self._lock:
+                tenant.pins -= 1
+                victims = self._pick_victims()
+            self._page_out(victims)
+
+    # -----------------------------------------------------------------------
+    # Per-user operations
+    # -----------------------------------------------------------------------
+
+    def add_conversation(self, user_id: str, turns: list[dict], session_id: int) -> list[MemoryEntry]:
+        with self._use(user_id, write=True) as system:
+            return system.add_conversation(turns, session_id)
+
+    def add_sessions(self, user_id: str, sessions: list[tuple[list[dict], int]]) -> list[MemoryEntry]:
+        with self._use(user_id, write=True) as system:
+            return system.add_sessions(sessions)
+
+    def import_memories(self, user_id: str, memories: list[MemoryEntry]) -> int:
+        with self._use(user_id, write=True) as system:
+            return system.import_memories(memories)
+
+    def search(self, user_id: str, query: str, top_k: int = 5) -> list[MemoryEntry]:
+        with self._use(user_id, write=False) as system:
+            return system.search(query, top_k=top_k)
+
+    def get_all(self, user_id: str) -> list[MemoryEntry]:
+        with self._use(user_id, write=False) as system:
+            return system.get_all()
+
+    def get_stats(self, user_id: str) -> MemoryStats:
+        with self._use(user_id, write=False) as system:
+            return system.get_stats()
+
+    # -----------------------------------------------------------------------
+    # Whole-service operations
+    # -----------------------------------------------------------------------
+
+    def flush(self):
+        """Write every resident user with unsaved changes to disk (they stay resident)."""
+        with self._lock:
+            tenants = list(self._tenants.items())
+            for _, tenant in tenants:
+                tenant.pins += 1  # not evicted (and saved) while we save it
+        for user_id, tenant in tenants:
+            try:
+                tenant.ready.wait()
+                with tenant.lock.read():
+                    if tenant.dirty and tenant.error is None:
+                        self._save(user_id, tenant)
+            finally:
+                with self._lock:
+                    tenant.pins -= 1
+        with self._lock:
+            victims = self._pick_victims()
+        self._page_out(victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            resident = len(self._tenants)
+            memories = sum(len(t.system._memories) for t in self._tenants.values())
+        return {
+            "resident_users": resident,
+            "max_resident": self.max_resident,
+            "resident_memories": memories,
+            "users_created": self.users_created,
+            "page_ins": self.page_ins,
+            "page_outs": self.page_outs,
+            "vector_matrix": self.matrix.stats(),
+        }
@@ -0,0 +1,159 @@
+"""Redis Agent Memory Server-style memory, run in-process.
+
+The Agent Memory Server keeps two tiers: working memory (the messages of the
+current session) and long-term memory. When a session is promoted, an LLM
+extracts discrete memories from it, each tagged semantic or episodic, and the
+server deduplicates them before indexing — first by content hash, then by
+vector distance, where a near-duplicate replaces the older memory. Search is
+a vector KNN query over long-term memory.
+
+This stand-in reproduces those semantics locally, with numpy standing in for
+the RedisVL index, so the system can be benchmarked and profiled without a
+Redis server. It is not the service itself; scores measure this design.
+"""
+
+import hashlib
+import uuid
+from . import resources
+from .base import BaseMemorySystem, MemoryEntry, MemoryStats
+from .llm import LLMMemoryMixin
+
+DISCRETE_EXTRACTION_PROMPT = """You are a long-term memory extractor for an AI assistant. Read the conversation and extract discrete memories worth keeping across sessions.
+
+## Conversation (Session {session_id})
+{conversation}
+
+## Instructions
+
+Extract memories of two types:
+- "semantic": lasting facts and preferences about the user ("User prefers Python for data work")
+- "episodic": specific events with their time context ("User started a new job at Acme in session {session_id}")
+
+Each memory must be a single self-contained sentence written in the third person. Skip small talk and anything only relevant to this conversation. Add 1-3 short topic tags per memory.
+
+Output ONLY valid JSON:
+{{
+    "memories": [
+        {{"text": "...", "memory_type": "semantic|episodic", "topics": ["..."]}}
+    ]
+}}"""
+
+
+class RedisAgentMemory(LLMMemoryMixin, BaseMemorySystem):
+    """Two-tier memory with Agent Memory Server extraction and dedup."""
+
+    llm_max_tokens = 1500
+
+    def __init__(self, user_id: str, openai_api_key: str = None, model: str = "gpt-4o-mini",
+                 dedup_distance: float = 0.12):
+        """
+        Args:
+            dedup_distance: Cosine distance below which a new memory replaces
+                an existing one as a near-duplicate.
+        """
+        super().__init__(user_id)
+        self.client = resources.openai_client(openai_api_key)
+        self.model = model
+        self.dedup_distance = dedup_distance
+        self.embedder = resources.embedder(openai_api_key)
+
+        # Working memory: messages of the most recent session
+        self.working_memory: list[dict] = []
+
+        # Long-term memory: {id: MemoryEntry}, {id: vector}, {content hash: id}
+        self._memories: dict[str, MemoryEntry] = {}
+        self._vectors: dict[str, list[float]] = {}
+        self._hashes: dict[str, str] = {}
+
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+    def _nearest(self, vector: list[float]) -> tuple[str | None, float]:
+        """Closest long-term memory and its cosine distance."""
+        best_id, best_distance = None, 2.0
+        for mid, other in self._vectors.items():
+            distance = 1.0 - self.embedder.cosine_similarity(vector, other)
+            if distance < best_distance:
+                best_id, best_distance = mid, distance
+        return best_id, best_distance
+
+    def add_conversation(self, turns: list[dict], session_id: int) -> list[MemoryEntry]:
+        """Put the session in working memory, then promote it to long-term.
+
+        One extraction call per session; extracted memories are embedded in
+        one batch and deduplicated by hash, then by vector distance.
+        """
+        self.working_memory = list(turns)
+
+        prompt = DISCRETE_EXTRACTION_PROMPT.format(
+            session_id=session_id,
+            conversation=self._format_conversation(turns),
+        )
+        parsed = self._parse_json_response(self._call_llm(prompt))
+        if not isinstance(parsed, dict):
+            print(f"Warning: Failed to parse memory extraction for {self.user_id} session {session_id}")
+            return []
+
+        items = [m for m in parsed.get("memories", []) if isinstance(m, dict) and m.get("text")]
+        items = [m for m in items if self._content_hash(m["text"]) not in self._hashes]
+        if not items:
+            return []
+        vectors = self.embedder.embed_batch([m["text"] for m in items])
+
+        entries = []
+        for item, vector in zip(items, vectors):
+            content_hash = self._content_hash(item["text"])
+            if content_hash in self._hashes:
+                continue  # duplicate within this batch
+            metadata = {
+                "session_id": session_id,
+                "source": "redis",
+                "memory_type": item.get("memory_type", "semantic"),
+                "topics": item.get("topics", []),
+            }
+
+            near_id, distance = self._nearest(vector)
+            if near_id is not None and distance < self.dedup_distance:
+                # Near-duplicate: the newer statement replaces the older one
+                entry = self._memories[near_id]
+                self._hashes.pop(self._content_hash(entry.content), None)
+                entry.content = item["text"]
+                entry.metadata.update(metadata)
+                entry.updated_at = session_id
+                self._vectors[near_id] = vector
+                self._hashes[content_hash] = near_id
+                self.stats.entries_updated += 1
+            else:
+                mem_id = str(uuid.uuid4())[:8]
+                entry = MemoryEntry(
+                    id=mem_id,
+                    content=item["text"],
+                    metadata=metadata,
+                    created_at=session_id,
+                    updated_at=session_id,
+                )
+                self._memories[mem_id] = entry
+                self._vectors[mem_id] = vector
+                self._hashes[content_hash] = mem_id
+                self.stats.entries_added += 1
+            entries.append(entry)
+
+        return entries
+
+    def search(self, query: str, top_k: int = 5) -> list[MemoryEntry]:
+        """Vector KNN over long-term memory."""
+        if not self._memories:
+            return []
+        results = self.embedder.search(query, self._vectors, top_k=top_k)
+        return [self._memories[mid] for mid, _ in results if mid in self._memories]
+
+    def get_all(self) -> list[MemoryEntry]:
+        return list(self._memories.values())
+
+    def reset(self):
+        self.working_memory = []
+        self._memories = {}
+        self._vectors = {}
+        self._hashes = {}
+        self.stats = MemoryStats()
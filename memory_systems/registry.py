@@ -0,0 +1,162 @@
+"""Memory systems by benchmark name: display names and per-user factories.
+
+run_experiment.py, run_perf_benchmark.py and evaluate_retrieval.py all pick
+systems by these names. Factories read their settings (API keys, model,
+backfill size, ...) from the environment, so callers load .env first.
+Systems are imported inside their factory, so importing the registry stays
+cheap and an optional backend is only needed when its system is built.
+"""
+
+import os
+
+ALL_SYSTEM_NAMES = [
+    "current_session",
+    "full_context",
+    "mem0",
+    "zep_memory",
+    "langmem",
+    "redis",
+    "agent",
+    "agent_backfill",
+    "ablation_no_feedback",
+    "ablation_no_consolidation",
+    "ablation_add_only",
+]
+
+SYSTEM_DISPLAY_NAMES = {
+    "current_session": "Current Session Only (Baseline)",
+    "full_context": "Full Context (Baseline)",
+    "mem0": "External Memory (Mem0)",
+    "zep_memory": "External Memory (Zep)",
+    "langmem": "External Memory (LangMem)",
+    "redis": "External Memory (Redis)",
+    "agent": "Agent-Driven",
+    "agent_backfill": "Agent-Driven (Backfill)",
+    "ablation_no_feedback": "Ablation: No Feedback",
+    "ablation_no_consolidation": "Ablation: No Consolidation",
+    "ablation_add_only": "Ablation: Add Only",
+}
+
+
+# ---------------------------------------------------------------------------
+# Factory functions
+# ---------------------------------------------------------------------------
+
+def create_current_session_system(user_id: str):
+    """Baseline: no memory from previous sessions (only current session context)."""
+    from memory_systems.no_memory import NoMemoryBaseline
+    return NoMemoryBaseline(user_id=user_id)
+
+
+def create_full_context_system(user_id: str):
+    """Baseline: every past transcript, packed newest-first into a token budget."""
+    from memory_systems.full_context import FullContextBaseline
+    return FullContextBaseline.from_env(user_id)
+
+
+def create_zep_memory_system(user_id: str):
+    """Factory for Zep Memory."""
+    from memory_systems.zep_memory import ZepMemory
+    return ZepMemory(user_id=user_id, openai_api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def create_langmem_system(user_id: str):
+    """Factory for LangMem Memory."""
+    from memory_systems.langmem_memory import LangMemMemory
+    top_k = os.getenv("LANGMEM_EXISTING_TOP_K")
+    return LangMemMemory(
+        user_id=user_id,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        existing_top_k=int(top_k) if top_k else None,
+    )
+
+
+def create_mem0_system(user_id: str):
+    from memory_systems.external_mem0 import Mem0Memory
+    api_key = os.getenv("MEM0_API_KEY")
+    return Mem0Memory(
+        user_id=user_id,
+        use_local=(api_key is None),
+        api_key=api_key,
+        vector_store_path=os.getenv("MEM0_VECTOR_STORE_PATH") or None,
+        bulk_ingest=os.getenv("MEM0_BULK_INGEST", "").lower() in ("1", "true", "yes"),
+    )
+
+
+def create_redis_system(user_id: str):
+    """Factory for Redis Agent Memory Server."""
+    from memory_systems.redis_memory import RedisAgentMemory
+    return RedisAgentMemory(user_id=user_id, openai_api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def create_agent_system(user_id: str, model: str = None, retrieval: str = "vector"):
+    from memory_systems.agent_driven import AgentDrivenMemory
+    return AgentDrivenMemory(
+        user_id=user_id,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        retrieval=retrieval,
+    )
+
+
+def create_agent_backfill_system(user_id: str, model: str = None, retrieval: str = "vector"):
+    """Agent-driven memory in backfill mode: several sessions per LLM call, no responses."""
+    from memory_systems.agent_driven import DEFAULT_BACKFILL_SESSIONS, AgentDrivenMemory
+    return AgentDrivenMemory(
+        user_id=user_id,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        retrieval=retrieval,
+        backfill_sessions=int(os.getenv("AGENT_BACKFILL_SESSIONS") or DEFAULT_BACKFILL_SESSIONS),
+    )
+
+
+def create_ablation_no_feedback(user_id: str, model: str = None, retrieval: str = "vector"):
+    from memory_systems.ablations import AgentNoFeedback
+    return AgentNoFeedback(
+        user_id=user_id,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        retrieval=retrieval,
+    )
+
+
+def create_ablation_no_consolidation(user_id: str, model: str = None, retrieval: str = "vector"):
+    from memory_systems.ablations import AgentNoConsolidation
+    return AgentNoConsolidation(
+        user_id=user_id,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        retrieval=retrieval,
+    )
+
+
+def create_ablation_add_only(user_id: str, model: str = None, retrieval: str = "vector"):
+    from memory_systems.ablations import AgentAddOnly
+    return AgentAddOnly(
+        user_id=user_id,
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
+        retrieval=retrieval,
+    )
+
+
+def get_factory(system_name: str, model: str, retrieval: str = "vector"):
+    """Return a factory callable(user_id) -> BaseMemorySystem.
+
+    retrieval ("vector" or "hybrid") applies to the agent-driven systems.
+    """
+    factories = {
+        "current_session": lambda uid: create_current_session_system(uid),
+        "full_context": lambda uid: create_full_context_system(uid),
+        "mem0": lambda uid: create_mem0_system(uid),
+        "zep_memory": lambda uid: create_zep_memory_system(uid),
+        "langmem": lambda uid: create_langmem_system(uid),
+        "redis": lambda uid: create_redis_system(uid),
+        "agent": lambda uid: create_agent_system(uid, model, retrieval),
+        "agent_backfill": lambda uid: create_agent_backfill_system(uid, model, retrieval),
+        "ablation_no_feedback": lambda uid: create_ablation_no_feedback(uid, model, retrieval),
+        "ablation_no_consolidation": lambda uid: create_ablation_no_consolidation(uid, model, retrieval),
+        "ablation_add_only": lambda uid: create_ablation_add_only(uid, model, retrieval),
+    }
+    return factories[system_name]
@@ -0,0 +1,164 @@
+"""Per-process pool of heavy clients shared by memory systems.
+
+The runner builds a fresh memory system for every profile, and each one used
+to construct its own OpenAI client (with its own HTTP connection pool), its own
+Embedder, and for LangMem/Mem0 a whole manager or Memory stack. Nothing in
+those objects is user-specific, so factories draw them from here instead; the
+user-specific state (memories, stores, collections) stays on the memory system.
+
+Objects are keyed by their construction arguments, built on first use, and
+live until clear(). Set MEMORYBENCH_POOL=0 to build everything per call, which
+is how the startup workload measures the before/after difference.
+
+When profiles run concurrently, set_coalescing(True) makes embedders built
+afterwards share one EmbeddingCoalescer per (API key, model), so small embed
+requests from different users go out as one batched call. The coalescer waits
+up to EMBEDDING_COALESCE_MS (default 5) for requests to gather.
+"""
+
+import os
+import threading
+
+from . import telemetry
+
+# Connection limits for the shared HTTP client. Worker processes each get
+# their own pool, so keep these modest.
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 10
+
+_pool = {}
+_lock = threading.RLock()  # builders may fetch other pooled objects
+_pooling = os.getenv("MEMORYBENCH_POOL", "1") != "0"
+_coalescing = False
+
+COALESCE_MAX_WAIT_MS = float(os.getenv("EMBEDDING_COALESCE_MS") or 5)
+
+
+def set_pooling(enabled: bool):
+    """Turn pooling on or off for this process (does not clear the pool)."""
+    global _pooling
+    _pooling = enabled
+
+
+def set_coalescing(enabled: bool):
+    """Batch embedding requests across threads for embedders built from now on."""
+    global _coalescing
+    _coalescing = enabled and COALESCE_MAX_WAIT_MS > 0
+
+
+def shared(kind: str, key, build, always: bool = False):
+    """Return the pooled object for (kind, key), building it on first use.
+
+    always=True pools even when pooling is off, for resources that cannot
+    exist twice in one process.
+    """
+    if not (_pooling or always):
+        return build()
+    with _lock:
+        if (kind, key) not in _pool:
+            _pool[(kind, key)] = build()
+        return _pool[(kind, key)]
+
+
+def clear():
+    """Drop every pooled object, closing HTTP clients and coalescers."""
+    with _lock:
+        # Coalescers first: they drain their queue through an HTTP client
+        for close_kind in ("coalescer", "openai"):
+            for (kind, _), obj in _pool.items():
+                if kind == close_kind:
+                    obj.close()
+        _pool.clear()
+
+
+def _limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+    )
+
+
+def openai_client(api_key: str = None):
+    """OpenAI client with a keep-alive connection pool, one per API key."""
+    def build():
+        import openai
+        http_client = openai.DefaultHttpxClient(limits=_limits())
+        # Requests publish http_start/http_end on the telemetry bus. Wrapping
+        # the client's own transport keeps it working whichever httpx
+        # distribution the installed SDK is built on.
+        http_client._transport = telemetry.InstrumentedTransport(http_client._transport)
+        return openai.OpenAI(api_key=api_key, http_client=http_client)
+    return shared("openai", api_key, build)
+
+
+def embedder(api_key: str = None, model: str = "text-embedding-3-small"):
+    """Embedder backed by the shared OpenAI client (and coalescer, if on)."""
+    from .embedder import Embedder
+    coalescing = _coalescing
+    return shared(
+        "embedder", (api_key, model, coalescing),
+        lambda: Embedder(
+            api_key=api_key, model=model, client=openai_client(api_key),
+            coalescer=coalescer(api_key, model) if coalescing else None,
+        ),
+    )
+
+
+def coalescer(api_key: str = None, model: str = "text-embedding-3-small"):
+    """Cross-thread embedding coalescer. Always pooled: the point is that
+    every thread in the process shares the same one."""
+    def build():
+        from .coalescer import EmbeddingCoalescer
+        return EmbeddingCoalescer(
+            openai_client(api_key), model, max_wait=COALESCE_MAX_WAIT_MS / 1000,
+        )
+    return shared("coalescer", (api_key, model), build, always=True)
+
+
+def coalescer_stats() -> dict:
+    """Request/call counters summed over this process's coalescers."""
+    with _lock:
+        coalescers = [obj for (kind, _), obj in _pool.items() if kind == "coalescer"]
+    totals = {"requests": 0, "api_calls": 0, "texts": 0}
+    for c in coalescers:
+        for key, value in c.stats().items():
+            if key in totals:
+                totals[key] += value
+    return totals
+
+
+def langmem_manager(model: str, instructions: str):
+    """LangMem memory manager. Stateless between calls — existing memories
+    are passed in on every invoke — so one serves every user."""
+    def build():
+        from langmem import create_memory_manager
+        return create_memory_manager(
+            model,
+            instructions=instructions,
+            enable_inserts=True,
+            enable_updates=True,
+        )
+    return shared("langmem_manager", (model, instructions), build)
+
+
+def qdrant_client(path: str | None = None):
+    """Qdrant client for Mem0's local vector store, one per storage location.
+
+    path=None keeps vectors in memory. Embedded Qdrant locks its directory,
+    so a second client on the same path would fail; always pooled.
+    """
+    def build():
+        from qdrant_client import QdrantClient
+        return QdrantClient(path=path) if path else QdrantClient(location=":memory:")
+    return shared("qdrant", path, build, always=True)
+
+
+def mem0_memory(config_key, build):
+    """Mem0 Memory instance for a fully specified config.
+
+    The config includes the per-user collection, so this pools one instance
+    per user; it saves re-initialization when the same user is run again in
+    a later trial. Callers must clear the user's memories before use.
+    """
+    return shared("mem0", config_key, build)
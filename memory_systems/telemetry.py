@@ -0,0 +1,96 @@
+"""In-process event bus for live run metrics.
+
+The runner and the memory systems publish small events as they work (a test
+answered, an LLM call and its token usage, an HTTP request starting or
+finishing); anything that wants live numbers — the progress dashboard in
+evaluation/dashboard.py, say — subscribes. With no subscribers publish() is
+a no-op check, so instrumentation costs nothing in normal runs.
+
+HTTP requests are observed by wrapping the pooled OpenAI client's transport
+(resources.openai_client) in an InstrumentedTransport. Clients that Mem0
+and LangMem build internally are not covered.
+
+Events (all carry a monotonic "time"):
+    run_start        system, profiles, tests
+    profile_start    user_id
+    profile_end      user_id, tests
+    test_answered    test_id
+    test_judged      test_id, rating, cached
+    llm_call         source, input_tokens, output_tokens, cached_tokens
+    http_start       endpoint, retry
+    http_end         endpoint, status (None on a transport error), seconds, error
+    run_end          system
+"""
+
+import threading
+import time
+
+_subscribers = []
+_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """Call callback(event, fields) for every event published from now on.
+
+    Callbacks run synchronously on the publishing thread, possibly several
+    threads at once, so they must be quick and thread-safe.
+    """
+    with _lock:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback):
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def publish(event: str, **fields):
+    if not _subscribers:
+        return
+    fields["time"] = time.monotonic()
+    for callback in list(_subscribers):
+        callback(event, fields)
+
+
+def _endpoint(path: str) -> str:
+    # "/v1/chat/completions" -> "chat/completions"
+    return path.split("/v1/", 1)[-1].strip("/")
+
+
+class InstrumentedTransport:
+    """Wraps an httpx transport so every request publishes http_start/http_end.
+
+    Duck-typed rather than subclassing httpx.BaseTransport, so it wraps the
+    transport of whichever httpx distribution the OpenAI SDK uses.
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def handle_request(self, request):
+        endpoint = _endpoint(request.url.path)
+        # The OpenAI SDK numbers its attempts in this header
+        retry = request.headers.get("x-stainless-retry-count", "0") not in ("", "0")
+        publish("http_start", endpoint=endpoint, retry=retry)
+        t0 = time.perf_counter()
+        try:
+            response = self.inner.handle_request(request)
+        except Exception as e:
+            publish("http_end", endpoint=endpoint, status=None,
+                    seconds=time.perf_counter() - t0, error=type(e).__name__)
+            raise
+        publish("http_end", endpoint=endpoint, status=response.status_code,
+                seconds=time.perf_counter() - t0,
+                error=None if response.status_code < 400 else str(response.status_code))
+        return response
+
+    def close(self):
+        self.inner.close()
+
+    def __enter__(self):
+        self.inner.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.inner.__exit__(*exc)
@@ -0,0 +1,141 @@
+"""Zep-style temporal fact memory, run in-process.
+
+Zep ingests each session as an "episode", has an LLM extract facts from it,
+and keeps facts on a timeline: when new information contradicts a fact, the
+old fact is marked invalid (invalid_at) rather than deleted, and search only
+returns facts that are still valid. This stand-in reproduces those semantics
+locally — one extraction call per session, embedded facts, cosine search over
+valid facts — so the system can be benchmarked and profiled without a Zep
+server. It is not the Zep service itself; scores measure this design.
+"""
+
+import uuid
+from . import resources
+from .base import BaseMemorySystem, MemoryEntry, MemoryStats
+from .llm import LLMMemoryMixin
+
+FACT_EXTRACTION_PROMPT = """You maintain a knowledge graph of facts about a user, extracted from their conversations with an assistant.
+
+## Currently Valid Facts
+{current_facts}
+
+## New Episode (Session {session_id})
+{conversation}
+
+## Instructions
+
+Extract facts about the user stated or clearly implied in the new episode. Each fact is one short, self-contained sentence about the user (identity, preferences, work, goals, relationships, plans).
+
+If a new fact makes a currently valid fact no longer true (the user moved, changed jobs, switched tools, a plan finished), list the old fact's id under "invalidates". Do not invalidate facts that are merely related.
+
+Skip small talk and details that only matter within this conversation. Do not repeat facts that are already valid and unchanged.
+
+Output ONLY valid JSON:
+{{
+    "facts": [
+        {{"fact": "...", "invalidates": ["<id>", ...]}}
+    ]
+}}"""
+
+
+class ZepMemory(LLMMemoryMixin, BaseMemorySystem):
+    """Temporal fact memory with Zep's extract-and-invalidate semantics."""
+
+    llm_max_tokens = 1500
+
+    def __init__(self, user_id: str, openai_api_key: str = None, model: str = "gpt-4o-mini"):
+        super().__init__(user_id)
+        self.client = resources.openai_client(openai_api_key)
+        self.model = model
+        self.embedder = resources.embedder(openai_api_key)
+
+        # Every fact ever extracted; invalidated ones keep invalid_at set
+        self._facts: dict[str, MemoryEntry] = {}
+        self._vectors: dict[str, list[float]] = {}
+
+        # Raw session transcripts, as Zep keeps the episodes themselves
+        self._episodes: list[dict] = []
+
+    def _valid_facts(self) -> dict[str, MemoryEntry]:
+        return {fid: f for fid, f in self._facts.items() if f.metadata.get("invalid_at") is None}
+
+    def add_conversation(self, turns: list[dict], session_id: int) -> list[MemoryEntry]:
+        """Store the session as an episode and extract facts from it.
+
+        One LLM call per session; new facts are embedded in a single batch.
+        """
+        conversation = self._format_conversation(turns)
+        self._episodes.append({"session_id": session_id, "transcript": conversation})
+
+        valid = self._valid_facts()
+        current_facts = "\n".join(f"[{fid}] {f.content}" for fid, f in valid.items())
+        prompt = FACT_EXTRACTION_PROMPT.format(
+            current_facts=current_facts or "(No facts yet)",
+            session_id=session_id,
+            conversation=conversation,
+        )
+        parsed = self._parse_json_response(self._call_llm(prompt))
+        if not isinstance(parsed, dict):
+            print(f"Warning: Failed to parse fact extraction for {self.user_id} session {session_id}")
+            return []
+
+        items = [item for item in parsed.get("facts", []) if isinstance(item, dict) and item.get("fact")]
+        if not items:
+            return []
+        vectors = self.embedder.embed_batch([item["fact"] for item in items])
+
+        entries = []
+        for item, vector in zip(items, vectors):
+            # Invalidate contradicted facts instead of deleting them
+            invalidated = []
+            old_ids = item.get("invalidates") or []
+            if isinstance(old_ids, str):
+                old_ids = [old_ids]
+            for old_id in old_ids:
+                if old_id in valid and valid[old_id].metadata.get("invalid_at") is None:
+                    valid[old_id].metadata["invalid_at"] = session_id
+                    valid[old_id].updated_at = session_id
+                    invalidated.append(old_id)
+
+            fact_id = str(uuid.uuid4())[:8]
+            entry = MemoryEntry(
+                id=fact_id,
+                content=item["fact"],
+                metadata={
+                    "session_id": session_id,
+                    "source": "zep",
+                    "valid_at": session_id,
+                    "invalid_at": None,
+                    "supersedes": invalidated,
+                },
+                created_at=session_id,
+                updated_at=session_id,
+            )
+            self._facts[fact_id] = entry
+            self._vectors[fact_id] = vector
+            entries.append(entry)
+            if invalidated:
+                self.stats.entries_updated += 1
+            else:
+                self.stats.entries_added += 1
+
+        return entries
+
+    def search(self, query: str, top_k: int = 5) -> list[MemoryEntry]:
+        """Cosine search over facts that are still valid."""
+        valid = self._valid_facts()
+        if not valid:
+            return []
+        vectors = {fid: self._vectors[fid] for fid in valid}
+        results = self.embedder.search(query, vectors, top_k=top_k)
+        return [valid[fid] for fid, _ in results]
+
+    def get_all(self) -> list[MemoryEntry]:
+        """Return the currently valid facts."""
+        return list(self._valid_facts().values())
+
+    def reset(self):
+        self._facts = {}
+        self._vectors = {}
+        self._episodes = []
+        self.stats = MemoryStats()
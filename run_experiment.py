@@ -15,172 +15,91 @@ Usage:
     python run_experiment.py --system agent
     python run_experiment.py --system no_memory
 
+    # Agent backfill mode (AGENT_BACKFILL_SESSIONS sessions per LLM call, default 4)
+    python run_experiment.py --system agent_backfill
+
     # Ablation studies
     python run_experiment.py --system ablation_no_feedback
 
     # Run on subset of profiles
     python run_experiment.py --profiles sarah_01 marcus_02 --model gpt-4o-mini
+
+    # Shard (system, trial) units across 4 worker processes
+    python run_experiment.py --system all --trials 3 --workers 4
+
+    # Run 8 profiles at a time, with their embedding calls batched together
+    python run_experiment.py --system agent --concurrency 8
+
+    # Judge several answers per judge call
+    python run_experiment.py --system agent --judge-batch-size 5
+
+    # Estimate calls, tokens, cost and wall time without running anything
+    python run_experiment.py --system all --trials 3 --plan --concurrency 4
+
+    # Live progress bars, with JSON snapshots under results/progress/
+    python run_experiment.py --system agent --concurrency 8 --progress
+
+    # cProfile/pstats, collapsed stacks and allocation sites per phase
+    python run_experiment.py --system agent --profiles sarah_01 --profile --profile-memory
 """
 
 import argparse
+import glob
 import json
 import os
 import sys
 import time
 
-import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import get_context
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Only light modules here: pandas, NumPy, the OpenAI SDK and the runner are
+# imported where they are used, so --help, --plan and argument errors don't
+# pay for them (see run_perf_benchmark.py --workload imports)
 from benchmark.data import PROFILES
-from evaluation.runner import ExperimentRunner
-from evaluation.metrics import compute_metrics
-from evaluation.failure_analysis import generate_paper_tables, generate_latex_tables
-
-
-# ---------------------------------------------------------------------------
-# System registry
-# ---------------------------------------------------------------------------
-
-ALL_SYSTEM_NAMES = [
-    "current_session",
-    "mem0",
-    "zep_memory",
-    "langmem",
-    "redis",
-    "agent",
-    "ablation_no_feedback",
-    "ablation_no_consolidation",
-    "ablation_add_only",
-]
-
-SYSTEM_DISPLAY_NAMES = {
-    "current_session": "Current Session Only (Baseline)",
-    "mem0": "External Memory (Mem0)",
-    "zep_memory": "External Memory (Zep)",
-    "langmem": "External Memory (LangMem)",
-    "redis": "External Memory (Redis)",
-    "agent": "Agent-Driven",
-    "ablation_no_feedback": "Ablation: No Feedback",
-    "ablation_no_consolidation": "Ablation: No Consolidation",
-    "ablation_add_only": "Ablation: Add Only",
-}
+from evaluation.judge_cache import JudgeCache, fingerprint
+from evaluation.cost_model import cache_savings_usd, format_plan, load_calibration, plan_sweep
+from evaluation.failure_analysis import generate_comparison_latex, generate_comparison_tables
+from memory_systems import resources
+from memory_systems.registry import ALL_SYSTEM_NAMES, SYSTEM_DISPLAY_NAMES, get_factory
 
 
 # ---------------------------------------------------------------------------
-# Factory functions
+# Aggregation: mean +/- std across trials
 # ---------------------------------------------------------------------------
 
-def create_current_session_system(user_id: str):
-    """Baseline: no memory from previous sessions (only current session context)."""
-    from memory_systems.no_memory import NoMemoryBaseline
-    return NoMemoryBaseline(user_id=user_id)
-
-
-def create_zep_memory_system(user_id: str):
-    """Factory for Zep Memory."""
-    from memory_systems.zep_memory import ZepMemory
-    return ZepMemory(user_id=user_id)
-
-
-def create_langmem_system(user_id: str):
-    """Factory for LangMem Memory."""
-    from memory_systems.langmem_memory import LangMemMemory
-    return LangMemMemory(user_id=user_id, openai_api_key=os.getenv("OPENAI_API_KEY"))
-
+# Trial metric sections aggregated as mean/std; each becomes one column per
+# leaf value in a trials x metrics table.
+AGGREGATED_SECTIONS = ["overall", "by_category", "failure_modes", "memory_efficiency"]
+_PATH_SEP = "\x1f"
 
-def create_mem0_system(user_id: str):
-    from memory_systems.external_mem0 import Mem0Memory
-    api_key = os.getenv("MEM0_API_KEY")
-    return Mem0Memory(user_id=user_id, use_local=(api_key is None), api_key=api_key)
-
-
-def create_redis_system(user_id: str):
-    """Factory for Redis Agent Memory Server."""
-    from memory_systems.redis_memory import RedisAgentMemory
-    return RedisAgentMemory(user_id=user_id)
-
-
-def create_agent_system(user_id: str, model: str = None):
-    from memory_systems.agent_driven import AgentDrivenMemory
-    return AgentDrivenMemory(
-        user_id=user_id,
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
-    )
 
-
-def create_ablation_no_feedback(user_id: str, model: str = None):
-    from memory_systems.ablations import AgentNoFeedback
-    return AgentNoFeedback(
-        user_id=user_id,
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
-    )
-
-
-def create_ablation_no_consolidation(user_id: str, model: str = None):
-    from memory_systems.ablations import AgentNoConsolidation
-    return AgentNoConsolidation(
-        user_id=user_id,
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
-    )
-
-
-def create_ablation_add_only(user_id: str, model: str = None):
-    from memory_systems.ablations import AgentAddOnly
-    return AgentAddOnly(
-        user_id=user_id,
-        openai_api_key=os.getenv("OPENAI_API_KEY"),
-        model=model or os.getenv("LLM_MODEL", "gpt-4o-mini"),
-    )
-
-
-def get_factory(system_name: str, model: str):
-    """Return a factory callable(user_id) -> BaseMemorySystem."""
-    factories = {
-        "current_session": lambda uid: create_current_session_system(uid),
-        "mem0": lambda uid: create_mem0_system(uid),
-        "zep_memory": lambda uid: create_zep_memory_system(uid),
-        "langmem": lambda uid: create_langmem_system(uid),
-        "redis": lambda uid: create_redis_system(uid),
-        "agent": lambda uid: create_agent_system(uid, model),
-        "ablation_no_feedback": lambda uid: create_ablation_no_feedback(uid, model),
-        "ablation_no_consolidation": lambda uid: create_ablation_no_consolidation(uid, model),
-        "ablation_add_only": lambda uid: create_ablation_add_only(uid, model),
-    }
-    return factories[system_name]
-
-
-# ---------------------------------------------------------------------------
-# Aggregation: mean +/- std across trials
-# ---------------------------------------------------------------------------
-
-def _aggregate_numeric_dict(dicts: list[dict]) -> dict:
-    """For a list of dicts with the same keys, compute mean/std for numeric values."""
-    if not dicts:
-        return {}
-    result = {}
-    all_keys = set()
-    for d in dicts:
-        all_keys.update(d.keys())
-    n = len(dicts)
-    for key in sorted(all_keys):
-        values = [d.get(key, 0) for d in dicts]
-        if all(isinstance(v, (int, float)) for v in values):
-            result[key] = {
-                "mean": float(np.mean(values)),
-                "std": float(np.std(values, ddof=1)) if n > 1 else 0.0,
-            }
+def _flatten(d: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in d.items():
+        path = f"{prefix}{_PATH_SEP}{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
         else:
-            result[key] = values[0]
-    return result
+            flat[path] = value
+    return flat
 
 
 def aggregate_trial_metrics(trial_metrics_list: list[dict]) -> dict:
-    """Aggregate metrics from multiple trials into mean +/- std."""
+    """Aggregate metrics from multiple trials into mean +/- std.
+
+    Every trial is flattened into one row of a trials x metrics table, so
+    means and stds for all sections come from one column-wise reduction.
+    A metric missing from some trial counts as 0 there; non-numeric values
+    are passed through from the first trial.
+    """
+    import pandas as pd
+
     if not trial_metrics_list:
         return {}
     n = len(trial_metrics_list)
@@ -190,46 +109,37 @@ def aggregate_trial_metrics(trial_metrics_list: list[dict]) -> dict:
         "num_trials": n,
     }
 
-    # Overall
-    aggregated["overall"] = _aggregate_numeric_dict(
-        [m["overall"] for m in trial_metrics_list]
-    )
-
-    # Per-category
-    all_categories = set()
-    for m in trial_metrics_list:
-        all_categories.update(m.get("by_category", {}).keys())
-    aggregated["by_category"] = {}
-    for cat in sorted(all_categories):
-        cat_dicts = [
-            m["by_category"].get(cat, {"total": 0, "correct": 0, "accuracy": 0})
-            for m in trial_metrics_list
-        ]
-        aggregated["by_category"][cat] = _aggregate_numeric_dict(cat_dicts)
-
-    # Failure modes
-    all_modes = set()
-    for m in trial_metrics_list:
-        all_modes.update(m.get("failure_modes", {}).keys())
-    aggregated["failure_modes"] = {}
-    for mode in sorted(all_modes):
-        values = [m.get("failure_modes", {}).get(mode, 0) for m in trial_metrics_list]
-        aggregated["failure_modes"][mode] = {
-            "mean": float(np.mean(values)),
-            "std": float(np.std(values, ddof=1)) if n > 1 else 0.0,
-        }
-
-    # Memory efficiency
-    aggregated["memory_efficiency"] = _aggregate_numeric_dict(
-        [m["memory_efficiency"] for m in trial_metrics_list]
-    )
-
-    # Eval costs (sum across trials)
-    aggregated["eval_costs_total"] = {}
-    cost_keys = trial_metrics_list[0].get("eval_costs", {}).keys()
-    for k in cost_keys:
-        values = [m.get("eval_costs", {}).get(k, 0) for m in trial_metrics_list]
-        aggregated["eval_costs_total"][k] = int(sum(values))
+    frame = pd.DataFrame([
+        _flatten({section: m.get(section, {}) for section in AGGREGATED_SECTIONS})
+        for m in trial_metrics_list
+    ]).fillna(0)
+    numeric = [c for c in frame.columns if pd.api.types.is_numeric_dtype(frame[c])]
+    means = frame[numeric].mean()
+    stds = frame[numeric].std(ddof=1) if n > 1 else pd.Series(0.0, index=numeric)
+
+    for section in AGGREGATED_SECTIONS:
+        aggregated[section] = {}
+    for path in sorted(frame.columns, key=lambda c: c.split(_PATH_SEP)):
+        *parents, leaf = path.split(_PATH_SEP)
+        node = aggregated
+        for key in parents:
+            node = node.setdefault(key, {})
+        if path in means.index:
+            node[leaf] = {"mean": float(means[path]), "std": float(stds[path])}
+        else:
+            node[leaf] = frame[path].iloc[0]
+
+    # Eval costs (sum across trials; rates are recomputed from the summed counts)
+    cost_keys = [
+        k for k in trial_metrics_list[0].get("eval_costs", {}) if not k.endswith("_rate")
+    ]
+    costs = pd.DataFrame([m.get("eval_costs", {}) for m in trial_metrics_list])
+    summed = costs.reindex(columns=cost_keys).fillna(0).sum()
+    totals = {k: int(summed[k]) for k in cost_keys}
+    if "judge_cache_hits" in totals:
+        judged = totals["judge_cache_hits"] + totals.get("judge_cache_misses", 0)
+        totals["judge_cache_hit_rate"] = totals["judge_cache_hits"] / judged if judged else 0.0
+    aggregated["eval_costs_total"] = totals
 
     return aggregated
 
@@ -250,13 +160,14 @@ def print_aggregated_summary(system_name: str, agg: dict):
         print(f"\n  {system_name}: Accuracy = {acc:.1%}")
 
 
-def print_comprehensive_comparison(all_aggregated: dict):
+def print_comprehensive_comparison(all_aggregated: dict, stats: dict = None):
     print("\n" + "=" * 80)
     print("COMPREHENSIVE COMPARISON (mean +/- std across trials)")
     print("=" * 80)
 
-    print(f"\n{'System':<35} {'Accuracy':>20}")
-    print("-" * 58)
+    ci_header = f"{int(stats['confidence'] * 100)}% CI (per-test)" if stats else ""
+    print(f"\n{'System':<35} {'Accuracy':>20} {ci_header:>20}".rstrip())
+    print("-" * (58 + (21 if stats else 0)))
 
     for sys_name in ALL_SYSTEM_NAMES:
         if sys_name not in all_aggregated:
@@ -269,7 +180,21 @@ def print_comprehensive_comparison(all_aggregated: dict):
             acc_str = f"{acc.get('mean', 0):.1%} +/- {acc.get('std', 0):.1%}"
         else:
             acc_str = f"{acc:.1%}"
-        print(f"  {display:<33} {acc_str:>20}")
+        ci_str = ""
+        if stats and sys_name in stats["systems"]:
+            s = stats["systems"][sys_name]
+            ci_str = f"[{s['ci_low']:.1%}, {s['ci_high']:.1%}]"
+        print(f"  {display:<33} {acc_str:>20} {ci_str:>20}".rstrip())
+
+    if not stats or not stats["pairs"]:
+        return
+    print(f"\nPaired by test ({stats['resamples']} resamples; accuracy difference A - B)")
+    print(f"\n{'A':<27} {'B':<27} {'diff':>7} {ci_header:>20} {'McNemar p':>10} {'perm p':>8}")
+    print("-" * 104)
+    for pair in stats["pairs"]:
+        ci_str = f"[{pair['ci_low']:+.1%}, {pair['ci_high']:+.1%}]"
+        print(f"  {pair['a']:<25} {pair['b']:<27} {pair['diff']:>+7.1%} {ci_str:>20} "
+              f"{pair['mcnemar']['p_value']:>10.4f} {pair['permutation_p']:>8.4f}")
 
 
 # ---------------------------------------------------------------------------
@@ -285,6 +210,124 @@ def resolve_systems(system_arg: str) -> list[str]:
         return [system_arg]
 
 
+# ---------------------------------------------------------------------------
+# One (system, trial) unit of work
+# ---------------------------------------------------------------------------
+
+def run_trial(system_name: str, trial_idx: int, model: str, profiles: list[dict],
+              num_trials: int, output_dir: str, timestamp: str,
+              judge_cache_path: str = None, judge_cache_namespace: str = None,
+              judge_batch_size: int = 1, retrieval: str = "vector",
+              concurrency: int = 1, profile_dir: str = None,
+              profile_memory: bool = False, progress: bool = False,
+              progress_bar: bool = True) -> dict:
+    """Run one trial of one system, save its results/metrics, return the metrics.
+
+    Self-contained so it can run in a worker process: every client (runner,
+    memory systems, judge cache) is created here rather than inherited.
+    """
+    from evaluation.dashboard import SweepDashboard
+    from evaluation.metrics import compute_metrics
+    from evaluation.profiling import PhaseProfiler
+    from evaluation.runner import ExperimentRunner
+
+    display_name = SYSTEM_DISPLAY_NAMES.get(system_name, system_name)
+    factory = get_factory(system_name, model, retrieval)
+    # Concurrent profiles share one embedding coalescer per process
+    resources.set_coalescing(concurrency > 1)
+
+    print(f"\n--- {display_name}: Trial {trial_idx}/{num_trials} ---")
+
+    judge_cache = None
+    if judge_cache_path:
+        judge_cache = JudgeCache(judge_cache_path, namespace=judge_cache_namespace)
+
+    profiler = PhaseProfiler(memory=profile_memory) if profile_dir else None
+    runner = ExperimentRunner(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model,
+        judge_cache=judge_cache,
+        judge_batch_size=judge_batch_size,
+        concurrency=concurrency,
+        profiler=profiler,
+    )
+
+    dashboard = nullcontext()
+    if progress:
+        dashboard = SweepDashboard(
+            f"{system_name} trial {trial_idx}",
+            snapshot_path=os.path.join(
+                output_dir, "progress", f"{system_name}_trial{trial_idx}_{timestamp}.json",
+            ),
+            bar=progress_bar,
+        )
+
+    with profiler or nullcontext(), dashboard:
+        results = runner.run_full_experiment(
+            memory_system_factory=factory,
+            system_name=display_name,
+            profiles=profiles,
+        )
+
+    if profiler is not None:
+        summary = profiler.write(profile_dir, f"{system_name}_trial{trial_idx}_{timestamp}")
+        print(f"  Profile ({display_name} trial {trial_idx}):")
+        for phase, p in summary["phases"].items():
+            print(f"    {phase:<9} {p['calls']:>5} calls {p['seconds']:>9.2f} s")
+        print(f"  Profile reports: {summary['files']['report']}")
+
+    # Save individual trial results
+    trial_path = os.path.join(
+        output_dir,
+        f"{system_name}_trial{trial_idx}_results_{timestamp}.json",
+    )
+    runner.save_results(results, trial_path)
+
+    # Compute metrics for this trial
+    metrics = compute_metrics(results)
+    metrics_path = os.path.join(
+        output_dir,
+        f"{system_name}_trial{trial_idx}_metrics_{timestamp}.json",
+    )
+    with open(metrics_path, "w") as f:
+        json.dump(metrics, f, indent=2)
+
+    acc = metrics["overall"]["accuracy"]
+    print(f"  {display_name} trial {trial_idx} accuracy: {acc:.1%}")
+    if judge_cache is not None:
+        print(f"  Judge cache hit rate: {results['eval_costs']['judge_cache_hit_rate']:.1%}")
+    efficiency = metrics["memory_efficiency"]
+    input_tokens = efficiency["total_input_tokens"] + results["eval_costs"]["input_tokens"]
+    cached_tokens = efficiency["total_cached_input_tokens"] + results["eval_costs"]["cached_input_tokens"]
+    if cached_tokens:
+        print(f"  Prompt cache: {cached_tokens / input_tokens:.1%} of input tokens cached, "
+              f"saving ${cache_savings_usd(model, cached_tokens):.3f}")
+    return metrics
+
+
+# ---------------------------------------------------------------------------
+# Pre-flight plan
+# ---------------------------------------------------------------------------
+
+def print_plan(args):
+    profiles = PROFILES
+    if args.profiles:
+        profiles = [p for p in PROFILES if p["user_id"] in args.profiles]
+    results_dirs = args.calibrate_from or [args.output_dir] + sorted(glob.glob("results_v5*"))
+    calibration = load_calibration(results_dirs)
+    plan = plan_sweep(
+        resolve_systems(args.system),
+        profiles=profiles,
+        trials=args.trials,
+        model=args.model or "gpt-4o-mini",
+        concurrency=args.concurrency,
+        calibration=calibration,
+    )
+    print(format_plan(plan))
+    if calibration:
+        print(f"Calibrated from prior results in: {', '.join(results_dirs)}")
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -294,8 +337,8 @@ def main():
     parser.add_argument(
         "--system",
         choices=[
-            "all", "both", "mem0", "agent",
-            "current_session", "zep_memory", "langmem", "redis",
+            "all", "both", "mem0", "agent", "agent_backfill",
+            "current_session", "full_context", "zep_memory", "langmem", "redis",
             "ablation_no_feedback", "ablation_no_consolidation", "ablation_add_only",
         ],
         default="both",
@@ -309,14 +352,63 @@ def main():
                         help="LLM model to use (default: gpt-4o-mini)")
     parser.add_argument("--output-dir", default="results",
                         help="Directory for output files")
+    parser.add_argument("--judge-cache", default=None,
+                        help="Judge cache file (default: <output-dir>/judge_cache.jsonl)")
+    parser.add_argument("--no-judge-cache", action="store_true",
+                        help="Always call the judge, even for previously judged answers")
+    parser.add_argument("--judge-batch-size", type=int, default=1,
+                        help="Judge up to N test answers per judge call (default: 1)")
+    parser.add_argument("--retrieval", choices=["vector", "hybrid"], default="vector",
+                        help="Memory search for agent-driven systems: cosine only, "
+                             "or cosine + BM25 fused with RRF (default: vector)")
+    parser.add_argument("--bootstrap-resamples", type=int, default=None,
+                        help="Resamples for per-test CIs and permutation tests "
+                             "in the comparison (default: BOOTSTRAP_RESAMPLES in evaluation/statistics.py)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for (system, trial) units (default: 1, in-process)")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print projected calls, tokens, cost and wall time, then exit")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Profiles run concurrently (threads) within each trial; "
+                             "also assumed by --plan (default: 1)")
+    parser.add_argument("--progress", action="store_true",
+                        help="Live progress bar per (system, trial) with tests/s, tokens/s, "
+                             "in-flight requests, errors and ETA; snapshots to <output-dir>/progress/")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile setup/ingest/retrieve/answer/judge phases: pstats per phase, "
+                             "collapsed stacks for flamegraphs and a text report")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile, also trace allocations per phase "
+                             "(slower; needs --concurrency 1)")
+    parser.add_argument("--profile-dir", default=None,
+                        help="Where --profile writes its reports (default: <output-dir>/profile)")
+    parser.add_argument("--calibrate-from", nargs="+", default=None,
+                        help="Results directories used to calibrate --plan "
+                             "(default: --output-dir and results_v5*)")
     args = parser.parse_args()
 
+    if args.plan:
+        print_plan(args)
+        return
+
+    if args.bootstrap_resamples is not None and args.bootstrap_resamples < 1:
+        parser.error("--bootstrap-resamples must be at least 1")
+
+    if args.profile_memory and args.concurrency > 1:
+        print("Error: --profile-memory snapshots the whole heap per phase; run it with --concurrency 1")
+        sys.exit(1)
+
     # Validate API key
     if not os.getenv("OPENAI_API_KEY"):
         print("Error: OPENAI_API_KEY not set. Create a .env file:")
         print('  echo "OPENAI_API_KEY=sk-..." > .env')
         sys.exit(1)
 
+    from evaluation.prompts import (
+        ANSWER_EVALUATION_PROMPT, ANSWER_EVALUATION_SYSTEM_PROMPT, BATCH_EVALUATION_SYSTEM_PROMPT,
+    )
+    from evaluation.statistics import BOOTSTRAP_RESAMPLES, compare_systems
+
     # Filter profiles if specified
     profiles = PROFILES
     if args.profiles:
@@ -332,57 +424,69 @@ def main():
     print(f"Systems: {', '.join(systems_to_run)}")
     print(f"Trials per system: {args.trials}")
     print(f"Model: {model}")
+    print(f"Retrieval: {args.retrieval}")
+    if args.concurrency > 1:
+        print(f"Concurrent profiles per trial: {args.concurrency}")
     print()
 
     os.makedirs(args.output_dir, exist_ok=True)
     timestamp = time.strftime("%Y%m%d_%H%M%S")
 
+    judge_cache_path = None
+    judge_cache_namespace = None
+    if not args.no_judge_cache:
+        judge_cache_path = args.judge_cache or os.path.join(args.output_dir, "judge_cache.jsonl")
+        # Batched verdicts come from a different prompt; keep them apart
+        judge_cache_namespace = fingerprint(
+            model, ANSWER_EVALUATION_SYSTEM_PROMPT, ANSWER_EVALUATION_PROMPT,
+            BATCH_EVALUATION_SYSTEM_PROMPT if args.judge_batch_size > 1 else "",
+        )
+        existing = len(JudgeCache(judge_cache_path, judge_cache_namespace))
+        print(f"Judge cache: {judge_cache_path} ({existing} entries)")
+
+    # One unit of work per (system, trial); order here is the merge order
+    units = [
+        (system_name, trial_idx)
+        for system_name in systems_to_run
+        for trial_idx in range(1, args.trials + 1)
+    ]
+    trial_kwargs = {
+        "model": model,
+        "profiles": profiles,
+        "num_trials": args.trials,
+        "output_dir": args.output_dir,
+        "timestamp": timestamp,
+        "judge_cache_path": judge_cache_path,
+        "judge_cache_namespace": judge_cache_namespace,
+        "judge_batch_size": args.judge_batch_size,
+        "retrieval": args.retrieval,
+        "concurrency": args.concurrency,
+        "profile_dir": (args.profile_dir or os.path.join(args.output_dir, "profile"))
+        if args.profile else None,
+        "profile_memory": args.profile_memory,
+        "progress": args.progress,
+        # Bars from several worker processes would overwrite each other;
+        # workers only write snapshots
+        "progress_bar": args.workers <= 1,
+    }
+
+    if args.workers > 1:
+        print(f"Scheduling {len(units)} (system, trial) units across {args.workers} worker processes")
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn")) as pool:
+            futures = {unit: pool.submit(run_trial, *unit, **trial_kwargs) for unit in units}
+            unit_metrics = {unit: future.result() for unit, future in futures.items()}
+    else:
+        unit_metrics = {unit: run_trial(*unit, **trial_kwargs) for unit in units}
+
     all_aggregated = {}
     all_single_metrics = {}
+    all_trial_metrics = {}
 
     for system_name in systems_to_run:
         display_name = SYSTEM_DISPLAY_NAMES.get(system_name, system_name)
-        factory = get_factory(system_name, model)
-
-        print("=" * 60)
-        print(f"Running {display_name}  ({args.trials} trial(s))")
-        print("=" * 60)
-
-        trial_metrics_list = []
-
-        for trial_idx in range(1, args.trials + 1):
-            print(f"\n--- Trial {trial_idx}/{args.trials} ---")
-
-            runner = ExperimentRunner(
-                openai_api_key=os.getenv("OPENAI_API_KEY"),
-                model=model,
-            )
-
-            results = runner.run_full_experiment(
-                memory_system_factory=factory,
-                system_name=display_name,
-                profiles=profiles,
-            )
-
-            # Save individual trial results
-            trial_path = os.path.join(
-                args.output_dir,
-                f"{system_name}_trial{trial_idx}_results_{timestamp}.json",
-            )
-            runner.save_results(results, trial_path)
-
-            # Compute metrics for this trial
-            metrics = compute_metrics(results)
-            metrics_path = os.path.join(
-                args.output_dir,
-                f"{system_name}_trial{trial_idx}_metrics_{timestamp}.json",
-            )
-            with open(metrics_path, "w") as f:
-                json.dump(metrics, f, indent=2)
-
-            acc = metrics["overall"]["accuracy"]
-            print(f"  Trial {trial_idx} accuracy: {acc:.1%}")
-            trial_metrics_list.append(metrics)
+        trial_metrics_list = [
+            unit_metrics[(system_name, trial_idx)] for trial_idx in range(1, args.trials + 1)
+        ]
 
         # Aggregate across trials
         aggregated = aggregate_trial_metrics(trial_metrics_list)
@@ -396,11 +500,15 @@ def main():
 
         all_aggregated[system_name] = aggregated
         all_single_metrics[system_name] = trial_metrics_list[-1]
+        all_trial_metrics[system_name] = trial_metrics_list
         print()
 
     # Final comparison
     if len(all_aggregated) > 1:
-        print_comprehensive_comparison(all_aggregated)
+        stats = compare_systems(all_trial_metrics,
+                                resamples=BOOTSTRAP_RESAMPLES if args.bootstrap_resamples is None
+                                else args.bootstrap_resamples)
+        print_comprehensive_comparison(all_aggregated, stats)
 
         comparison_path = os.path.join(
             args.output_dir, f"comparison_aggregated_{timestamp}.json",
@@ -409,14 +517,21 @@ def main():
             json.dump(all_aggregated, f, indent=2, default=str)
         print(f"\nComparison saved to {comparison_path}")
 
-    # Legacy pairwise tables
-    if "mem0" in all_single_metrics and "agent" in all_single_metrics:
+        stats_path = os.path.join(args.output_dir, f"comparison_stats_{timestamp}.json")
+        with open(stats_path, "w") as f:
+            json.dump(stats, f, indent=2)
+        print(f"Significance tests saved to {stats_path}")
+
+    # Comparison tables across every system run (means over trials; the
+    # per-test table uses each system's last trial)
+    if len(all_aggregated) > 1:
         print("\n" + "=" * 60)
-        print("PAIRWISE COMPARISON (External vs Agent-Driven, last trial)")
+        print(f"COMPARISON TABLES ({len(all_aggregated)} systems, mean across trials)")
         print("=" * 60)
 
-        tables = generate_paper_tables(
-            all_single_metrics["mem0"], all_single_metrics["agent"],
+        tables = generate_comparison_tables(
+            all_aggregated,
+            test_details={name: m["test_details"] for name, m in all_single_metrics.items()},
         )
         print(tables)
 
@@ -424,9 +539,7 @@ def main():
         with open(tables_path, "w") as f:
             f.write(tables)
 
-        latex = generate_latex_tables(
-            all_single_metrics["mem0"], all_single_metrics["agent"],
-        )
+        latex = generate_comparison_latex(all_aggregated)
         latex_path = os.path.join(args.output_dir, f"latex_tables_{timestamp}.tex")
         with open(latex_path, "w") as f:
             f.write(latex)
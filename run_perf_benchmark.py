@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Systems-level performance benchmark for the memory systems.
+
+Drives every system in the run_experiment.py registry through the standardized
+ingest / search / growth workloads and writes a machine-readable JSON report,
+so throughput, latency and footprint can be tracked between commits.
+
+Usage:
+    # All systems, default workload sizes
+    python run_perf_benchmark.py
+
+    # One system, bigger workload
+    python run_perf_benchmark.py --system agent --sessions 20 --searches 100 --grow-to 100
+
+    # Flag regressions against an earlier report
+    python run_perf_benchmark.py --system agent --compare results/perf/perf_20260301_120000.json
+
+    # LangMem store retrieval with vs without the embedding index
+    python run_perf_benchmark.py --workload langmem_index --profiles-limit 5
+
+    # LangMem extraction prompt growth, all vs top-k existing memories
+    python run_perf_benchmark.py --workload langmem_existing --profiles-limit 5
+
+    # Memory ranking latency and recall: vector vs BM25 vs hybrid
+    python run_perf_benchmark.py --workload retrieval
+
+    # Embedding calls from 8 concurrent profiles, with vs without coalescing
+    python run_perf_benchmark.py --workload coalescer --threads 8
+
+    # Agent ingestion per user turn vs backfill with 1 and 4 sessions per call:
+    # throughput, LLM calls/tokens and judge-free recall
+    python run_perf_benchmark.py --workload backfill --backfill-sessions 1 4 --profiles-limit 5
+
+    # Agent call latency and input cost, volatile-first vs stable prompt prefix
+    python run_perf_benchmark.py --workload prompt_cache --profiles-limit 3
+
+    # 2000 simulated users on one multi-tenant agent memory service, 200 resident
+    # at a time: throughput, latency, LRU paging, footprint (offline, no API key)
+    python run_perf_benchmark.py --workload multi_tenant --users 2000 --max-resident 200 --threads 16
+
+    # Import cost per package and CLI --help latency; exits 1 if a light
+    # module imports NumPy, pandas, the OpenAI SDK or another heavy dependency
+    python run_perf_benchmark.py --workload imports --compare results/perf/imports_<timestamp>.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from benchmark.data import PROFILES
+from memory_systems.registry import ALL_SYSTEM_NAMES
+
+
+def print_report(report: dict):
+    print("\n" + "=" * 80)
+    print("PERFORMANCE SUMMARY")
+    print("=" * 80)
+    print(f"\n{'System':<28} {'setup ms':>9} {'turns/s':>9} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'RSS MB':>8} {'B/mem':>9} {'calls/sess':>11}")
+    print("-" * 98)
+    for system_name, m in report["systems"].items():
+        if "error" in m:
+            print(f"  {system_name:<26} ERROR: {m['error']}")
+            continue
+        print(
+            f"  {system_name:<26} "
+            f"{m['startup']['pooled']['latency']['mean_ms']:>9.1f} "
+            f"{m['ingest']['turns_per_sec']:>9.2f} "
+            f"{m['search']['latency']['p50_ms']:>9.1f} "
+            f"{m['search']['latency']['p99_ms']:>9.1f} "
+            f"{m['peak_rss_mb']:>8.1f} "
+            f"{m['growth']['bytes_per_memory']:>9.0f} "
+            f"{m['ingest']['api_calls_per_session']['total']:>11.2f}"
+        )
+
+    print("\nProfile startup, mean ms (unpooled -> pooled):")
+    for system_name, m in report["systems"].items():
+        if "error" not in m:
+            before = m["startup"]["unpooled"]["latency"]["mean_ms"]
+            after = m["startup"]["pooled"]["latency"]["mean_ms"]
+            print(f"  {system_name:<26} {before:>9.1f} -> {after:.1f}")
+
+
+def print_component_report(report: dict):
+    print("\n" + "=" * 80)
+    print(f"{report['meta']['workload'].upper()} WORKLOAD")
+    print("=" * 80)
+    if report["meta"]["workload"] == "retrieval":
+        modes = report["results"]["modes"]
+        print(f"\n{'Mode':<10} {'p50 ms':>8} {'p99 ms':>8} {'recall@5':>9}")
+        print("-" * 38)
+        for mode, m in modes.items():
+            print(f"  {mode:<8} {m['rank_latency']['p50_ms']:>8.3f} "
+                  f"{m['rank_latency']['p99_ms']:>8.3f} {m['recall_at_k']:>9.1%}")
+        print("\nRecall of required memories by category:")
+        print(f"  {'Category':<25}" + "".join(f"{mode:>9}" for mode in modes))
+        categories = next(iter(modes.values()))["recall_by_category"]
+        for cat in categories:
+            print(f"  {cat:<25}" + "".join(
+                f"{m['recall_by_category'].get(cat, 0.0):>9.1%}" for m in modes.values()))
+        return
+    if report["meta"]["workload"] == "coalescer":
+        results = report["results"]
+        print(f"\n{results['threads']} threads, max wait {results['max_wait_ms']:g} ms")
+        print(f"\n{'Mode':<12} {'requests':>9} {'API calls':>10} {'seconds':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        print("-" * 60)
+        for mode in ("direct", "coalesced"):
+            m = results[mode]
+            print(f"  {mode:<10} {m['requests']:>9} {m['embedding_calls']:>10} {m['seconds']:>8.2f} "
+                  f"{m['request_latency']['p50_ms']:>8.1f} {m['request_latency']['p99_ms']:>8.1f}")
+        c = results["coalesced"]["coalescer"]
+        print(f"\nCoalescer: {c['requests']} requests -> {c['api_calls']} batched calls")
+        return
+    if report["meta"]["workload"] == "backfill":
+        results = report["results"]
+        modes = {k: v for k, v in results.items() if isinstance(v, dict)}
+        recall = f"recall@{results['top_k']}"
+        print(f"\n{'Mode':<14} {'seconds':>8} {'turns/s':>8} {'LLM calls':>10} {'input tok':>10} "
+              f"{'output tok':>11} {'memories':>9} {'facts':>6} {recall:>9}")
+        print("-" * 92)
+        for mode, m in modes.items():
+            print(f"  {mode:<12} {m['seconds']:>8.1f} {m['turns_per_sec']:>8.2f} {m['llm_calls']:>10} "
+                  f"{m['input_tokens']:>10,} {m['output_tokens']:>11,} {m['entries']:>9} "
+                  f"{m['fact_coverage']:>6.0%} {m['recall_at_k']:>9.1%}")
+        print("\nRecall of required memories by category:")
+        print(f"  {'Category':<25}" + "".join(f"{mode:>13}" for mode in modes))
+        for cat in modes["per_turn"]["recall_by_category"]:
+            print(f"  {cat:<25}" + "".join(
+                f"{m['recall_by_category'].get(cat, 0.0):>13.1%}" for m in modes.values()))
+        return
+    if report["meta"]["workload"] == "prompt_cache":
+        results = report["results"]
+        print(f"\n{'Layout':<16} {'calls':>6} {'p50 ms':>8} {'mean ms':>8} {'prompt tok':>11} "
+              f"{'cached':>7} {'input $':>9}")
+        print("-" * 72)
+        for mode in ("volatile_first", "stable_prefix"):
+            m = results[mode]
+            print(f"  {mode:<14} {m['calls']:>6} {m['latency']['p50_ms']:>8.0f} {m['latency']['mean_ms']:>8.0f} "
+                  f"{m['prompt_tokens']:>11,} {m['cached_share']:>7.0%} {m['input_cost_usd']:>9.4f}")
+        r = results["reduction"]
+        print(f"\nStable prefix vs volatile first ({results['model']}): "
+              f"p50 latency {-r['p50_latency']:+.0%}, mean latency {-r['mean_latency']:+.0%}, "
+              f"input cost {-r['input_cost']:+.0%}")
+        return
+    if report["meta"]["workload"] == "multi_tenant":
+        results = report["results"]
+        print(f"\n{results['users']} users, {results['max_resident']} resident, {results['threads']} threads")
+        ingest, serve, verify = results["ingest"], results["serve"], results["verify"]
+        print(f"\nIngest: {ingest['sessions']} sessions in {ingest['seconds']:.1f} s "
+              f"({ingest['sessions_per_sec']:,.0f}/s, p50 {ingest['latency']['p50_ms']:.2f} ms, "
+              f"p99 {ingest['latency']['p99_ms']:.2f} ms), {ingest['page_outs']} page-outs")
+        print(f"Serve: {serve['requests']} requests in {serve['seconds']:.1f} s "
+              f"({serve['requests_per_sec']:,.0f}/s), {serve['page_ins']} page-ins, "
+              f"{serve['page_outs']} page-outs")
+        print(f"  {'':<8} {'count':>7} {'p50 ms':>8} {'p99 ms':>8}")
+        for op, count in (("search", serve["searches"]), ("write", serve["writes"])):
+            latency = serve[f"{op}_latency"]
+            print(f"  {op:<8} {count:>7} {latency['p50_ms']:>8.2f} {latency['p99_ms']:>8.2f}")
+        print(f"  recall@{results['top_k']} {serve['recall_at_k']:.1%}, "
+              f"isolation violations {serve['isolation_violations']}")
+        print(f"Verify: {verify['expected_memories']} memories read back in {verify['seconds']:.1f} s, "
+              f"{verify['page_ins']} page-ins, {verify['lost_memories']} lost")
+        f = results["footprint"]
+        print(f"Footprint: {f['resident_users']} users / {f['resident_memories']} memories resident, "
+              f"vector matrix {f['vector_matrix']['rows_used']}/{f['vector_matrix']['rows_capacity']} rows "
+              f"({f['vector_matrix']['bytes'] / 1e6:.1f} MB), snapshots {f['snapshot_bytes'] / 1e6:.1f} MB, "
+              f"peak RSS {f['peak_rss_mb']:.0f} MB")
+        return
+    if report["meta"]["workload"] == "imports":
+        results = report["results"]
+        print(f"\n{'Module':<24} {'import ms':>10} {'modules':>8}  heavy / slowest")
+        print("-" * 90)
+        for module, m in results["modules"].items():
+            slowest = ", ".join(f"{s['module']} {s['self_ms']:.1f}" for s in m["slowest"][:3])
+            heavy = f"HEAVY: {', '.join(m['heavy'])}" if m["heavy"] else slowest
+            print(f"  {module:<22} {m['import_ms']:>10.1f} {m['modules_imported']:>8}  {heavy}")
+        print(f"\n{'Script':<24} {'--help ms':>10}")
+        print("-" * 36)
+        for script, ms in results["cli_help_ms"].items():
+            print(f"  {script:<22} {ms:>10.1f}")
+        for violation in results["violations"]:
+            print(f"\nVIOLATION: {violation}")
+        return
+    if report["meta"]["workload"] == "langmem_existing":
+        for mode, m in report["results"].items():
+            curve = " ".join(f"{t:.0f}" for t in m["prompt_tokens_per_session"])
+            print(f"\n  {mode}")
+            print(f"    prompt tokens per session: {curve}")
+            print(f"    total prompt tokens: {m['total_prompt_tokens']}, "
+                  f"entries: {m['entries']}, API calls: {m['api_calls']['total']}")
+        return
+    print(f"\n{'Mode':<24} {'memories':>9} {'put s':>8} {'embed calls':>12} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'recall@k':>9}")
+    print("-" * 84)
+    for mode, m in report["results"].items():
+        print(
+            f"  {mode:<22} {m['memories']:>9} {m['put_seconds']:>8.2f} "
+            f"{m['put_embedding_calls']:>12} {m['search_latency']['p50_ms']:>8.2f} "
+            f"{m['search_latency']['p99_ms']:>8.2f} {m['required_recall_at_k']:>9.1%}"
+        )
+
+
+def run_component(args) -> dict:
+    from evaluation.performance import (
+        git_commit,
+        run_coalescer_workload,
+        run_import_workload,
+        run_langmem_existing_workload,
+        run_backfill_workload,
+        run_langmem_index_workload,
+        run_multi_tenant_workload,
+        run_prompt_cache_workload,
+        run_retrieval_workload,
+    )
+    from memory_systems.embedder import Embedder
+
+    profiles = PROFILES[:args.profiles_limit]
+    if args.workload == "imports":
+        results = run_import_workload(repeats=args.import_repeats)
+    elif args.workload == "langmem_existing":
+        results = run_langmem_existing_workload(profiles, args.existing_top_k)
+    elif args.workload == "coalescer":
+        results = run_coalescer_workload(os.getenv("OPENAI_API_KEY"), profiles, args.threads)
+    elif args.workload == "backfill":
+        results = run_backfill_workload(os.getenv("OPENAI_API_KEY"), args.model or "gpt-4o-mini",
+                                        profiles, args.backfill_sessions)
+    elif args.workload == "prompt_cache":
+        results = run_prompt_cache_workload(os.getenv("OPENAI_API_KEY"), args.model or "gpt-4o-mini",
+                                            profiles, args.cache_calls)
+    elif args.workload == "multi_tenant":
+        results = run_multi_tenant_workload(profiles, args.users, args.max_resident, args.threads)
+    elif args.workload == "retrieval":
+        embedder = Embedder(api_key=os.getenv("OPENAI_API_KEY"))
+        results = run_retrieval_workload(embedder, profiles)
+    else:
+        embedder = Embedder(api_key=os.getenv("OPENAI_API_KEY"))
+        results = run_langmem_index_workload(embedder, profiles)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "git_commit": git_commit(),
+            "workload": args.workload,
+            "profiles": len(profiles),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MemoryBench performance workloads")
+    parser.add_argument("--system", choices=["all"] + ALL_SYSTEM_NAMES, default="all",
+                        help="Which memory system(s) to benchmark")
+    parser.add_argument("--workload",
+                        choices=["systems", "langmem_index", "langmem_existing", "retrieval",
+                                 "coalescer", "backfill", "prompt_cache", "multi_tenant", "imports"],
+                        default="systems",
+                        help="Full-system suite, or a single component workload")
+    parser.add_argument("--profiles-limit", type=int, default=len(PROFILES),
+                        help="Profiles used by component workloads")
+    parser.add_argument("--existing-top-k", type=int, default=10,
+                        help="Existing memories passed to LangMem in top-k mode")
+    parser.add_argument("--threads", type=int, default=8,
+                        help="Concurrent profiles in the coalescer workload, "
+                             "worker threads in the multi_tenant workload")
+    parser.add_argument("--backfill-sessions", type=int, nargs="+", default=[1, 4],
+                        help="Sessions per LLM call for each backfill mode in the backfill workload")
+    parser.add_argument("--cache-calls", type=int, default=40,
+                        help="Agent conversation calls per layout in the prompt_cache workload")
+    parser.add_argument("--users", type=int, default=2000,
+                        help="Simulated users in the multi_tenant workload")
+    parser.add_argument("--max-resident", type=int, default=200,
+                        help="Users held in memory before LRU page-out in the multi_tenant workload")
+    parser.add_argument("--import-repeats", type=int, default=5,
+                        help="Fresh interpreters per measurement in the imports workload (best is kept)")
+    parser.add_argument("--sessions", type=int, default=8,
+                        help="Training sessions to ingest (N)")
+    parser.add_argument("--searches", type=int, default=20,
+                        help="Search queries to run (M)")
+    parser.add_argument("--grow-to", type=int, default=50,
+                        help="Target store size for the footprint workload (K)")
+    parser.add_argument("--model", default=None,
+                        help="LLM model to use (default: gpt-4o-mini)")
+    parser.add_argument("--output-dir", default="results/perf",
+                        help="Directory for the JSON report")
+    parser.add_argument("--compare", default=None,
+                        help="Earlier report to diff against")
+    args = parser.parse_args()
+
+    from evaluation.performance import compare_import_reports, compare_reports, run_suite
+
+    if not os.getenv("OPENAI_API_KEY") and args.workload not in ("imports", "multi_tenant"):
+        print("Error: OPENAI_API_KEY not set. Create a .env file:")
+        print('  echo "OPENAI_API_KEY=sk-..." > .env')
+        sys.exit(1)
+
+    if args.workload != "systems":
+        report = run_component(args)
+        print_component_report(report)
+    else:
+        model = args.model or "gpt-4o-mini"
+        systems = list(ALL_SYSTEM_NAMES) if args.system == "all" else [args.system]
+
+        print(f"Benchmarking {', '.join(systems)}")
+        print(f"Workload: {args.sessions} sessions, {args.searches} searches, grow to {args.grow_to} entries")
+        report = run_suite(systems, model, args.sessions, args.searches, args.grow_to)
+        print_report(report)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    prefix = "perf" if args.workload == "systems" else args.workload
+    path = os.path.join(args.output_dir, f"{prefix}_{timestamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport saved to {path}")
+
+    if args.compare and args.workload in ("systems", "imports"):
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        compare = compare_reports if args.workload == "systems" else compare_import_reports
+        print(compare(report, baseline))
+
+    if args.workload == "imports" and report["results"]["violations"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Light packages and entry points must not import heavy dependencies.
+
+Runs the `run_perf_benchmark.py --workload imports` measurement once, so a
+module-level `import numpy` (or pandas, the OpenAI SDK, ...) in a light
+module fails the suite instead of waiting for someone to run the benchmark.
+"""
+
+from evaluation.performance import HEAVY_MODULES, _importtime, run_import_workload
+
+
+def test_light_imports_stay_light():
+    report = run_import_workload(repeats=1)
+    assert report["violations"] == []
+
+
+def test_plan_stays_light():
+    # --plan builds every prompt it prices, so it touches far more than --help
+    rows = _importtime(
+        "import runpy, sys; "
+        "sys.argv = ['run_experiment.py', '--plan', '--system', 'all']; "
+        "runpy.run_path('run_experiment.py', run_name='__main__')"
+    )
+    heavy = sorted({name.split(".")[0] for name in rows} & set(HEAVY_MODULES))
+    assert heavy == []
@@ -0,0 +1,37 @@
+"""PhaseProfiler reports must survive phase calls whose cProfile could not start."""
+
+import cProfile
+import threading
+
+from evaluation.profiling import PhaseProfiler
+
+
+def test_write_skips_phase_calls_that_were_never_profiled(tmp_path, monkeypatch):
+    real_enable = cProfile.Profile.enable
+    main = threading.get_ident()
+
+    def enable(self, *args, **kwargs):
+        # What Python 3.12+ does when another thread's profiler is active
+        if threading.get_ident() != main:
+            raise ValueError("Another profiling tool is already active")
+        return real_enable(self, *args, **kwargs)
+
+    monkeypatch.setattr(cProfile.Profile, "enable", enable)
+
+    def run_phase(name):
+        with profiler.phase(name):
+            sum(range(1000))
+
+    with PhaseProfiler() as profiler:
+        run_phase("judge")
+        for name in ("judge", "answer"):
+            worker = threading.Thread(target=run_phase, args=(name,))
+            worker.start()
+            worker.join()
+
+    summary = profiler.write(str(tmp_path), "run")
+    assert summary["phases"]["judge"]["calls"] == 2
+    assert summary["phases"]["judge"]["unprofiled_calls"] == 1
+    assert summary["phases"]["answer"]["unprofiled_calls"] == 1
+    assert "judge_pstats" in summary["files"]
+    assert "answer_pstats" not in summary["files"]
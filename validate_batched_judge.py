@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Check that batched judging agrees with per-item judging and with humans.
+
+Re-judges the human-validated sample (human_validation/answer_key.csv +
+annotation_sheet.csv) twice — once per item, once with --batch-size items per
+judge call — and reports agreement and Cohen's kappa of each against the
+human ratings, plus batched-vs-per-item agreement. Exits non-zero if batching
+lowers human agreement by more than --tolerance.
+
+The answer key's rows are looked up in RESULT_FILES, or, for a sheet
+generated with --db, in the warehouse runs whose run_id the key records.
+
+Usage:
+    python validate_batched_judge.py --batch-size 5
+    python validate_batched_judge.py --batch-size 5 --db results/warehouse.db
+"""
+
+import argparse
+import copy
+import csv
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from evaluation.runner import ExperimentRunner
+from evaluation.warehouse import connect, load_run
+from human_validation.compute_agreement import LABELS, cohens_kappa, load_annotations
+from human_validation.generate_validation_sheet import RESULT_FILES
+
+
+def _tests_by_id(data: dict) -> dict:
+    return {t["test_id"]: t for p in data["profile_results"] for t in p["test_results"]}
+
+
+def load_sample(answer_key_path: str, conn=None) -> list[dict]:
+    """Rebuild the judge inputs for every row of the answer key.
+
+    Rows with a run_id come from that warehouse run (conn), the rest from
+    RESULT_FILES. Raises ValueError if a row's source isn't available.
+    """
+    results_by_source = {}
+
+    def tests_for(row):
+        if row.get("run_id"):
+            if conn is None:
+                raise ValueError("the answer key was sampled from warehouse runs; pass --db")
+            source = int(row["run_id"])
+            if source not in results_by_source:
+                if conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (source,)).fetchone() is None:
+                    raise ValueError(f"run {source} is not in the warehouse")
+                results_by_source[source] = _tests_by_id(load_run(conn, source))
+        else:
+            source = row["system"]
+            if source not in results_by_source:
+                with open(RESULT_FILES[source]) as f:
+                    results_by_source[source] = _tests_by_id(json.load(f))
+        return results_by_source[source]
+
+    sample = []
+    with open(answer_key_path) as f:
+        for row in csv.DictReader(f):
+            result = tests_for(row)[row["test_id"]]
+            sample.append({
+                "id": int(row["id"]),
+                "category": row["category"],
+                "stored_rating": row["llm_judge_rating"].strip().lower(),
+                "test_result": {
+                    "test_id": result["test_id"],
+                    "query": result["query"],
+                    "required_memories": result["required_memories"],
+                    "retrieved_memories": result["retrieved_memories"],
+                    "system_answer": result["system_answer"],
+                    "correct_answer": result["correct_answer"],
+                    "evaluation": None,
+                },
+            })
+    return sample
+
+
+def agreement(a: list[str], b: list[str]) -> tuple[float, float]:
+    agree = sum(1 for x, y in zip(a, b) if x == y)
+    return agree / len(a) if a else 0.0, cohens_kappa(a, b, LABELS)
+
+
+def rejudge(sample: list[dict], model: str, batch_size: int) -> tuple[list[str], int]:
+    runner = ExperimentRunner(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        model=model,
+        judge_batch_size=batch_size,
+    )
+    test_results = [copy.deepcopy(s["test_result"]) for s in sample]
+    runner._evaluate_tests(test_results)
+    ratings = [tr["evaluation"].get("rating", "error") for tr in test_results]
+    return ratings, runner.eval_llm_calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate batched LLM judging")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="Max allowed drop in human agreement from batching")
+    parser.add_argument("--answer-key", default="human_validation/answer_key.csv")
+    parser.add_argument("--annotations", default="human_validation/annotation_sheet.csv")
+    parser.add_argument("--db", default=None,
+                        help="Warehouse the sheet was sampled from (generate_validation_sheet.py --db)")
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_API_KEY"):
+        print("Error: OPENAI_API_KEY not set.")
+        sys.exit(1)
+
+    human_by_id = load_annotations(args.annotations)
+    try:
+        sample = load_sample(args.answer_key, connect(args.db) if args.db else None)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    sample = [s for s in sample if s["id"] in human_by_id]
+    human = [human_by_id[s["id"]] for s in sample]
+    print(f"Re-judging {len(sample)} human-rated answers (batch size {args.batch_size})\n")
+
+    single, single_calls = rejudge(sample, args.model, batch_size=1)
+    batched, batched_calls = rejudge(sample, args.model, batch_size=args.batch_size)
+    stored = [s["stored_rating"] for s in sample]
+
+    rows = [
+        ("Stored judge vs human", agreement(stored, human), len(sample)),
+        ("Per-item judge vs human", agreement(single, human), single_calls),
+        (f"Batched judge (N={args.batch_size}) vs human", agreement(batched, human), batched_calls),
+        ("Batched vs per-item", agreement(batched, single), None),
+    ]
+    print(f"{'Comparison':<36} {'Agreement':>10} {'Kappa':>8} {'Judge calls':>12}")
+    print("-" * 70)
+    for label, (agree, kappa), calls in rows:
+        calls_str = "" if calls is None else f"{calls}"
+        print(f"{label:<36} {agree:>10.1%} {kappa:>8.3f} {calls_str:>12}")
+
+    print("\nPer-category batched vs per-item agreement:")
+    by_cat = {}
+    for s, b, p in zip(sample, batched, single):
+        by_cat.setdefault(s["category"], []).append(b == p)
+    for cat in sorted(by_cat):
+        matches = by_cat[cat]
+        print(f"  {cat:25s}: {sum(matches)}/{len(matches)}")
+
+    drop = rows[1][1][0] - rows[2][1][0]
+    if drop > args.tolerance:
+        print(f"\nFAIL: batching lowers human agreement by {drop:.1%} (tolerance {args.tolerance:.0%})")
+        sys.exit(1)
+    print(f"\nOK: human agreement change from batching = {-drop:+.1%}")
+
+
+if __name__ == "__main__":
+    main()